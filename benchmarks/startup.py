@@ -0,0 +1,130 @@
+"""
+Measure nay's startup cost.
+
+Reports the modules that take the longest to import (from 'python -X importtime') and the cold wall time of each
+operation class: a fresh interpreter parses the arguments and constructs the operation, without running it.
+
+    python benchmarks/startup.py [--runs N] [--top N] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# A representative command line for each operation class
+OPERATIONS = {
+    "nay": [],
+    "sync": ["-S", "nay"],
+    "sync (search)": ["-Ss", "nay"],
+    "getpkgbuild": ["-G", "nay"],
+    "query": ["-Q"],
+    "remove": ["-R", "nay"],
+    "upgrade": ["-U", "nay.pkg.tar.zst"],
+    "database": ["-D", "--asdeps", "nay"],
+    "files": ["-F", "nay"],
+    "deptest": ["-T", "nay"],
+}
+
+CONSTRUCT = (
+    "import sys; sys.argv = ['nay'] + sys.argv[1:]; "
+    "from nay.args import OperationParams; "
+    "params = OperationParams(); "
+    "params['op_cls'](**params['kwargs'])"
+)
+
+
+def get_import_times(argv: list[str]) -> list[tuple[str, int, int]]:
+    """
+    Get the import time of every module imported while constructing an operation
+
+    :param argv: The nay command line to construct the operation from
+    :type argv: list[str]
+
+    :return: (module, self time, cumulative time) tuples, in microseconds
+    :rtype: list[tuple[str, int, int]]
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CONSTRUCT, *argv],
+        capture_output=True,
+        text=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times.append((module.strip(), int(self_us), int(cumulative_us)))
+
+    return times
+
+
+def get_wall_time(argv: list[str], runs: int) -> float:
+    """
+    Get the median wall time of constructing an operation in a fresh interpreter
+
+    :param argv: The nay command line to construct the operation from
+    :type argv: list[str]
+    :param runs: The number of runs to take the median of
+    :type runs: int
+
+    :return: The median wall time in milliseconds
+    :rtype: float
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", CONSTRUCT, *argv],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="runs per operation")
+    parser.add_argument("--top", type=int, default=15, help="modules to report")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    report = {"operations": {}, "imports": {}}
+    for name, argv in OPERATIONS.items():
+        times = get_import_times(argv)
+        report["operations"][name] = {
+            "wall_ms": round(get_wall_time(argv, args.runs), 2),
+            "import_ms": round(sum(t[1] for t in times) / 1000, 2),
+            "modules": len(times),
+        }
+        for module, self_us, cumulative_us in times:
+            report["imports"].setdefault(module, (self_us, cumulative_us))
+
+    slowest = sorted(report["imports"].items(), key=lambda item: -item[1][1])
+    report["imports"] = {
+        module: {"self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+        for module, (self_us, cumulative_us) in slowest[: args.top]
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'operation':<16}{'wall (ms)':>12}{'imports (ms)':>14}{'modules':>10}")
+    for name, result in report["operations"].items():
+        print(
+            f"{name:<16}{result['wall_ms']:>12.2f}{result['import_ms']:>14.2f}{result['modules']:>10}"
+        )
+
+    print()
+    print(f"{'module':<40}{'self (ms)':>12}{'cumulative (ms)':>18}")
+    for module, result in report["imports"].items():
+        print(f"{module:<40}{result['self_ms']:>12.2f}{result['cumulative_ms']:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+"""
+Benchmark nay's hot paths offline.
+
+Synthetic local and sync databases of each size are generated in a temporary --dbpath/--root, and AURweb RPC
+responses are replayed from fixtures (synthetic by default, or recorded from the live AUR with --record). Measures
+database loading, search_packages, print_packages, write_packages, dependency resolution, '-Sl aur' and startup.
+
+    python benchmarks/suite.py [--sizes 1000 10000 100000] [--runs N] [--fixtures FILE] [--output FILE]
+                               [--compare BASELINE]
+    python benchmarks/suite.py --record FILE [--query QUERY] [--targets PKG ...]
+
+Results are written as JSON together with the commit they were measured at, so a branch can be compared against a
+baseline run of another commit with --compare.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Optional
+
+from nay.aur import AUR
+from nay.console import THEME_DEFAULT, NayConsole
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Package names are prefixed with one of these words, so searching for one matches about a tenth of the databases
+WORDS = (
+    "lib",
+    "python",
+    "qt",
+    "rust",
+    "font",
+    "theme",
+    "tool",
+    "perl",
+    "gtk",
+    "haskell",
+)
+
+QUERY = "python"
+
+REPOS = ("core", "extra")
+
+# Number of explicit targets the dependency resolution benchmark resolves
+EXPLICIT_TARGETS = 20
+
+# Fields of an AURweb RPC search result. Info results add dependencies, licenses and keywords
+SEARCH_FIELDS = (
+    "ID",
+    "Name",
+    "PackageBaseID",
+    "PackageBase",
+    "Version",
+    "Description",
+    "URL",
+    "NumVotes",
+    "Popularity",
+    "OutOfDate",
+    "Maintainer",
+    "FirstSubmitted",
+    "LastModified",
+    "URLPath",
+)
+
+STARTUP = (
+    "import sys; sys.argv = ['nay'] + sys.argv[1:]; "
+    "from nay.args import OperationParams; "
+    "params = OperationParams(); "
+    "operation = params['op_cls'](**params['kwargs']); "
+    "[db.pkgcache for db in operation.sync.values()]; "
+    "operation.local.pkgcache"
+)
+
+
+@dataclass
+class Environment:
+    """
+    A generated pacman root with its databases and config
+    """
+
+    dbpath: str
+    root: str
+    config: str
+
+    @property
+    def argv(self) -> list[str]:
+        return ["--dbpath", self.dbpath, "--root", self.root, "--config", self.config]
+
+
+class Response:
+    """
+    The parts of requests.Response nay.aur.AUR uses
+    """
+
+    def __init__(self, data: object = None, content: bytes = b"") -> None:
+        self.data = data
+        self.content = content
+        self.status_code = 200
+
+    def json(self) -> object:
+        return self.data
+
+
+class ReplayAUR(AUR):
+    """
+    An AUR client answering every request from fixtures instead of the network
+    """
+
+    def __init__(self, local, console, fixtures: dict) -> None:
+        super().__init__(local, console)
+        self.fixtures = fixtures
+
+    def request(self, endpoint: str, url: str, **kwargs) -> Response:
+        params = kwargs.get("params", {})
+        if endpoint == "search":
+            return Response({"results": self.fixtures["search"].get(params["arg"], [])})
+        if endpoint == "info":
+            info = self.fixtures["info"]
+            return Response(
+                {"results": [info[name] for name in params["arg[]"] if name in info]}
+            )
+
+        return Response(content="\n".join(self.fixtures["packages"]).encode())
+
+
+class RecordingAUR(AUR):
+    """
+    An AUR client saving the responses of the live AUR as fixtures
+    """
+
+    def __init__(self, console) -> None:
+        super().__init__(None, console)
+        self.fixtures = {"search": {}, "info": {}, "packages": [], "targets": []}
+
+    def request(self, endpoint: str, url: str, **kwargs) -> "requests.Response":
+        response = super().request(endpoint, url, **kwargs)
+        if endpoint == "search":
+            self.fixtures["search"][kwargs["params"]["arg"]] = response.json()[
+                "results"
+            ]
+        elif endpoint == "info":
+            for result in response.json()["results"]:
+                self.fixtures["info"][result["Name"]] = result
+        else:
+            self.fixtures["packages"] = response.content.decode().split()
+
+        return response
+
+
+def format_desc(fields: dict[str, object]) -> str:
+    """
+    Format a 'desc' entry of a pacman database
+
+    :param fields: The fields of the entry, e.g. {'NAME': 'foo'}. List values are written one per line
+    :type fields: dict[str, object]
+
+    :return: The entry
+    :rtype: str
+    """
+    lines = []
+    for key, value in fields.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if not values:
+            continue
+        lines.append(f"%{key}%")
+        lines.extend(str(value) for value in values)
+        lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def get_sync_name(num: int) -> str:
+    return f"{WORDS[num % len(WORDS)]}-{num}"
+
+
+def get_aur_name(num: int) -> str:
+    return f"{WORDS[num % len(WORDS)]}-aur-{num}"
+
+
+def generate_databases(directory: str, size: int) -> Environment:
+    """
+    Generate sync databases holding 'size' packages split over REPOS, and a local database with every tenth of them
+    installed (a third of those outdated) plus a few foreign packages from the AUR fixtures
+
+    :param directory: The directory to create the pacman root in
+    :type directory: str
+    :param size: The number of sync packages
+    :type size: int
+
+    :return: The generated environment
+    :rtype: Environment
+    """
+    env = Environment(
+        dbpath=os.path.join(directory, "db"),
+        root=os.path.join(directory, "root"),
+        config=os.path.join(directory, "pacman.conf"),
+    )
+    os.makedirs(os.path.join(env.dbpath, "sync"))
+    os.makedirs(os.path.join(env.dbpath, "local"))
+    os.makedirs(env.root)
+
+    with open(env.config, "w") as f:
+        f.write("[options]\nArchitecture = x86_64\nSigLevel = Never\n\n")
+        for repo in REPOS:
+            f.write(f"[{repo}]\nServer = file://{directory}/$repo\n\n")
+
+    build_date = int(time.time())
+    archives = {
+        repo: tarfile.open(os.path.join(env.dbpath, "sync", f"{repo}.db"), "w:gz")
+        for repo in REPOS
+    }
+    with contextlib.ExitStack() as stack:
+        for archive in archives.values():
+            stack.enter_context(archive)
+
+        for num in range(size):
+            name = get_sync_name(num)
+            word = WORDS[num % len(WORDS)]
+            fields = {
+                "FILENAME": f"{name}-1.0-1-x86_64.pkg.tar.zst",
+                "NAME": name,
+                "BASE": name,
+                "VERSION": "1.0-1",
+                "DESC": f"Synthetic {word} package number {num}",
+                "CSIZE": 1024 * (num % 500 + 1),
+                "ISIZE": 4096 * (num % 500 + 1),
+                "URL": f"https://example.org/{name}",
+                "LICENSE": "MIT",
+                "ARCH": "x86_64",
+                "BUILDDATE": build_date,
+                "PACKAGER": "nay benchmarks <nay@example.org>",
+                "DEPENDS": [get_sync_name(num // 2)] if num else [],
+            }
+            add_entry(archives[REPOS[num % len(REPOS)]], f"{name}-1.0-1", fields)
+
+            if num % 10 == 0:
+                version = "0.9-1" if num % 30 == 0 else "1.0-1"
+                write_local(env.dbpath, dict(fields, VERSION=version), build_date)
+
+    for num in range(0, get_aur_size(size), 20):
+        name = get_aur_name(num)
+        fields = {
+            "NAME": name,
+            "BASE": name,
+            "VERSION": "0.9-1",
+            "DESC": f"Synthetic AUR package number {num}",
+            "ARCH": "x86_64",
+            "BUILDDATE": build_date,
+            "PACKAGER": "Unknown Packager",
+        }
+        write_local(env.dbpath, fields, build_date)
+
+    with open(os.path.join(env.dbpath, "local", "ALPM_DB_VERSION"), "w") as f:
+        f.write("9\n")
+
+    return env
+
+
+def add_entry(archive: tarfile.TarFile, dirname: str, fields: dict) -> None:
+    directory = tarfile.TarInfo(dirname)
+    directory.type = tarfile.DIRTYPE
+    directory.mode = 0o755
+    archive.addfile(directory)
+
+    data = format_desc(fields).encode()
+    desc = tarfile.TarInfo(f"{dirname}/desc")
+    desc.size = len(data)
+    desc.mode = 0o644
+    archive.addfile(desc, io.BytesIO(data))
+
+
+def write_local(dbpath: str, fields: dict, install_date: int) -> None:
+    fields = {
+        key: value
+        for key, value in fields.items()
+        if key not in ("FILENAME", "CSIZE", "ISIZE")
+    }
+    fields.update(INSTALLDATE=install_date, REASON=1, VALIDATION="none")
+    entry = os.path.join(dbpath, "local", f"{fields['NAME']}-{fields['VERSION']}")
+    os.makedirs(entry)
+    with open(os.path.join(entry, "desc"), "w") as f:
+        f.write(format_desc(fields))
+    with open(os.path.join(entry, "files"), "w") as f:
+        f.write("%FILES%\n\n")
+
+
+def get_aur_size(size: int) -> int:
+    return max(size // 10, 100)
+
+
+def generate_fixtures(size: int) -> dict:
+    """
+    Generate AURweb RPC responses for the AUR counterpart of a synthetic database. Package i depends on packages
+    2i + 1 and 2i + 2 and on a sync package, so resolving the first few packages walks a deep dependency tree.
+
+    :param size: The number of sync packages of the database
+    :type size: int
+
+    :return: The fixtures: search results by query, info results by name, the package list and explicit targets
+    :rtype: dict
+    """
+    aur_size = get_aur_size(size)
+    info = {}
+    for num in range(aur_size):
+        name = get_aur_name(num)
+        depends = [
+            get_aur_name(dep) for dep in (2 * num + 1, 2 * num + 2) if dep < aur_size
+        ]
+        info[name] = {
+            "ID": num,
+            "Name": name,
+            "PackageBaseID": num,
+            "PackageBase": name,
+            "Version": "1.0-1",
+            "Description": f"Synthetic AUR package number {num}",
+            "URL": f"https://example.org/{name}",
+            "NumVotes": num % 1000,
+            "Popularity": (num % 100) / 10,
+            "OutOfDate": None,
+            "Maintainer": None if num % 50 == 0 else "someone",
+            "FirstSubmitted": 1600000000,
+            "LastModified": 1700000000,
+            "URLPath": f"/cgit/aur.git/snapshot/{name}.tar.gz",
+            "Depends": depends + [get_sync_name(num % size)],
+            "MakeDepends": [],
+            "License": ["MIT"],
+            "Keywords": [],
+        }
+
+    search = [
+        {key: result[key] for key in SEARCH_FIELDS}
+        for result in info.values()
+        if QUERY in result["Name"] or QUERY in result["Description"]
+    ]
+
+    return {
+        "search": {QUERY: search},
+        "info": info,
+        "packages": list(info),
+        "targets": [get_aur_name(num) for num in range(1, EXPLICIT_TARGETS + 1)],
+    }
+
+
+def record_fixtures(path: str, query: str, targets: list[str]) -> None:
+    """
+    Record the live AURweb responses of a search, the dependency tree of some targets and the package list
+
+    :param path: The file to write the fixtures to
+    :type path: str
+    :param query: The search query to record
+    :type query: str
+    :param targets: The packages whose dependency tree is recorded
+    :type targets: list[str]
+    """
+    console = NayConsole(file=sys.stderr, theme=THEME_DEFAULT)
+    aur = RecordingAUR(console)
+    aur.search(query)
+    if targets:
+        aur.get_dependency_tree(*aur.get_packages(*targets))
+    aur.request("packages", aur.packages_endpoint)
+    aur.fixtures["targets"] = targets
+
+    with open(path, "w") as f:
+        json.dump(aur.fixtures, f)
+
+
+def measure(func: Callable[[], object], runs: int) -> dict[str, float]:
+    """
+    Time a function
+
+    :param func: The function to time
+    :type func: Callable[[], object]
+    :param runs: The number of runs
+    :type runs: int
+
+    :return: The median and minimum wall time in milliseconds
+    :rtype: dict[str, float]
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+    }
+
+
+def run_benchmarks(
+    env: Environment, fixtures: dict, runs: int, query: str
+) -> dict[str, dict[str, float]]:
+    """
+    Run every benchmark against a generated environment
+
+    :param env: The environment to run against
+    :type env: Environment
+    :param fixtures: The AUR fixtures to replay
+    :type fixtures: dict
+    :param runs: The number of runs of each benchmark
+    :type runs: int
+    :param query: The search query
+    :type query: str
+
+    :return: The timings of each benchmark
+    :rtype: dict[str, dict[str, float]]
+    """
+    from nay.sync import Sync
+
+    def make_sync(console: NayConsole) -> Sync:
+        operation = Sync(
+            targets=[],
+            pacman_params=["--sync"],
+            dbpath=env.dbpath,
+            root=env.root,
+            config=env.config,
+            console=console,
+        )
+        operation.__dict__["aur"] = ReplayAUR(operation.local, console, fixtures)
+        return operation
+
+    def load_databases() -> None:
+        operation = make_sync(NayConsole(file=io.StringIO()))
+        for db in operation.sync.values():
+            db.pkgcache
+        operation.local.pkgcache
+
+    plain = make_sync(NayConsole(file=io.StringIO(), color_system=None))
+    rich = make_sync(
+        NayConsole(
+            file=io.StringIO(),
+            theme=THEME_DEFAULT,
+            color_system="truecolor",
+            force_terminal=True,
+            width=120,
+        )
+    )
+    results = plain.search_packages(query)
+
+    def print_packages() -> None:
+        rich.console.file = io.StringIO()
+        rich.console.print_packages(results)
+
+    def write_packages() -> None:
+        plain.console.file = io.StringIO()
+        plain.console.print_packages(results)
+
+    def resolve_dependencies() -> None:
+        packages = plain.aur.get_packages(*fixtures["targets"])
+        plain.aur.get_dependency_tree(*packages)
+
+    def list_aur() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain.aur.list()
+
+    def startup() -> None:
+        subprocess.run(
+            [sys.executable, "-c", STARTUP, "-Ss", query, *env.argv],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    benchmarks = {
+        "load_databases": load_databases,
+        "search_packages": lambda: plain.search_packages(query),
+        "print_packages": print_packages,
+        "write_packages": write_packages,
+        "resolve_dependencies": resolve_dependencies,
+        "list_aur": list_aur,
+        "startup": startup,
+    }
+
+    timings = {}
+    for name, func in benchmarks.items():
+        timings[name] = measure(func, runs)
+        print(f"  {name:<24}{timings[name]['median_ms']:>12.2f} ms", file=sys.stderr)
+
+    timings["search_packages"]["results"] = len(results)
+    return timings
+
+
+def get_commit() -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """
+    Print the timings of a run next to those of a baseline run
+
+    :param report: The current run
+    :type report: dict
+    :param baseline: The baseline run
+    :type baseline: dict
+    """
+    print(f"baseline {baseline.get('commit')} -> current {report.get('commit')}")
+    print(
+        f"{'size':>8}  {'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>10}"
+    )
+    for size, timings in report["results"].items():
+        for name, timing in timings.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if before is None:
+                continue
+            change = (timing["median_ms"] / before["median_ms"] - 1) * 100
+            print(
+                f"{size:>8}  {name:<24}{before['median_ms']:>12.2f}{timing['median_ms']:>12.2f}{change:>+9.1f}%"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--runs", type=int, default=5, help="runs per benchmark")
+    parser.add_argument("--fixtures", help="recorded AUR fixtures to replay")
+    parser.add_argument("--output", help="file to write the results to")
+    parser.add_argument("--compare", help="baseline results to compare against")
+    parser.add_argument("--record", help="record live AUR fixtures to this file")
+    parser.add_argument("--query", default=QUERY, help="search query")
+    parser.add_argument("--targets", nargs="*", default=[], help="targets to record")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, args.query, args.targets)
+        return
+
+    recorded = None
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            recorded = json.load(f)
+
+    report = {
+        "commit": get_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "query": args.query,
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"{size} packages", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix="nay-bench-") as directory:
+            env = generate_databases(directory, size)
+            fixtures = recorded if recorded is not None else generate_fixtures(size)
+            report["results"][str(size)] = run_benchmarks(
+                env, fixtures, args.runs, args.query
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
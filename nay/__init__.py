@@ -1,12 +1,23 @@
+import functools
+import json
 import os
-from typing import Union
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    from .console import NayConsole
 
 __version__ = "0.3.1"
 
 PACKAGE_ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-def get_console(color_system: Union[str, None]) -> "NayConsole":
+def get_console(color_system: Union[str, None], stderr: bool = False) -> "NayConsole":
     from .console import NayConsole, THEME_DEFAULT
 
-    return NayConsole(color_system=color_system, theme=THEME_DEFAULT)
+    return NayConsole(color_system=color_system, theme=THEME_DEFAULT, stderr=stderr)
+
+
+@functools.cache
+def load_args_mapper() -> dict:
+    with open(os.path.join(PACKAGE_ROOT_DIR, "args.json"), "r") as f:
+        return json.load(f)
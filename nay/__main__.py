@@ -1,25 +1,119 @@
+import contextlib
 import sys
+from typing import ContextManager
 
+from . import metrics, tracing
 from .args import OperationParams
-from .exceptions import ConfigReadError, HandleCreateError, MissingTargets
+from .daemon import forward
+from .fastpath import exec_pacman
+from .exceptions import (
+    ArgumentListError,
+    AURError,
+    BuildError,
+    ConfigReadError,
+    CycleError,
+    HandleCreateError,
+    InstallError,
+    MissingTargets,
+)
 
 
 def main() -> None:
+    exec_pacman(sys.argv[1:])
+
+    status = forward(sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+    op_params = None
     try:
         op_params = OperationParams()
         op_cls = op_params["op_cls"]
         kwargs = op_params["kwargs"]
 
-        operation = op_cls(**kwargs)
-        operation.run()
+        if op_params.args.get("timings") or op_params.args.get("trace_file"):
+            tracing.enable()
+        if op_params.args.get("timings") or op_params.args.get("metrics_file"):
+            metrics.enable()
+
+        with get_profiler(op_params.args), tracing.span("nay", argv=sys.argv[1:]):
+            with tracing.span(f"{op_cls.__name__}.__init__"):
+                operation = op_cls(**kwargs)
+            operation.run()
 
     except KeyboardInterrupt:
         sys.exit()
-    except (HandleCreateError, ConfigReadError, MissingTargets) as err:
+    except (
+        HandleCreateError,
+        ConfigReadError,
+        MissingTargets,
+        CycleError,
+        AURError,
+        ArgumentListError,
+    ) as err:
         from .console import NayConsole
 
         console = NayConsole()
-        console.warn(str(err), exit=True)
+        console.warn(str(err))
+        sys.exit(1)
+    except (BuildError, InstallError) as err:
+        from .console import NayConsole
+
+        console = NayConsole()
+        console.warn(str(err))
+        if err.journal is not None:
+            console.alert("Run 'nay -S --resume' to continue the transaction")
+        sys.exit(1)
+    finally:
+        if tracing.TRACER is not None or metrics.METRICS is not None:
+            report_timings(op_params.args)
+
+
+def get_profiler(args: dict) -> ContextManager:
+    """
+    Get the profiler requested with --profile
+
+    :param args: The parsed command line arguments
+    :type args: dict
+
+    :return: A context manager profiling the code it wraps, or a null context if no profile was requested
+    :rtype: ContextManager
+    """
+    if args.get("profile") is None:
+        return contextlib.nullcontext()
+
+    from . import get_console
+    from .profiling import profile
+
+    color_system = None if args.get("color") == "never" else "auto"
+    console = get_console(color_system, stderr=True)
+    return profile(args["profile"], console, args.get("profile_output"))
+
+
+def report_timings(args: dict) -> None:
+    """
+    Print the timing summary and AUR traffic (--timings), write the Chrome trace (--trace-file) and write the AUR
+    metrics (--metrics-file) of a traced run
+
+    :param args: The parsed command line arguments
+    :type args: dict
+    """
+    from . import get_console
+
+    tracer = tracing.TRACER
+    recorded = metrics.METRICS
+    tracing.disable()
+    metrics.disable()
+
+    if args.get("trace_file"):
+        tracer.write_chrome_trace(args["trace_file"])
+    if args.get("metrics_file"):
+        recorded.write(args["metrics_file"])
+    if args.get("timings"):
+        color_system = None if args.get("color") == "never" else "auto"
+        console = get_console(color_system, stderr=True)
+        console.print_timings(tracer.summary())
+        console.print_metrics(recorded.to_dict())
 
 
 if __name__ == "__main__":
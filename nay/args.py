@@ -1,14 +1,14 @@
 import argparse
-import json
-import os
 import sys
+from typing import Optional
 
-from . import get_console, PACKAGE_ROOT_DIR, wrapper
+from . import get_console, load_args_mapper, wrapper
 
 
 class ArgumentParser(argparse.ArgumentParser):
-    with open(os.path.join(PACKAGE_ROOT_DIR, "args.json"), "r") as f:
-        ARGS_MAPPER = json.load(f)
+    @property
+    def ARGS_MAPPER(self) -> dict:
+        return load_args_mapper()
 
     @property
     def known_args(self):
@@ -16,7 +16,7 @@ class ArgumentParser(argparse.ArgumentParser):
 
     @known_args.setter
     def known_args(self, operation: str) -> None:
-        known_args = self.ARGS_MAPPER[operation]
+        known_args = dict(self.ARGS_MAPPER[operation])
         for parent in self.ARGS_MAPPER["operations"][operation]["parents"]:
             known_args.update(self.ARGS_MAPPER[parent])
 
@@ -33,22 +33,24 @@ class ArgumentParser(argparse.ArgumentParser):
             if arg == "targets":
                 continue
 
+            # Options handled by nay itself are not passed on to pacman
+            if "pacman_param" not in known_args[arg]:
+                continue
+
             if isinstance(args[arg], str):
-                params.append(f"{known_args[arg]['pacman_param']} {args[arg]}")
+                params.extend([known_args[arg]["pacman_param"], args[arg]])
             elif isinstance(args[arg], list):
-                print(True)
-                params.append(
-                    f"{known_args[arg]['pacman_param']} {' '.join(args[arg])}"
-                )
+                params.append(known_args[arg]["pacman_param"])
+                params.extend(args[arg])
             elif args[arg]:
                 for _ in range(args[arg]):
-                    params.append(f"{known_args[arg]['pacman_param']}")
+                    params.append(known_args[arg]["pacman_param"])
 
         return params
 
-    def _isolate_operation_args(self, oplist: list):
+    def _isolate_operation_args(self, oplist: list, argv: list[str]):
         args = []
-        for arg in sys.argv[1:]:
+        for arg in argv:
             if arg.startswith("--"):
                 if arg in oplist:
                     args.append(arg)
@@ -61,7 +63,7 @@ class ArgumentParser(argparse.ArgumentParser):
 
         return args
 
-    def _parse_operation(self):
+    def _parse_operation(self, argv: list[str]):
         oplist = []
         parser = argparse.ArgumentParser()
         exclusive = parser.add_mutually_exclusive_group()
@@ -72,7 +74,7 @@ class ArgumentParser(argparse.ArgumentParser):
                 **self.ARGS_MAPPER["operations"][operation]["kwargs"],
             )
 
-        args = self._isolate_operation_args(oplist)
+        args = self._isolate_operation_args(oplist, argv)
         operations = vars(parser.parse_args(args))
         operation = [
             operation for operation in operations if operations[operation] is True
@@ -82,13 +84,13 @@ class ArgumentParser(argparse.ArgumentParser):
 
         return operation
 
-    def _parse_options(self) -> dict:
+    def _parse_options(self, argv: list[str]) -> dict:
         for arg in self.known_args:
             self.add_argument(
                 *self.known_args[arg]["args"], **self.known_args[arg]["kwargs"]
             )
 
-        parsed = vars(self.parse_args())
+        parsed = vars(self.parse_args(argv))
         self._check_conflicts(parsed)
 
         return parsed
@@ -103,9 +105,12 @@ class ArgumentParser(argparse.ArgumentParser):
                             f"invalid option: '{arg}' and '{other}' may not be used together"
                         )
 
-    def parse_nay_args(self):
-        operation = self._parse_operation()
-        args = self._parse_options()
+    def parse_nay_args(self, argv: Optional[list[str]] = None):
+        if argv is None:
+            argv = sys.argv[1:]
+
+        operation = self._parse_operation(argv)
+        args = self._parse_options(argv)
         pacman_params = self._get_pacman_params(args)
         args.update({"pacman_params": pacman_params})
 
@@ -139,9 +144,9 @@ class OperationMapper(dict):
 
 
 class OperationParams(dict):
-    def __init__(self):
+    def __init__(self, argv: Optional[list[str]] = None):
         parser = ArgumentParser()
-        args = parser.parse_nay_args()
+        args = parser.parse_nay_args(argv)
 
         self.args = args["args"]
         operation_key = args["operation"]
@@ -165,6 +170,12 @@ class OperationParams(dict):
                     "dbpath": self.args["dbpath"],
                     "root": self.args["root"],
                     "config": self.args["config"],
+                    "build_profile": self.args.get("build_profile"),
+                    "resume": self.args.get("resume", False),
+                    "devel": self.args.get("devel", False),
+                    "output_format": self.args.get("output_format"),
+                    "daemon": self.args.get("daemon", False),
+                    "dry_run": self.args.get("dry_run", False),
                 }
             )
 
@@ -176,5 +187,8 @@ class OperationParams(dict):
         if self.args["color"] == "never":
             color_system = None
 
-        console = get_console(color_system)
+        # Keep stdout clean for machine-readable records
+        stderr = self.args.get("output_format") is not None
+
+        console = get_console(color_system, stderr=stderr)
         return console
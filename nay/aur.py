@@ -1,52 +1,312 @@
+import collections
+import concurrent.futures
 import datetime
 import os
-import shlex
 import shutil
-import subprocess
-from typing import Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
 
-import networkx as nx
-import requests
-
-from .config import CACHEDIR
+from . import metrics
+from .command import git, pacman, run, run_transaction
+from .config import CACHEDIR, SRCDEST, get_aur_url, make_cachedir
 from .console import NayConsole
-from .package import AURBasic, AURPackage, Package
+from .devel import DevelDB, get_vcs_sources
+from .exceptions import AURError, InstallError
+from .graph import DiGraph
+from .journal import Journal
+from .package import AURPackage, Package
+from .profiles import BuildProfile, get_build_times
+from .ratelimit import RETRY_STATUS, Throttle, get_retry_after
+from .tracing import span
+
+if TYPE_CHECKING:
+    import pyalpm
+    import requests
+
+# Number of packages per AURweb RPC info request. Keeps request URLs well below the length limit of the AURweb server
+INFO_BATCH_SIZE = 200
+
+
+class ResponseCache:
+    """
+    An in-memory cache of AURweb RPC results. Entries expire after a fixed time so a long-running process (see
+    nay.daemon) still picks up new package versions. Expired entries are kept for a while as a fallback for when the AUR
+    can't be reached. The least recently used entries are dropped once the cache is full.
+
+    :param ttl: Optional number of seconds an entry stays valid. Default is 300
+    :type ttl: Optional[int]
+    :param max_stale: Optional number of seconds an expired entry is kept as a fallback. Default is 86400
+    :type max_stale: Optional[int]
+    :param max_entries: Optional number of entries the cache holds at most. Default is 10000
+    :type max_entries: Optional[int]
+    """
+
+    def __init__(
+        self, ttl: int = 300, max_stale: int = 86400, max_entries: int = 10000
+    ) -> None:
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple, stale: bool = False) -> tuple[bool, object]:
+        """
+        Look up a cached result
+
+        :param key: The key of the result, e.g. ('info', <name>)
+        :type key: tuple
+        :param stale: Optional flag to return expired results too, e.g. when the AUR can't be reached. Default is False
+        :type stale: Optional[bool]
+
+        :return: Whether the key was found and the cached value
+        :rtype: tuple[bool, object]
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+
+            now = time.monotonic()
+            if entry[0] + self.max_stale < now:
+                del self.entries[key]
+                return False, None
+            if entry[0] < now and stale is False:
+                return False, None
+
+            self.entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key: tuple, value: object) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
 
 
 class AUR:
-    def __init__(self, local: "pyalpm.Database", console: NayConsole):
+    """
+    A client for the AURweb RPC interface, the package list and the AUR git repositories
+
+    :param local: The local database
+    :type local: pyalpm.Database
+    :param console: The console to report to
+    :type console: NayConsole
+    :param cache: Optional cache of RPC results. Default is None
+    :type cache: Optional[ResponseCache]
+    :param base_url: Optional base URL of the AUR. Default is config.get_aur_url()
+    :type base_url: Optional[str]
+    :param throttle: Optional rate limiter, retry policy and circuit breaker. Default is a Throttle with the policy
+    configured in nay.conf
+    :type throttle: Optional[Throttle]
+    """
+
+    def __init__(
+        self,
+        local: "pyalpm.Database",
+        console: NayConsole,
+        cache: Optional[ResponseCache] = None,
+        base_url: Optional[str] = None,
+        throttle: Optional[Throttle] = None,
+    ):
         self.local = local
         self.console = console
-        self.search_endpoint = "https://aur.archlinux.org/rpc/?v=5&type=search&arg="
-        self.info_endpoint = "https://aur.archlinux.org/rpc/?v=5&type=info&arg[]="
+        self.cache = cache
+        self.base_url = base_url if base_url is not None else get_aur_url()
+        self.throttle = throttle if throttle is not None else Throttle()
+        self.search_endpoint = f"{self.base_url}/rpc/?v=5&type=search"
+        self.info_endpoint = f"{self.base_url}/rpc/?v=5&type=info"
+        self.packages_endpoint = f"{self.base_url}/packages.gz"
+        self.prefetched = {}
+
+    def request(self, endpoint: str, url: str, **kwargs) -> "requests.Response":
+        """
+        Send a GET request to the AUR. Requests are paced by the token bucket of the throttle. Connection errors,
+        timeouts, 429 and 5xx responses are retried after a jittered exponential backoff, or the Retry-After of the response if that
+        is longer, and every other request waits as well. After too many failures in a row the circuit breaker opens
+        and requests fail right away until its cooldown has passed.
+
+        :param endpoint: The name of the endpoint, e.g. 'info'. Used to label timing spans and metrics
+        :type endpoint: str
+        :param url: The URL to request
+        :type url: str
+        :param kwargs: Keyword arguments passed on to requests.get
+
+        :return: The response
+        :rtype: requests.Response
+
+        :raises AURError: If the request still failed after all retries, or the circuit breaker is open
+        """
+        import requests
+
+        throttle = self.throttle
+        policy = throttle.policy
+        kwargs.setdefault("timeout", (policy.connect_timeout, policy.read_timeout))
+        reason = None
+        for attempt in range(policy.retries + 1):
+            if throttle.breaker.allow() is False:
+                raise AURError(
+                    f"error: too many failed requests to {self.base_url}, waiting for it to recover"
+                )
+            if attempt > 0:
+                metrics.observe_retry(endpoint)
+            throttle.bucket.acquire()
+
+            response = None
+            with span(f"aur.{endpoint}", url=url, attempt=attempt):
+                start = time.perf_counter()
+                try:
+                    response = requests.get(url, **kwargs)
+                except requests.RequestException as err:
+                    reason = str(err)
+                elapsed = time.perf_counter() - start
+
+            if response is None:
+                metrics.observe_request(endpoint, elapsed, 0, None)
+            else:
+                # Count bytes as sent (compressed) when the server says so, which is what matters for shared quotas
+                size = int(
+                    response.headers.get("Content-Length", len(response.content))
+                )
+                metrics.observe_request(endpoint, elapsed, size, response.status_code)
+                if response.status_code not in RETRY_STATUS:
+                    throttle.breaker.success()
+                    throttle.bucket.speed_up()
+                    if response.ok is False:
+                        raise AURError(
+                            f"error: {endpoint} request to {self.base_url} failed: HTTP {response.status_code}"
+                        )
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            throttle.breaker.failure()
+            delay = throttle.get_backoff(attempt)
+            if response is not None:
+                if response.status_code == 429:
+                    throttle.bucket.slow_down()
+                retry_after = get_retry_after(response.headers)
+                if retry_after is not None and retry_after > policy.max_backoff:
+                    reason = f"{reason}, retry after {retry_after:.0f}s"
+                    break
+                delay = max(delay, retry_after or 0)
+
+            if attempt < policy.retries:
+                throttle.bucket.pause(delay)
+
+        raise AURError(f"error: {endpoint} request to {self.base_url} failed: {reason}")
+
+    def rpc(self, endpoint: str, url: str, **kwargs) -> dict:
+        """
+        Send a query to the AURweb RPC interface
+
+        :param endpoint: The name of the endpoint, e.g. 'info'
+        :type endpoint: str
+        :param url: The URL to request
+        :type url: str
+        :param kwargs: Keyword arguments passed on to requests.get
 
-    def search(self, query):
-        packages = []
+        :return: The decoded response
+        :rtype: dict
 
-        results = requests.get(
-            f"https://aur.archlinux.org/rpc/?v=5&type=search&arg={query}"
-        ).json()
+        :raises AURError: If the request failed or the response is not a valid RPC result
+        """
+        response = self.request(endpoint, url, **kwargs)
+        try:
+            data = response.json()
+        except ValueError:
+            raise AURError(f"error: invalid {endpoint} response from {self.base_url}")
 
-        if results["results"]:
-            packages.extend(
-                AURBasic.from_search_query(result) for result in results["results"]
+        if data.get("type") == "error" or "results" not in data:
+            raise AURError(
+                f"error: {endpoint} request to {self.base_url} failed: {data.get('error')}"
             )
 
-        return packages
+        return data
+
+    def search(self, query: str) -> list[dict]:
+        """
+        Search the AUR using the AURweb RPC interface. If the AUR can't be reached, expired cached results are used
+
+        :param query: The search query
+        :type query: str
+
+        :return: The search results as returned by the AURweb RPC interface
+        :rtype: list[dict]
+        """
+        if self.cache is not None:
+            found, results = self.cache.get(("search", query))
+            metrics.observe_cache("search", found)
+            if found is True:
+                return results
+
+        try:
+            results = self.rpc("search", self.search_endpoint, params={"arg": query})[
+                "results"
+            ]
+        except AURError as err:
+            found, results = False, None
+            if self.cache is not None:
+                found, results = self.cache.get(("search", query), stale=True)
+            if found is False:
+                raise
+            self.console.warn(f"{err}; using cached search results")
+            return results
+
+        if self.cache is not None:
+            self.cache.set(("search", query), results)
+
+        return results
 
     def get_packages(self, *names, verbose=False):
-        packages = []
-        missing = []
-        names = list(set(names))
-
-        results = requests.get(
-            f"{self.info_endpoint}&arg[]={'&arg[]='.join(names)}"
-        ).json()
-        for result in results["results"]:
-            if names.count(result["Name"]) == 0:
-                missing.append(result["Name"])
-            packages.append(AURPackage.from_info_query(result))
+        """
+        Get AURPackage objects from an AURweb RPC info query. Names are queried in batches of INFO_BATCH_SIZE so any
+        number of packages takes as few round trips as possible.
+
+        :param names: A package name or series of package names to query
+        :type names: str
+        :param verbose: Optional parameter indicating whether missing packages should be reported. Default is False
+        :type verbose: Optional[bool]
 
+        :return: A list of the packages found in the AUR
+        :rtype: list[AURPackage]
+        """
+        names = list(dict.fromkeys(names))
+        results = {}
+        query = []
+        for name in names:
+            found, result = False, None
+            if self.cache is not None:
+                found, result = self.cache.get(("info", name))
+                metrics.observe_cache("info", found)
+            if found is True:
+                results[name] = result
+            else:
+                query.append(name)
+
+        for start in range(0, len(query), INFO_BATCH_SIZE):
+            end = start + INFO_BATCH_SIZE
+            batch = query[start:end]
+            try:
+                response = self.rpc("info", self.info_endpoint, params={"arg[]": batch})
+            except AURError as err:
+                results.update(self.get_stale(batch, err))
+                continue
+            for result in response["results"]:
+                results[result["Name"]] = result
+            if self.cache is not None:
+                for name in batch:
+                    # Names missing from the AUR are cached as None so they are not queried again
+                    self.cache.set(("info", name), results.get(name))
+
+        packages = [
+            AURPackage.from_info_query(results[name])
+            for name in names
+            if results.get(name) is not None
+        ]
+
+        missing = [name for name in names if results.get(name) is None]
         if missing and verbose is True:
             self.console.print(
                 f"[red]->[/red] No AUR package found for {', '.join(missing)}"
@@ -54,53 +314,86 @@ class AUR:
 
         return packages
 
+    def get_stale(self, names: list[str], err: AURError) -> dict[str, Optional[dict]]:
+        """
+        Get expired info results from the cache after a failed info query
+
+        :param names: The names of the packages queried
+        :type names: list[str]
+        :param err: The error the query failed with
+        :type err: AURError
+
+        :return: The cached result of each package
+        :rtype: dict[str, Optional[dict]]
+
+        :raises AURError: If any of the packages is not in the cache
+        """
+        results = {}
+        for name in names:
+            found = False
+            if self.cache is not None:
+                found, results[name] = self.cache.get(("info", name), stale=True)
+            if found is False:
+                raise err
+
+        self.console.warn(f"{err}; using cached package information")
+        return results
+
     def get_dependency_tree(
         self,
         *packages: AURPackage,
         recursive: Optional[bool] = True,
-    ) -> "nx.DiGraph":
+    ) -> DiGraph:
         """
-        Get the AUR dependency tree for a package or series of packages
+        Get the AUR dependency tree for a package or series of packages. The tree is expanded one level at a time with
+        a single batched info query per level, and every package is expanded once, so shared and circular dependencies
+        are only queried once.
 
         :param recursive: Optional parameter indicating whether this function should run recursively. If 'False', only immediate dependencies will be returned. Defaults is True
         :type recursive: Optional[bool]
 
-        :return: A dependency tree of all packages passed to the function
-        :rtype: nx.DiGraph
+        :return: A dependency tree of all packages passed to the function, with edges pointing from packages to their
+        dependencies
+        :rtype: DiGraph
         """
-        tree = nx.DiGraph()
-        aur_query = []
+        with span("aur.get_dependency_tree", packages=len(packages)):
+            tree = DiGraph()
+            known = {}
+            for pkg in packages:
+                tree.add_node(pkg)
+                known[pkg.name] = pkg
+
+            level = list(packages)
+            while level:
+                aur_deps = {}
+                for pkg in level:
+                    for dtype in ["check_depends", "make_depends", "depends"]:
+                        for dep_name in getattr(pkg, dtype):
+                            aur_deps.setdefault(dep_name, {})[pkg] = dtype
+
+                level = self.get_packages(
+                    *[dep_name for dep_name in aur_deps if dep_name not in known]
+                )
+                for dep in level:
+                    known[dep.name] = dep
+
+                for dep_name, dependents in aur_deps.items():
+                    if dep_name not in known:
+                        continue
+                    for pkg, dtype in dependents.items():
+                        tree.add_edge(pkg, known[dep_name], dtype=dtype)
+
+                if recursive is False:
+                    break
 
-        aur_deps = {pkg: {} for pkg in packages}
-        for pkg in packages:
-            tree.add_node(pkg)
-            for dtype in ["check_depends", "make_depends", "depends"]:
-                for dep_name in getattr(pkg, dtype):
-                    aur_query.append(dep_name)
-                    aur_deps[pkg][dep_name] = {"dtype": dtype}
-
-        aur_info = self.get_packages(*set(list(aur_query)))
-        for pkg in aur_deps:
-            for dep in aur_info:
-                if dep.name in aur_deps[pkg].keys():
-                    tree.add_edge(pkg, dep, dtype=aur_deps[pkg][dep.name]["dtype"])
-
-        if recursive is False:
             return tree
 
-        layers = [layer for layer in nx.bfs_layers(tree, packages)]
-        if len(layers) > 1:
-            dependencies = layers[1]
-            tree = self.nx.compose(tree, self.get_dependency_tree(*dependencies))
-
-        return tree
-
-    def get_depends(self, aur_tree: "nx.DiGraph") -> list[Package]:
+    def get_depends(self, aur_tree: DiGraph) -> list[Package]:
         """
         Get the aur dependencies from installation targets
 
         :param aur_tree: The dependency tree of the AUR explicit packages
-        :type aur_tree: nx.DiGraph
+        :type aur_tree: DiGraph
         :param skip_verchecks: Flag to skip version checks for dependencies. Default is False
         :type skip_verchecks: bool
 
@@ -119,56 +412,175 @@ class AUR:
         self,
         *packages: AURPackage,
         pacman_params: list,
+        profile: Optional[BuildProfile] = None,
+        journal: Optional[Journal] = None,
     ):
         """
         Install passed AURPackage objects
 
         :param packages: Package or series of packages to install
         :type packages: AURPackage
-        :param skip_depchecks: Flag to skip dependency checks. Default is False
-        :type skip_depchecks: bool
-        :param download_only: Flag download only (makepkg will still occur, packages will not be installed)
-        :type download_only bool
+        :param pacman_params: The parameters to pass to pacman when installing the built packages
+        :type pacman_params: list
+        :param profile: Optional build profile to apply to each 'makepkg' invocation. Default is None
+        :type profile: Optional[BuildProfile]
+        :param journal: Optional journal to record progress in. Packages it has already built are not rebuilt unless
+        their inputs changed. Default is None
+        :type journal: Optional[Journal]
+
+        :raises InstallError: If pacman fails to install the built packages or the transaction is declined
         """
 
-        from .utils import makepkg
+        from .utils import get_packagelist, makepkg
+
+        if journal is not None:
+            packages = [
+                pkg for pkg in packages if not journal.completed(pkg, "installed")
+            ]
+            if not packages:
+                return
 
+        asdeps = "--asdeps" in pacman_params
         targets = []
+        built_vcs = []
         for pkg in packages:
+            artifacts = journal.get_artifacts(pkg) if journal is not None else None
+            if artifacts is not None:
+                self.console.notify(
+                    f"Package already built, skipping build: [bright_cyan]{pkg.name}"
+                )
+                targets.extend(artifacts)
+                continue
+
+            self.wait_for_sources(pkg, journal=journal)
+            previous = get_build_times(pkg.name)
             if pacman_params.count("--nodeps") > 1:
-                makepkg(pkg, CACHEDIR, "fscd")
+                elapsed = makepkg(pkg, CACHEDIR, "fscd", profile, asdeps)
             else:
-                makepkg(pkg, CACHEDIR, "fsc")
+                elapsed = makepkg(pkg, CACHEDIR, "fsc", profile, asdeps)
+            self.report_build_time(pkg, elapsed, profile, previous)
 
-            pattern = f"{pkg.name}-"
-            for obj in os.listdir(os.path.join(CACHEDIR, pkg.name)):
-                if pattern in obj and obj.endswith("zst"):
-                    targets.append(os.path.join(CACHEDIR, pkg.name, obj))
+            artifacts = get_packagelist(pkg, CACHEDIR, profile)
+            targets.extend(artifacts)
 
-        subprocess.run(
-            shlex.split(f"sudo pacman {' '.join(pacman_params)} {' '.join(targets)}")
-        )
+            if journal is not None:
+                journal.mark_built(pkg, artifacts)
+
+            if get_vcs_sources(pkg.SRCINFO):
+                built_vcs.append(pkg)
+
+        return_code = run_transaction(pacman(*pacman_params, sudo=True), targets)
+
+        if return_code != 0:
+            raise InstallError(
+                f"error installing: {', '.join(pkg.name for pkg in packages)}-exit status {return_code}"
+            )
+
+        if journal is not None:
+            for pkg in packages:
+                journal.mark(pkg, "installed")
 
-    def clean_cachedir(self) -> None:
+        if built_vcs:
+            devel = DevelDB()
+            for pkg in built_vcs:
+                devel.update(pkg.name, pkg.SRCINFO)
+
+    def report_build_time(
+        self,
+        pkg: AURPackage,
+        elapsed: float,
+        profile: Optional[BuildProfile],
+        previous: dict[str, float],
+    ) -> None:
+        """
+        Report a build's wall time alongside the last build time of the same package under other profiles
+
+        :param pkg: The AURPackage that was built
+        :type pkg: AURPackage
+        :param elapsed: The wall time of the build in seconds
+        :type elapsed: float
+        :param profile: The build profile the package was built with
+        :type profile: Optional[BuildProfile]
+        :param previous: The last build times of the package keyed by profile name
+        :type previous: dict[str, float]
         """
-        Clean the cachedir
+        name = profile.name if profile is not None else "default"
+        message = f"Built [bright_cyan]{pkg.name}[/bright_cyan] in {elapsed:.1f}s (profile: {name})"
+        if previous:
+            last = ", ".join(
+                [f"{profile}: {seconds:.1f}s" for profile, seconds in previous.items()]
+            )
+            message = f"{message} [previous builds: {last}]"
+        self.console.notify(message)
+
+    def fetch_sources(self, *packages: AURPackage, max_workers: int = 4) -> None:
         """
-        os.chdir(CACHEDIR)
-        for obj in os.listdir():
-            shutil.rmtree(obj, ignore_errors=True)
+        Start downloading and verifying the sources of packages in the background so builds can overlap with
+        downloads. Use wait_for_sources before building a package.
 
-    def clean_untracked(self) -> None:
+        Packages whose sources are downloaded to the same file in SRCDEST are fetched one after another by the same
+        worker, so a shared source is only downloaded once and never written by two downloads at the same time.
+
+        :param packages: An AURPackage or series of AURPackage objects to fetch sources for
+        :type packages: AURPackage
+        :param max_workers: Optional parameter for the maximum number of concurrent downloads. Default is 4
+        :type max_workers: Optional[int]
         """
-        Clean package metadata out of cached package directories
+        from .utils import get_source_filenames, verifysource
+
+        def fetch_group(group: list[AURPackage]) -> list[AURPackage]:
+            return [pkg for pkg in group if verifysource(pkg, CACHEDIR) != 0]
+
+        os.makedirs(SRCDEST, exist_ok=True)
+
+        root = list(range(len(packages)))
+
+        def find(num: int) -> int:
+            while root[num] != num:
+                root[num] = root[root[num]]
+                num = root[num]
+            return num
+
+        owners = {}
+        for num, pkg in enumerate(packages):
+            for filename in get_source_filenames(pkg.SRCINFO):
+                if filename in owners:
+                    root[find(num)] = find(owners[filename])
+                else:
+                    owners[filename] = num
+
+        groups = {}
+        for num, pkg in enumerate(packages):
+            groups.setdefault(find(num), []).append(pkg)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        for group in groups.values():
+            future = executor.submit(fetch_group, group)
+            for pkg in group:
+                self.prefetched[pkg] = future
+        executor.shutdown(wait=False)
+
+    def wait_for_sources(
+        self, pkg: AURPackage, journal: Optional[Journal] = None
+    ) -> None:
+        """
+        Block until the prefetch of a package's sources (if any) has finished
+
+        :param pkg: The AURPackage to wait for
+        :type pkg: AURPackage
+        :param journal: Optional journal to record a successful prefetch in. Default is None
+        :type journal: Optional[Journal]
         """
-        os.chdir(CACHEDIR)
-        for obj in os.listdir():
-            if os.path.isdir(os.path.join(os.getcwd(), obj)):
-                os.chdir(os.path.join(os.getcwd(), obj))
-                for _ in os.listdir():
-                    if _.endswith(".tar.zst"):
-                        os.remove(_)
-                os.chdir("../")
+        future = self.prefetched.pop(pkg, None)
+        if future is None:
+            return
+
+        if pkg in future.result():
+            self.console.alert(
+                f"Failed to prefetch sources for {pkg.name}. makepkg will retry"
+            )
+        elif journal is not None:
+            journal.mark(pkg, "fetched")
 
     def get_pkgbuild(
         self, pkg: Package, clonedir: Optional[str] = CACHEDIR, force=False
@@ -190,18 +602,16 @@ class AUR:
         if force:
             shutil.rmtree(clonedir, ignore_errors=True)
 
-        subprocess.run(
-            shlex.split(
-                f"git clone https://aur.archlinux.org/{pkg.name}.git {clonedir}"
-            ),
+        run(
+            git("clone", f"{self.base_url}/{pkg.name}.git", clonedir),
             capture_output=True,
         )
 
     def refresh(self, force=False):
         def get_cache():
-            response = requests.get("https://aur.archlinux.org/packages.gz")
+            response = self.request("packages", self.packages_endpoint)
             content = response.content.decode().strip()
-            with open(os.path.join(CACHEDIR, "aur.cache"), "w") as f:
+            with open(os.path.join(make_cachedir(), "aur.cache"), "w") as f:
                 f.write(content)
 
         aur_cache = os.path.join(CACHEDIR, "aur.cache")
@@ -214,17 +624,29 @@ class AUR:
             return
 
         if force is True or last_modified.days >= 5:
-            get_cache()
+            try:
+                get_cache()
+            except AURError as err:
+                self.console.warn(f"{err}; keeping the cached AUR package list")
 
     def list(self):
-        response = requests.get("https://aur.archlinux.org/packages.gz")
-        packages = response.content.decode().strip().split("\n")
+        try:
+            response = self.request("packages", self.packages_endpoint)
+            content = response.content.decode()
+        except AURError as err:
+            try:
+                with open(os.path.join(CACHEDIR, "aur.cache"), "r") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                raise err
+            self.console.warn(f"{err}; using the cached AUR package list")
+        packages = content.strip().split("\n")
+
+        local = set(pkg.name for pkg in self.local.pkgcache)
 
         # Rich takes too long to render these data. Might work to find a workaround in the future.
         for pkg in packages:
-            installed = False
-            if self.local.get_pkg(pkg):
-                installed = True
+            installed = pkg in local
             if self.console.color_system is not None:
                 pkg = f"\u001b[34;1maur\033[0m {pkg}\033[92m unknown-version\033[0m"
                 if installed is True:
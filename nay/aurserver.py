@@ -0,0 +1,454 @@
+"""
+A stand-in for aur.archlinux.org serving packages from a fixture directory, for deterministic tests and load tests.
+
+Each subdirectory of the fixture directory holding a .SRCINFO is a package base. The server answers AURweb RPC v5
+search and info queries from the .SRCINFO files, serves the package list dumps and serves each package base as a git
+repository over git's dumb HTTP protocol, so 'git clone <url>/<pkgbase>.git' works. An optional 'info.json' in the
+fixture directory (a list of RPC info results) adds packages without build files.
+
+Latency, rate limiting and error injection can be configured to see how nay behaves against a slow or failing AUR:
+
+    python -m nay.aurserver FIXTURES [--port 8080] [--latency 0.2] [--jitter 0.1] [--rate-limit 10] [--error-rate 0.05]
+    NAY_AUR_URL=http://127.0.0.1:8080 nay -Ss foo
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .command import git
+
+# Keys of an info result which are lists, keyed by their .SRCINFO name
+SRCINFO_LISTS = {
+    "depends": "Depends",
+    "makedepends": "MakeDepends",
+    "checkdepends": "CheckDepends",
+    "optdepends": "OptDepends",
+    "conflicts": "Conflicts",
+    "provides": "Provides",
+    "replaces": "Replaces",
+    "groups": "Groups",
+    "license": "License",
+}
+
+# Keys of an info result which are left out of search results
+INFO_ONLY = (*SRCINFO_LISTS.values(), "Keywords", "CoMaintainers", "Submitter")
+
+# The AURweb RPC interface refuses searches matching more packages than this
+MAX_RESULTS = 5000
+
+
+def parse_srcinfo(text: str, pkgbase_id: int = 0) -> list[dict]:
+    """
+    Build RPC info results from a .SRCINFO file. Architecture-specific keys (e.g. depends_x86_64) are merged into the
+    generic ones.
+
+    :param text: The contents of the .SRCINFO file
+    :type text: str
+    :param pkgbase_id: Optional ID of the package base. Default is 0
+    :type pkgbase_id: int
+
+    :return: One info result for each package of the package base
+    :rtype: list[dict]
+    """
+    base = {}
+    packages = []
+    current = base
+    for line in text.splitlines():
+        key, sep, value = (part.strip() for part in line.partition("="))
+        if not sep:
+            continue
+        if key.split("_", 1)[0] in SRCINFO_LISTS:
+            key = key.split("_", 1)[0]
+        if key == "pkgname":
+            current = {"pkgname": [value]}
+            packages.append(current)
+            continue
+        values = current.setdefault(key, [])
+        # An empty value in a package section clears the package base's value
+        if value:
+            values.append(value)
+
+    def get(fields: dict, key: str) -> Optional[str]:
+        values = fields.get(key, base.get(key))
+        return values[0] if values else None
+
+    version = f"{get(base, 'pkgver')}-{get(base, 'pkgrel')}"
+    if get(base, "epoch"):
+        version = f"{get(base, 'epoch')}:{version}"
+
+    pkgbase = get(base, "pkgbase")
+    results = []
+    for fields in packages:
+        name = fields["pkgname"][0]
+        result = {
+            "ID": pkgbase_id,
+            "Name": name,
+            "PackageBaseID": pkgbase_id,
+            "PackageBase": pkgbase,
+            "Version": version,
+            "Description": get(fields, "pkgdesc"),
+            "URL": get(fields, "url"),
+            "NumVotes": 0,
+            "Popularity": 0,
+            "OutOfDate": None,
+            "Maintainer": "aurserver",
+            "FirstSubmitted": 0,
+            "LastModified": 0,
+            "URLPath": f"/cgit/aur.git/snapshot/{pkgbase}.tar.gz",
+            "Keywords": [],
+        }
+        for key, rpc_key in SRCINFO_LISTS.items():
+            result[rpc_key] = fields.get(key, base.get(key, []))
+        results.append(result)
+
+    return results
+
+
+class Fixtures:
+    """
+    The packages served by AURServer
+
+    :param path: The fixture directory
+    :type path: str
+    :param repodir: The directory to create the bare git repositories in
+    :type repodir: str
+    """
+
+    def __init__(self, path: str, repodir: str) -> None:
+        self.info = {}
+        self.repos = {}
+
+        info = os.path.join(path, "info.json")
+        if os.path.exists(info):
+            with open(info) as f:
+                for result in json.load(f):
+                    self.info[result["Name"]] = result
+
+        for num, entry in enumerate(sorted(os.scandir(path), key=lambda e: e.name)):
+            srcinfo = os.path.join(entry.path, ".SRCINFO")
+            if not os.path.exists(srcinfo):
+                continue
+            with open(srcinfo) as f:
+                for result in parse_srcinfo(f.read(), pkgbase_id=num + 1):
+                    self.info[result["Name"]] = result
+            self.repos[entry.name] = make_repo(
+                entry.path, os.path.join(repodir, f"{entry.name}.git")
+            )
+
+    def search(self, query: str, by: str = "name-desc") -> list[dict]:
+        results = []
+        for result in self.info.values():
+            if by == "name":
+                fields = [result["Name"]]
+            else:
+                fields = [result["Name"], result["Description"] or ""]
+            if any(query.lower() in field.lower() for field in fields):
+                results.append(
+                    {
+                        key: value
+                        for key, value in result.items()
+                        if key not in INFO_ONLY
+                    }
+                )
+
+        return results
+
+
+def make_repo(worktree: str, path: str) -> str:
+    """
+    Commit the files of a package base to a bare repository which can be served over git's dumb HTTP protocol
+
+    :param worktree: The directory holding the PKGBUILD and .SRCINFO
+    :type worktree: str
+    :param path: The path of the bare repository
+    :type path: str
+
+    :return: The path of the bare repository
+    :rtype: str
+    """
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="aurserver",
+        GIT_AUTHOR_EMAIL="aurserver@localhost",
+        GIT_COMMITTER_NAME="aurserver",
+        GIT_COMMITTER_EMAIL="aurserver@localhost",
+    )
+    repo = ["--git-dir", path, "--work-tree", worktree]
+    for command in (
+        git("init", "--quiet", "--bare", "--initial-branch", "master", path),
+        git(*repo, "add", "--all"),
+        git(*repo, "commit", "--quiet", "--message", "Import fixture"),
+        git("--git-dir", path, "update-server-info"),
+    ):
+        subprocess.run(command, env=env, check=True, capture_output=True)
+
+    return path
+
+
+class AURServer(ThreadingHTTPServer):
+    """
+    An HTTP server standing in for aur.archlinux.org
+
+    :param fixtures: The fixture directory
+    :type fixtures: str
+    :param address: Optional address to listen on. Default is 127.0.0.1 on a free port
+    :type address: Optional[tuple[str, int]]
+    :param latency: Optional number of seconds every response is delayed by. Default is 0
+    :type latency: Optional[float]
+    :param jitter: Optional maximum number of seconds added to the latency at random. Default is 0
+    :type jitter: Optional[float]
+    :param rate_limit: Optional number of requests per second answered before responding with 429. Default is None
+    :type rate_limit: Optional[float]
+    :param error_rate: Optional fraction of requests answered with 503. Default is 0
+    :type error_rate: Optional[float]
+    :param seed: Optional seed for the jitter and error injection. Default is None
+    :type seed: Optional[int]
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        fixtures: str,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0,
+        jitter: float = 0,
+        rate_limit: Optional[float] = None,
+        error_rate: float = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.repodir = tempfile.mkdtemp(prefix="nay-aurserver-")
+        self.fixtures = Fixtures(fixtures, self.repodir)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = (0, 0)
+        self.requests = {}
+        self.thread = None
+        super().__init__(address, Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AURServer":
+        """
+        Serve requests on a background thread
+
+        :return: The server
+        :rtype: AURServer
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def server_close(self) -> None:
+        super().server_close()
+        shutil.rmtree(self.repodir, ignore_errors=True)
+
+    def __exit__(self, *args) -> None:
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join()
+        super().__exit__(*args)
+
+    def inject(self, endpoint: str) -> Optional[int]:
+        """
+        Count a request and apply the configured latency, rate limit and error rate
+
+        :param endpoint: The endpoint requested, e.g. 'info'
+        :type endpoint: str
+
+        :return: The status code to fail the request with, or None to serve it
+        :rtype: Optional[int]
+        """
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = self.random.random() < self.error_rate
+
+            throttled = False
+            if self.rate_limit is not None:
+                second = int(time.monotonic())
+                start, count = self.window
+                if start != second:
+                    start, count = second, 0
+                count += 1
+                self.window = (start, count)
+                throttled = count > self.rate_limit
+
+        if delay:
+            time.sleep(delay)
+        if throttled:
+            return 429
+        if fail:
+            return 503
+
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: AURServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") == "/rpc":
+            self.handle_rpc(parse_qs(url.query))
+        elif url.path == "/packages.gz":
+            self.handle_dump("packages", "\n".join(self.server.fixtures.info).encode())
+        elif url.path == "/packages-meta-v1.json.gz":
+            data = json.dumps(list(self.server.fixtures.info.values())).encode()
+            self.handle_dump("packages-meta", data)
+        elif ".git/" in url.path:
+            self.handle_git(url.path.lstrip("/"))
+        else:
+            self.send_error(404)
+
+    def handle_rpc(self, query: dict[str, list[str]]) -> None:
+        kind = query.get("type", [""])[0]
+        status = self.server.inject(kind or "rpc")
+        if status is not None:
+            self.send_json(
+                {"version": 5, "type": "error", "resultcount": 0, "results": []},
+                status,
+            )
+            return
+
+        fixtures = self.server.fixtures
+        if kind == "search":
+            arg = query.get("arg", [""])[0]
+            if len(arg) < 2:
+                self.send_rpc_error("Query arg too small.")
+                return
+            results = fixtures.search(arg, query.get("by", ["name-desc"])[0])
+            if len(results) > MAX_RESULTS:
+                self.send_rpc_error("Too many package results.")
+                return
+        elif kind in ("info", "multiinfo"):
+            names = query.get("arg[]", []) + query.get("arg", [])
+            results = [fixtures.info[name] for name in names if name in fixtures.info]
+        else:
+            self.send_rpc_error("Incorrect request type specified.")
+            return
+
+        self.send_json(
+            {
+                "version": 5,
+                "type": "multiinfo" if kind == "info" else kind,
+                "resultcount": len(results),
+                "results": results,
+            }
+        )
+
+    def handle_dump(self, endpoint: str, data: bytes) -> None:
+        status = self.server.inject(endpoint)
+        if status is not None:
+            self.send_error(status)
+            return
+
+        # Served compressed, like aur.archlinux.org. HTTP clients decompress it transparently
+        body = gzip.compress(data)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_git(self, path: str) -> None:
+        name, _, rest = path.partition(".git/")
+        repo = self.server.fixtures.repos.get(name)
+        if repo is None:
+            self.send_error(404)
+            return
+
+        status = self.server.inject("git")
+        if status is not None:
+            self.send_error(status)
+            return
+
+        # Dumb HTTP: the client fetches refs, packs and loose objects as plain files
+        repo = os.path.realpath(repo)
+        file = os.path.realpath(os.path.join(repo, rest))
+        if not file.startswith(f"{repo}{os.sep}") or not os.path.isfile(file):
+            self.send_error(404)
+            return
+
+        with open(file, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_rpc_error(self, message: str) -> None:
+        self.send_json(
+            {
+                "version": 5,
+                "type": "error",
+                "resultcount": 0,
+                "results": [],
+                "error": message,
+            }
+        )
+
+    def send_json(self, data: dict, status: int = 200) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures", help="directory of package bases")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0, help="seconds")
+    parser.add_argument("--rate-limit", type=float, help="requests per second")
+    parser.add_argument("--error-rate", type=float, default=0, help="0 to 1")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    with AURServer(
+        args.fixtures,
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ) as server:
+        print(f"Serving {args.fixtures} on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
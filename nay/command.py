@@ -0,0 +1,167 @@
+import os
+import subprocess
+from typing import Iterable, Iterator, Optional
+
+from .exceptions import ArgumentListError
+from .tracing import span
+
+# Size of a pointer in the argv/envp arrays the kernel copies along with the strings themselves
+POINTER_SIZE = 8
+
+# Bytes kept free below ARG_MAX for anything added on the way to the final process (e.g. by sudo)
+ARG_MAX_HEADROOM = 4096
+
+
+def pacman(*args: str, sudo: bool = False) -> list[str]:
+    """
+    Build a 'pacman' command
+
+    :param args: The arguments to pass to pacman
+    :type args: str
+    :param sudo: Optional parameter indicating whether pacman should be run as root. Default is False
+    :type sudo: Optional[bool]
+
+    :return: The command as an argument list
+    :rtype: list[str]
+    """
+    argv = ["pacman", *args]
+    if sudo is True:
+        argv.insert(0, "sudo")
+
+    return argv
+
+
+def makepkg(*args: str) -> list[str]:
+    return ["makepkg", *args]
+
+
+def git(*args: str) -> list[str]:
+    return ["git", *args]
+
+
+def get_arg_max(env: Optional[dict[str, str]] = None) -> int:
+    """
+    Get the space available for command line arguments. The kernel limit (ARG_MAX) is shared with the environment.
+
+    :param env: Optional environment the command will run with. Default is the current environment
+    :type env: Optional[dict[str, str]]
+
+    :return: The number of bytes available for the argument list
+    :rtype: int
+    """
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (ValueError, OSError):
+        arg_max = 128 * 1024
+
+    env = os.environ if env is None else env
+    env_size = sum(get_arg_size(f"{key}={value}") for key, value in env.items())
+
+    return arg_max - env_size - ARG_MAX_HEADROOM
+
+
+def get_arg_size(arg: str) -> int:
+    return len(os.fsencode(arg)) + 1 + POINTER_SIZE
+
+
+def batch(
+    argv: list[str], targets: Iterable[str], arg_max: Optional[int] = None
+) -> Iterator[list[str]]:
+    """
+    Split a command over as few invocations as possible so that each one fits within ARG_MAX
+
+    :param argv: The command, without targets
+    :type argv: list[str]
+    :param targets: The targets to append to the command
+    :type targets: Iterable[str]
+    :param arg_max: Optional number of bytes available for the argument list. Default is get_arg_max()
+    :type arg_max: Optional[int]
+
+    :return: An iterator of commands. The command is yielded once without targets if there are none
+    :rtype: Iterator[list[str]]
+    """
+    if arg_max is None:
+        arg_max = get_arg_max()
+
+    base = sum(get_arg_size(arg) for arg in argv)
+    current = []
+    size = base
+    batched = False
+    for target in targets:
+        target_size = get_arg_size(target)
+        if current and size + target_size > arg_max:
+            yield [*argv, *current]
+            batched = True
+            current = []
+            size = base
+        current.append(target)
+        size += target_size
+
+    if current or batched is False:
+        yield [*argv, *current]
+
+
+def run(argv: list[str], **kwargs) -> int:
+    """
+    Run a command
+
+    :param argv: The command as an argument list
+    :type argv: list[str]
+    :param kwargs: Keyword arguments passed on to subprocess.run
+
+    :return: The exit status of the command
+    :rtype: int
+    """
+    name = argv[1] if argv[0] == "sudo" else argv[0]
+    with span(name, argv=argv):
+        return subprocess.run(argv, **kwargs).returncode
+
+
+def run_transaction(argv: list[str], targets: Iterable[str], **kwargs) -> int:
+    """
+    Run a command for a list of targets in a single invocation. Used for pacman transactions (-S, -U, -R), which must
+    never be split: pacman checks the dependencies of the transaction as a whole, so a split transaction can fail
+    part-way and leave the system half-changed.
+
+    :param argv: The command, without targets
+    :type argv: list[str]
+    :param targets: The targets to append to the command
+    :type targets: Iterable[str]
+    :param kwargs: Keyword arguments passed on to subprocess.run
+
+    :return: The exit status of the command
+    :rtype: int
+
+    :raises ArgumentListError: If the targets don't fit within ARG_MAX
+    """
+    command = [*argv, *targets]
+    size = sum(get_arg_size(arg) for arg in command)
+    if size > get_arg_max(kwargs.get("env")):
+        raise ArgumentListError(
+            f"error: {len(command) - len(argv)} targets exceed the argument size limit of a single pacman transaction"
+        )
+
+    return run(command, **kwargs)
+
+
+def run_batched(argv: list[str], targets: Iterable[str], **kwargs) -> int:
+    """
+    Run a command for a list of targets, split over as few invocations as ARG_MAX allows. Stops at the first
+    invocation that fails. Only for commands which don't change the system as a whole, e.g. queries; use
+    run_transaction for pacman transactions.
+
+    :param argv: The command, without targets
+    :type argv: list[str]
+    :param targets: The targets to append to the command
+    :type targets: Iterable[str]
+    :param kwargs: Keyword arguments passed on to subprocess.run
+
+    :return: The exit status of the first failed invocation, or 0 if all of them succeeded
+    :rtype: int
+    """
+    for command in batch(argv, targets, get_arg_max(kwargs.get("env"))):
+        return_code = run(command, **kwargs)
+        if return_code != 0:
+            return return_code
+
+    return 0
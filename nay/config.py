@@ -1,6 +1,44 @@
+import configparser
 import os
 
 CACHEDIR = f"{os.path.expanduser('~')}/.cache/nay"
+SRCDEST = os.path.join(CACHEDIR, "sources")
+CONFIG = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")),
+    "nay",
+    "nay.conf",
+)
 
-if os.path.exists(CACHEDIR) is False:
-    os.mkdir(CACHEDIR)
+AUR_URL = "https://aur.archlinux.org"
+
+
+def get_aur_url(config: str = CONFIG) -> str:
+    """
+    Get the base URL of the AUR. The NAY_AUR_URL environment variable takes precedence over the 'AURURL' key of the
+    '[options]' section of nay.conf, e.g. to point nay at a mirror or a local nay.aurserver.
+
+    :param config: Optional path to nay.conf
+    :type config: Optional[str]
+
+    :return: The base URL, without a trailing slash
+    :rtype: str
+    """
+    url = os.environ.get("NAY_AUR_URL")
+    if not url:
+        parser = configparser.ConfigParser()
+        parser.read(config)
+        url = parser.get("options", "aururl", fallback=AUR_URL)
+
+    return url.rstrip("/")
+
+
+def make_cachedir() -> str:
+    """
+    Create the cache directory if it does not exist yet. This is done on demand rather than on import so operations
+    which never touch the cache (e.g. pure pacman wrappers) don't pay for it.
+
+    :return: The path to the cache directory
+    :rtype: str
+    """
+    os.makedirs(CACHEDIR, exist_ok=True)
+    return CACHEDIR
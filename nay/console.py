@@ -1,13 +1,15 @@
 import re
 import sys
-from typing import Optional, Union
+from datetime import datetime
+from typing import Optional, TextIO, Union
 
 from rich.console import Console, Group
 from rich.text import Text
 from rich.theme import Theme
 from . import __version__
 
-from .package import AURBasic, AURPackage, SyncPackage
+from .package import AURPackage, SyncPackage
+from .results import NOT_INSTALLED, OUTDATED, UP_TO_DATE, SearchResults
 
 THEME_DEFAULT = Theme(
     {
@@ -24,6 +26,7 @@ THEME_DEFAULT = Theme(
         "pkg": "cyan",
         "orphan": "bright_red",
         "installed_status": "bright_green",
+        "outdated_status": "bright_yellow",
     },
     inherit=False,
 )
@@ -77,75 +80,58 @@ class NayConsole(Console):
 
     def print_packages(
         self,
-        packages: dict[int, Union[SyncPackage, AURBasic]],
-        local: "pyalpm.Database",
+        packages: SearchResults,
         include_num: Optional[bool] = False,
     ):
-        def get_size(pkg):
-            return Text(f"{pkg.size}")
+        if self.color_system is None or not self.is_terminal:
+            self.write_packages(packages, include_num=include_num)
+            return
 
-        def get_isize(pkg):
-            return Text(f"{pkg.isize}")
-
-        def get_votes(pkg):
-            return Text(f"{pkg.votes}")
-
-        def get_popularity(pkg):
-            return Text("{:.2f}".format(pkg.popularity))
-
-        def get_orphan(pkg):
-            return Text("(Orphaned) ", style="orphan") if pkg.orphaned else Text("")
-
-        def get_flag_date(pkg):
-            return (
-                Text(f"(Out-of-date): {pkg.flag_date.strftime('%Y-%m-%d')}")
-                if pkg.flag_date
-                else Text("")
-            )
+        def get_installed_status(row):
+            status = packages.status[row]
+            local = packages.get_installed_version(row)
+            if status == UP_TO_DATE:
+                return Text(
+                    f"(Installed: {local}, up-to-date) ", style="installed_status"
+                )
+            if status == OUTDATED:
+                return Text(f"(Installed: {local}, outdated) ", style="outdated_status")
+            return Text(f"(Installed: {local}) ", style="installed_status")
 
         render_result = []
 
-        for num in packages:
-            pkg = packages[num]
+        for num, row in packages.rows():
+            db = packages.get_string("db", row)
 
             renderable = Text.assemble(
                 Text(
-                    pkg.db,
-                    style=pkg.db
-                    if pkg.db in THEME_DEFAULT.styles.keys()
-                    else "other_db",
+                    db,
+                    style=db if db in THEME_DEFAULT.styles.keys() else "other_db",
                 ),
                 Text("/"),
-                Text(f"{pkg.name} "),
-                Text(f"{pkg.version} ", style="pkg"),
+                Text(f"{packages.get_string('name', row)} "),
+                Text(f"{packages.get_string('version', row)} ", style="pkg"),
             )
 
-            if isinstance(pkg, SyncPackage):
-                renderable.append_text(Text(f"({get_size(pkg)} "))
-                renderable.append_text(Text(f"{get_isize(pkg)}) "))
-                local_pkg = local.get_pkg(pkg.name)
-                if local_pkg:
-                    renderable.append_text(
-                        Text(
-                            f"(Installed: {pkg.version}) ",
-                            style="installed_status",
-                        )
-                    )
+            if not packages.is_aur(row):
+                size = SyncPackage.format_bytes(packages.size[row])
+                isize = SyncPackage.format_bytes(packages.isize[row])
+                renderable.append_text(Text(f"({size} {isize}) "))
 
-            elif isinstance(pkg, AURBasic):
+            else:
                 renderable.append_text(
-                    Text(f"(+{get_votes(pkg)} {get_popularity(pkg)}) ")
+                    Text(f"(+{packages.votes[row]} {packages.popularity[row]:.2f}) ")
                 )
-                local_pkg = local.get_pkg(pkg.name)
-                if local_pkg:
+                if packages.orphaned[row]:
+                    renderable.append_text(Text("(Orphaned) ", style="orphan"))
+                if packages.flag_date[row]:
+                    flag_date = datetime.fromtimestamp(packages.flag_date[row])
                     renderable.append_text(
-                        Text(
-                            f"(Installed: {pkg.version}) ",
-                            style="installed_status",
-                        )
+                        Text(f"(Out-of-date): {flag_date.strftime('%Y-%m-%d')}")
                     )
-                renderable.append_text(get_orphan(pkg))
-                renderable.append_text(get_flag_date(pkg))
+
+            if packages.status[row] != NOT_INSTALLED:
+                renderable.append_text(get_installed_status(row))
 
             if include_num is True:
                 num = Text(f"{num} ")
@@ -153,8 +139,9 @@ class NayConsole(Console):
                 num.append_text(renderable)
                 renderable = num
 
-            if pkg.desc:
-                renderable = Text("\n    ").join([renderable, Text(pkg.desc)])
+            desc = packages.get_string("desc", row)
+            if desc:
+                renderable = Text("\n    ").join([renderable, Text(desc)])
 
             render_result.append(renderable)
 
@@ -162,9 +149,117 @@ class NayConsole(Console):
 
         self.print(render_result)
 
-    def print_pkginfo(self, *packages: AURPackage) -> None:
+    def write_packages(
+        self,
+        packages: SearchResults,
+        include_num: Optional[bool] = False,
+        file: Optional[TextIO] = None,
+    ) -> None:
+        """
+        Write search results in the plain line format of 'pacman -Ss' without going through Rich. Used when output is
+        not a terminal or colors are disabled, so scripts parsing pacman's output can parse nay's too.
+
+        :param packages: The search results to write
+        :type packages: SearchResults
+        :param include_num: Optional parameter indicating whether packages should be numbered. Default is False
+        :type include_num: Optional[bool]
+        :param file: Optional stream to write to. Default is the console's file
+        :type file: Optional[TextIO]
+        """
+        if file is None:
+            file = self.file
+
+        strings = packages.strings
+        lines = []
+        for num, row in packages.rows():
+            line = f"{strings[packages.db[row]]}/{strings[packages.name[row]]} {strings[packages.version[row]]}"
+            if include_num is True:
+                line = f"{num} {line}"
+
+            # The same line as 'pacman -Ss'. Sizes, votes and the like are available through --format
+            status = packages.status[row]
+            if status == UP_TO_DATE:
+                line = f"{line} [installed]"
+            elif status != NOT_INSTALLED:
+                line = f"{line} [installed: {strings[packages.installed[row]]}]"
+
+            lines.append(line)
+            desc = strings[packages.desc[row]]
+            if desc:
+                lines.append(f"    {desc}")
+
+        if lines:
+            lines.append("")
+        file.write("\n".join(lines))
+        file.flush()
+
+    def print_pkginfo(self, *packages: Union[SyncPackage, AURPackage]) -> None:
         group = Group(*[pkg.info for pkg in packages])
         self.print(group)
 
+    def print_timings(self, rows: list[tuple[int, str, int, float]]) -> None:
+        """
+        Print a summary tree of timing spans
+
+        :param rows: The rows of the summary as returned by tracing.Tracer.summary: depth, name, count and seconds
+        :type rows: list[tuple[int, str, int, float]]
+        """
+        from rich.table import Column, Table
+
+        table = Table.grid(
+            Column("name"),
+            Column("count", justify="right"),
+            Column("time", justify="right"),
+            padding=(0, 1, 0, 1),
+        )
+        for depth, name, count, seconds in rows:
+            table.add_row(
+                f"{'  ' * depth}{name}", f"{count}x", f"{seconds * 1000:.1f}ms"
+            )
+
+        self.notify("Timings")
+        self.print(table, highlight=False)
+
+    def print_metrics(self, metrics: dict[str, dict]) -> None:
+        """
+        Print the AUR traffic of a run
+
+        :param metrics: The metrics of each endpoint as returned by metrics.Metrics.to_dict
+        :type metrics: dict[str, dict]
+        """
+        from rich.table import Column, Table
+
+        if not metrics:
+            return
+
+        table = Table(
+            Column("endpoint"),
+            Column("requests", justify="right"),
+            Column("errors", justify="right"),
+            Column("retries", justify="right"),
+            Column("received", justify="right"),
+            Column("hits", justify="right"),
+            Column("misses", justify="right"),
+            Column("mean", justify="right"),
+            Column("max", justify="right"),
+            box=None,
+        )
+        for endpoint, data in metrics.items():
+            mean = data["seconds"] / data["requests"] if data["requests"] else 0
+            table.add_row(
+                endpoint,
+                str(data["requests"]),
+                str(data["errors"]),
+                str(data["retries"]),
+                SyncPackage.format_bytes(data["bytes"]),
+                str(data["cache_hits"]),
+                str(data["cache_misses"]),
+                f"{mean * 1000:.1f}ms",
+                f"{data['max_seconds'] * 1000:.1f}ms",
+            )
+
+        self.notify("AUR requests")
+        self.print(table, highlight=False)
+
     def print_version(self):
         self.print(f"nay {__version__}")
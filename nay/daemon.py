@@ -0,0 +1,277 @@
+import io
+import json
+import os
+import socket
+import sys
+from typing import TYPE_CHECKING, Optional
+
+from .config import CACHEDIR
+
+if TYPE_CHECKING:
+    from .operations import Operation
+
+SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", CACHEDIR), "nay.sock")
+
+# Seconds a client waits for the daemon to accept a connection before running the operation itself
+CONNECT_TIMEOUT = 0.5
+
+# The cached properties of an Operation which are shared between requests
+CONTEXT = ("pacman_conf", "handle", "local", "sync")
+
+# Options of the operations the daemon serves
+FORWARDED = ("-s", "--search", "-i", "--info")
+
+# Options which are handled by the client process. Requests using them are run in-process
+LOCAL_OPTIONS = (
+    "--timings",
+    "--trace-file",
+    "--metrics-file",
+    "--profile",
+    "--profile-output",
+)
+
+# Options which need root, a TTY or change the system. Requests using them are never served by the daemon
+DECLINED_PARAMS = ("--refresh", "--sysupgrade", "--clean", "--list")
+
+
+def get_color_system() -> Optional[str]:
+    """
+    Get the color system the client's terminal supports, the way Rich would detect it
+
+    :return: The color system, or None if stdout is not a terminal or colors are disabled
+    :rtype: Optional[str]
+    """
+    if not sys.stdout.isatty() or "NO_COLOR" in os.environ:
+        return None
+
+    if os.environ.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256color" in os.environ.get("TERM", ""):
+        return "256"
+
+    return "standard"
+
+
+def forward(argv: list[str], path: str = SOCKET) -> Optional[int]:
+    """
+    Forward a read-only sync operation (-Ss, -Si) to a running daemon and write its output
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+    :param path: Optional path to the daemon's socket. Default is SOCKET
+    :type path: Optional[str]
+
+    :return: The exit status of the operation, or None if no daemon is running or it declined the request. The caller
+    then runs the operation itself
+    :rtype: Optional[int]
+    """
+    from .fastpath import get_operation, has_option
+
+    if get_operation(argv) != "sync" or not has_option(argv, *FORWARDED):
+        return None
+    if has_option(argv, *LOCAL_OPTIONS):
+        return None
+    if not os.path.exists(path):
+        return None
+
+    try:
+        width = os.get_terminal_size().columns
+    except OSError:
+        width = 80
+
+    request = {"argv": argv, "color_system": get_color_system(), "width": width}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(None)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as f:
+                response = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if response.get("declined") is True:
+        return None
+
+    sys.stderr.write(response["stderr"])
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+
+    return response["status"]
+
+
+class Daemon:
+    """
+    Serve read-only sync operations (-Ss, -Si) from a warm context. The pacman config, pyalpm handle and databases are
+    loaded once and AUR results are cached for 'ttl' seconds. The databases are reloaded when pacman changes them.
+
+    :param context: The operation whose handle and databases are shared between requests
+    :type context: Operation
+    :param ttl: Optional number of seconds AURweb RPC results are cached. Default is 300
+    :type ttl: Optional[int]
+    """
+
+    def __init__(self, context: "Operation", ttl: int = 300) -> None:
+        from .aur import ResponseCache
+        from .ratelimit import Throttle
+
+        self.context = context
+        self.cache = ResponseCache(ttl)
+        # One throttle for every request, so the rate limit and circuit breaker outlive a single client
+        self.throttle = Throttle()
+        self.mtimes = self.get_db_mtimes()
+
+    def get_db_mtimes(self) -> dict[str, int]:
+        """
+        Get the modification times of the local database and each sync database file
+
+        :return: A mapping of path to modification time in nanoseconds
+        :rtype: dict[str, int]
+        """
+        mtimes = {}
+        local = os.path.join(self.context.dbpath, "local")
+        try:
+            mtimes[local] = os.stat(local).st_mtime_ns
+            with os.scandir(os.path.join(self.context.dbpath, "sync")) as entries:
+                for entry in entries:
+                    mtimes[entry.path] = entry.stat().st_mtime_ns
+        except OSError:
+            pass
+
+        return mtimes
+
+    def reload_if_changed(self) -> None:
+        mtimes = self.get_db_mtimes()
+        if mtimes == self.mtimes:
+            return
+
+        self.mtimes = mtimes
+        for name in CONTEXT:
+            self.context.__dict__.pop(name, None)
+
+    def handle(self, request: dict) -> dict:
+        """
+        Run a forwarded operation
+
+        :param request: The client's command line, color system and terminal width
+        :type request: dict
+
+        :return: The operation's stdout, stderr and exit status, or {'declined': True} if the client should run the
+        operation itself
+        :rtype: dict
+        """
+        from .args import OperationParams
+        from .aur import AUR
+        from .console import NayConsole, THEME_DEFAULT
+        from .exceptions import (
+            AURError,
+            ConfigReadError,
+            HandleCreateError,
+            MissingTargets,
+        )
+        from .sync import Sync
+
+        declined = {"declined": True}
+        try:
+            params = OperationParams(request["argv"])
+        except SystemExit:
+            # Let the client report usage errors itself
+            return declined
+
+        kwargs = params["kwargs"]
+        if params["op_cls"] is not Sync or not kwargs["targets"]:
+            return declined
+        if not any(
+            param in kwargs["pacman_params"] for param in ("--search", "--info")
+        ):
+            return declined
+        if any(param in kwargs["pacman_params"] for param in DECLINED_PARAMS):
+            return declined
+        if (kwargs["dbpath"], kwargs["root"], kwargs["config"]) != (
+            self.context.dbpath,
+            self.context.root,
+            self.context.config,
+        ):
+            return declined
+
+        self.reload_if_changed()
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        color_system = request["color_system"]
+        if kwargs["console"].color_system is None:
+            color_system = None
+        kwargs["console"] = NayConsole(
+            file=stderr if kwargs["output_format"] is not None else stdout,
+            theme=THEME_DEFAULT,
+            color_system=color_system,
+            force_terminal=color_system is not None,
+            width=request["width"],
+        )
+        kwargs["output"] = stdout
+
+        operation = Sync(**kwargs)
+        # Operation keeps its context in cached properties; seed them with the warm ones
+        for name in CONTEXT:
+            operation.__dict__[name] = getattr(self.context, name)
+        operation.__dict__["aur"] = AUR(
+            operation.local, operation.console, cache=self.cache, throttle=self.throttle
+        )
+
+        status = 0
+        try:
+            operation.run()
+        except (HandleCreateError, ConfigReadError, MissingTargets, AURError) as err:
+            operation.console.warn(str(err))
+            status = 1
+        except SystemExit as err:
+            status = err.code if isinstance(err.code, int) else 0
+
+        return {
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "status": status,
+        }
+
+    def serve(self, path: str = SOCKET) -> None:
+        """
+        Serve requests on a Unix socket until interrupted. The socket is only accessible by the current user.
+
+        :param path: Optional path to the socket. Default is SOCKET
+        :type path: Optional[str]
+        """
+        import socketserver
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                try:
+                    request = json.loads(self.rfile.readline())
+                except ValueError:
+                    return
+                self.wfile.write(json.dumps(daemon.handle(request)).encode())
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        umask = os.umask(0o177)
+        try:
+            server = socketserver.UnixStreamServer(path, Handler)
+        finally:
+            os.umask(umask)
+
+        self.context.console.notify(f"Serving on {path}")
+        # Load the package caches before the first request
+        for db in [self.context.local, *self.context.sync.values()]:
+            db.pkgcache
+        with server:
+            try:
+                server.serve_forever()
+            finally:
+                os.remove(path)
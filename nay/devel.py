@@ -0,0 +1,249 @@
+import concurrent.futures
+import json
+import os
+import subprocess
+import threading
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+from .command import git
+from .config import CACHEDIR
+from .utils import get_source_filename, get_sources, get_srcdest, read_sources
+
+DEVELDB = os.path.join(CACHEDIR, "devel.json")
+
+
+def get_vcs_sources(srcinfo: str) -> dict[str, str]:
+    """
+    Get the git sources of a package and the ref each one tracks
+
+    :param srcinfo: The path to the package's .SRCINFO file
+    :type srcinfo: str
+
+    :return: A mapping of remote URL to ref ('HEAD', 'refs/heads/<branch>' or 'refs/tags/<tag>'). Sources pinned to a
+    commit are left out since they never move
+    :rtype: dict[str, str]
+    """
+    sources = {}
+    for source in get_sources(srcinfo):
+        if not source.startswith("git+"):
+            continue
+
+        url, _, fragment = source[4:].partition("#")
+        url = url.split("?", 1)[0]
+        kind, _, value = fragment.partition("=")
+        if kind == "branch":
+            sources[url] = f"refs/heads/{value}"
+        elif kind == "tag":
+            sources[url] = f"refs/tags/{value}"
+        elif kind == "":
+            sources[url] = "HEAD"
+
+    return sources
+
+
+def get_vcs_clones(srcinfo: str) -> dict[str, str]:
+    """
+    Get the name of the clone makepkg keeps of each git source in SRCDEST. Sources pinned to a commit are left out, as
+    in get_vcs_sources
+
+    :param srcinfo: The path to the package's .SRCINFO file
+    :type srcinfo: str
+
+    :return: A mapping of remote URL to the name of its clone in SRCDEST
+    :rtype: dict[str, str]
+    """
+    clones = {}
+    for source in read_sources(srcinfo):
+        url = source.split("::", 1)[-1]
+        if not url.startswith("git+"):
+            continue
+
+        url, _, fragment = url[4:].partition("#")
+        if not fragment.startswith("commit="):
+            clones.setdefault(url.split("?", 1)[0], get_source_filename(source))
+
+    return clones
+
+
+def rev_parse(path: str, ref: str) -> Optional[str]:
+    """
+    Get the commit a ref of a local git repository points to. Annotated tags resolve to the tag object, the same as
+    with 'git ls-remote'
+
+    :param path: The path to the repository
+    :type path: str
+    :param ref: The ref to look up
+    :type ref: str
+
+    :return: The object hash, or None if the repository or ref does not exist
+    :rtype: Optional[str]
+    """
+    result = subprocess.run(
+        git("-C", path, "rev-parse", "--verify", "--quiet", ref),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0 or not result.stdout:
+        return None
+
+    return result.stdout.strip()
+
+
+def ls_remote(url: str, ref: str) -> Optional[str]:
+    """
+    Get the commit a ref of a remote git repository points to
+
+    :param url: The URL of the remote repository
+    :type url: str
+    :param ref: The ref to look up
+    :type ref: str
+
+    :return: The commit hash, or None if the remote or ref could not be reached
+    :rtype: Optional[str]
+    """
+    try:
+        result = subprocess.run(
+            git("ls-remote", url, ref),
+            capture_output=True,
+            text=True,
+            timeout=30,
+            env=dict(os.environ, GIT_TERMINAL_PROMPT="0"),
+        )
+    except subprocess.TimeoutExpired:
+        return None
+
+    if result.returncode != 0 or not result.stdout:
+        return None
+
+    return result.stdout.split()[0]
+
+
+class DevelDB:
+    """
+    The upstream git heads each VCS package was last built from
+
+    :param path: Optional path to the database file. Default is DEVELDB
+    :type path: Optional[str]
+    """
+
+    def __init__(self, path: str = DEVELDB) -> None:
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.packages = json.load(f)
+        except FileNotFoundError:
+            self.packages = {}
+
+    def __contains__(self, pkgname: str) -> bool:
+        return pkgname in self.packages
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.packages, f, indent=2)
+
+    def update(self, pkgname: str, srcinfo: str, srcdest: Optional[str] = None) -> None:
+        """
+        Record the commits a package that was just built was built from, read from makepkg's clones of its git sources.
+        A source whose clone can't be read is recorded without a commit, so the package is rebuilt on the next --devel
+        upgrade. Packages without git sources are ignored.
+
+        :param pkgname: The name of the package
+        :type pkgname: str
+        :param srcinfo: The path to the package's .SRCINFO file
+        :type srcinfo: str
+        :param srcdest: Optional path to the directory makepkg downloads sources to. Default is utils.get_srcdest()
+        :type srcdest: Optional[str]
+        """
+        srcdest = srcdest if srcdest is not None else get_srcdest()
+        clones = get_vcs_clones(srcinfo)
+        self.record(
+            pkgname,
+            srcinfo,
+            lambda url, ref: rev_parse(os.path.join(srcdest, clones[url]), ref),
+        )
+
+    def seed(self, pkgname: str, srcinfo: str) -> None:
+        """
+        Record the current upstream heads of an installed package that was not built by nay, assuming it was built from
+        them. Packages without git sources are ignored.
+
+        :param pkgname: The name of the package
+        :type pkgname: str
+        :param srcinfo: The path to the package's .SRCINFO file
+        :type srcinfo: str
+        """
+        self.record(pkgname, srcinfo, ls_remote)
+
+    def record(
+        self,
+        pkgname: str,
+        srcinfo: str,
+        get_commit: Callable[[str, str], Optional[str]],
+    ) -> None:
+        sources = get_vcs_sources(srcinfo)
+        if not sources:
+            return
+
+        self.packages[pkgname] = {
+            url: {"ref": ref, "commit": get_commit(url, ref)}
+            for url, ref in sources.items()
+        }
+        self.save()
+
+    def remove(self, *pkgnames: str) -> None:
+        """
+        Forget the upstream heads of packages, e.g. because they are no longer installed
+
+        :param pkgnames: The names of the packages
+        :type pkgnames: str
+        """
+        for pkgname in pkgnames:
+            self.packages.pop(pkgname, None)
+        self.save()
+
+    def get_outdated(
+        self, pkgnames: Iterable[str], max_workers: int = 8, per_host: int = 2
+    ) -> list[str]:
+        """
+        Check the upstream heads of VCS packages concurrently
+
+        :param pkgnames: The names of the packages to check. Packages not in the database are ignored
+        :type pkgnames: Iterable[str]
+        :param max_workers: Optional parameter for the maximum number of concurrent 'git ls-remote' calls. Default is 8
+        :type max_workers: Optional[int]
+        :param per_host: Optional parameter for the maximum number of concurrent calls to a single host. Default is 2
+        :type per_host: Optional[int]
+
+        :return: The names of the packages whose upstream heads moved since they were built
+        :rtype: list[str]
+        """
+        lock = threading.Lock()
+        hosts = {}
+
+        def check(url: str, ref: str, commit: Optional[str]) -> bool:
+            host = urlparse(url).hostname or ""
+            with lock:
+                semaphore = hosts.setdefault(host, threading.Semaphore(per_host))
+            with semaphore:
+                head = ls_remote(url, ref)
+
+            return head is not None and head != commit
+
+        outdated = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for pkgname in pkgnames:
+                for url, source in self.packages.get(pkgname, {}).items():
+                    future = executor.submit(
+                        check, url, source["ref"], source["commit"]
+                    )
+                    futures[future] = pkgname
+
+            for future in concurrent.futures.as_completed(futures):
+                pkgname = futures[future]
+                if future.result() and pkgname not in outdated:
+                    outdated.append(pkgname)
+
+        return sorted(outdated)
@@ -16,3 +16,39 @@ class ConfigReadError(Exception):
 
 class MissingTargets(Exception):
     pass
+
+
+class BuildError(Exception):
+    """Class for handling packages that failed to build. 'journal' holds the journal of the transaction if it can be
+    resumed"""
+
+    journal = None
+
+
+class InstallError(Exception):
+    """Class for handling built packages or repository targets pacman failed to install. 'journal' holds the journal of
+    the transaction if it can be resumed"""
+
+    journal = None
+
+
+class ArgumentListError(Exception):
+    """Class for handling commands which can't be split and don't fit within ARG_MAX"""
+
+    pass
+
+
+class AURError(Exception):
+    """Class for handling AUR requests which failed after all retries, or were not sent because the AUR is down"""
+
+    pass
+
+
+class CycleError(Exception):
+    """Class for handling dependency cycles. 'cycle' holds the nodes of the cycle, starting and ending with the same
+    node"""
+
+    def __init__(self, cycle: list) -> None:
+        self.cycle = cycle
+        path = " -> ".join(str(getattr(node, "name", node)) for node in cycle)
+        super().__init__(f"error: dependency cycle detected: {path}")
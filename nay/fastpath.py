@@ -0,0 +1,179 @@
+import os
+from typing import Optional
+
+from . import load_args_mapper
+from .command import pacman
+
+
+def get_operation(argv: list[str]) -> Optional[str]:
+    """
+    Find the operation of a command line without fully parsing it
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+
+    :return: The name of the operation, or None if no operation or more than one operation was passed
+    :rtype: Optional[str]
+    """
+    switches = {}
+    for name, operation in load_args_mapper()["operations"].items():
+        for arg in operation["args"]:
+            switches[arg] = name
+
+    found = set()
+    for token in argv:
+        if token == "--":
+            break
+        if token.startswith("--"):
+            name = switches.get(token.split("=", 1)[0])
+            if name is not None:
+                found.add(name)
+        elif token.startswith("-"):
+            for char in token[1:]:
+                # Anything after a non-letter is an attached option value, e.g. '-b/var/lib/pacman'
+                if not char.isalpha():
+                    break
+                name = switches.get(f"-{char}")
+                if name is not None:
+                    found.add(name)
+
+    if len(found) != 1:
+        return None
+
+    return found.pop()
+
+
+def has_option(argv: list[str], *args: str) -> bool:
+    """
+    Check whether any of a set of options was passed, including short options grouped together (e.g. '-Rsp')
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+    :param args: The short and long forms of the options to look for
+    :type args: str
+
+    :return: True if any of the options was passed
+    :rtype: bool
+    """
+    short = {arg[1] for arg in args if len(arg) == 2}
+    for token in argv:
+        if token == "--":
+            break
+        if token.startswith("--"):
+            if token.split("=", 1)[0] in args:
+                return True
+        elif token.startswith("-"):
+            for char in token[1:]:
+                if not char.isalpha():
+                    break
+                if char in short:
+                    return True
+
+    return False
+
+
+def get_targets(argv: list[str], known_args: dict) -> list[str]:
+    """
+    Get the targets of a command line
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+    :param known_args: The options of the operation, as found in args.json
+    :type known_args: dict
+
+    :return: The arguments which are neither options nor option values
+    :rtype: list[str]
+    """
+    takes_value = set()
+    for arg in known_args.values():
+        if "action" not in arg["kwargs"] and arg["args"][0].startswith("-"):
+            takes_value.update(arg["args"])
+
+    targets = []
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "--":
+            targets.extend(tokens)
+        elif token.startswith("-"):
+            if token in takes_value:
+                next(tokens, None)
+        else:
+            targets.append(token)
+
+    return targets
+
+
+def needs_sudo(operation: str, argv: list[str], known_args: dict) -> bool:
+    """
+    Check whether pacman needs to run as root, following the same rules as the classes in nay.wrapper
+
+    :param operation: The name of the operation
+    :type operation: str
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+    :param known_args: The options of the operation, as found in args.json
+    :type known_args: dict
+
+    :return: True if pacman should be run with sudo
+    :rtype: bool
+    """
+    if operation in ("remove", "upgrade"):
+        return not has_option(argv, "-p", "--print")
+    if operation == "database":
+        return bool(get_targets(argv, known_args)) and not has_option(
+            argv, "-k", "--check"
+        )
+    if operation == "files":
+        return has_option(argv, "-y", "--refresh")
+
+    return False
+
+
+def get_pacman_argv(argv: list[str]) -> Optional[list[str]]:
+    """
+    Get the pacman command line for an operation nay only passes on to pacman
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+
+    :return: The argument list to exec, or None if the operation must go through nay's own argument handling (it is
+    not a pure wrapper operation, or options only nay understands were passed)
+    :rtype: Optional[list[str]]
+    """
+    operation = get_operation(argv)
+    if operation is None:
+        return None
+
+    mapper = load_args_mapper()
+    if mapper["operations"][operation]["pure_wrapper"] is not True:
+        return None
+
+    known_args = dict(mapper[operation])
+    for parent in mapper["operations"][operation]["parents"]:
+        known_args.update(mapper[parent])
+
+    nay_only = [
+        option
+        for arg in known_args.values()
+        if "pacman_param" not in arg
+        for option in arg["args"]
+    ]
+    if nay_only and has_option(argv, *nay_only):
+        return None
+
+    return pacman(*argv, sudo=needs_sudo(operation, argv, known_args))
+
+
+def exec_pacman(argv: list[str]) -> None:
+    """
+    Replace the current process with pacman if the operation does not need anything from nay. pacman's exit status
+    and signal handling are then those of the nay process. Returns without doing anything otherwise.
+
+    :param argv: The command line arguments, without the program name
+    :type argv: list[str]
+    """
+    pacman_argv = get_pacman_argv(argv)
+    if pacman_argv is None:
+        return
+
+    os.execvp(pacman_argv[0], pacman_argv)
@@ -1,7 +1,6 @@
 import os
-import shlex
-import subprocess
 
+from .command import run
 from .operations import Operation
 
 
@@ -27,7 +26,7 @@ class GetPKGBUILD(Operation):
         total = len(sync_explicit) + len(aur_explicit)
         for num, pkg in enumerate(sync_explicit):
             num += 1
-            subprocess.run(shlex.split(f"asp checkout {pkg.name}"), capture_output=True)
+            run(["asp", "checkout", pkg.name], capture_output=True)
             self.console.notify(
                 f"({num}/{total}) Downloaded PKGBUILD from ABS: [bright_green]{pkg.name}[/bright_green]"
             )
@@ -0,0 +1,164 @@
+from typing import Hashable, Iterator, Optional
+
+from .exceptions import CycleError
+
+
+class DiGraph:
+    """
+    A directed graph stored as adjacency maps. Nodes can be any hashable object and keep the order they were added in.
+    Edges may carry a dict of data, e.g. the type of a dependency.
+    """
+
+    def __init__(self) -> None:
+        self.succ: dict[Hashable, dict[Hashable, dict]] = {}
+        self.pred: dict[Hashable, dict[Hashable, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self.succ)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.succ)
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self.succ
+
+    @property
+    def nodes(self) -> list[Hashable]:
+        return list(self.succ)
+
+    @property
+    def edges(self) -> list[tuple[Hashable, Hashable]]:
+        return [(node, other) for node, succ in self.succ.items() for other in succ]
+
+    def add_node(self, node: Hashable) -> None:
+        if node not in self.succ:
+            self.succ[node] = {}
+            self.pred[node] = {}
+
+    def add_edge(self, node: Hashable, other: Hashable, **data) -> None:
+        """
+        Add an edge, adding its nodes if they are not in the graph yet. The data of an existing edge is updated.
+
+        :param node: The node the edge starts at
+        :type node: Hashable
+        :param other: The node the edge points to
+        :type other: Hashable
+        :param data: Optional data stored with the edge
+        """
+        self.add_node(node)
+        self.add_node(other)
+        self.succ[node].setdefault(other, {}).update(data)
+        self.pred[other][node] = None
+
+    def get_edge_data(self, node: Hashable, other: Hashable) -> Optional[dict]:
+        return self.succ.get(node, {}).get(other)
+
+    def successors(self, node: Hashable) -> list[Hashable]:
+        return list(self.succ[node])
+
+    def predecessors(self, node: Hashable) -> list[Hashable]:
+        return list(self.pred[node])
+
+    def update(self, other: "DiGraph") -> None:
+        """
+        Merge the nodes and edges of another graph into this one. Edge data of the other graph takes precedence.
+
+        :param other: The graph to merge
+        :type other: DiGraph
+        """
+        for node in other:
+            self.add_node(node)
+        for node, succ in other.succ.items():
+            for dep, data in succ.items():
+                self.add_edge(node, dep, **data)
+
+
+def compose(*graphs: DiGraph) -> DiGraph:
+    """
+    Merge graphs into a new graph. Later graphs take precedence for the data of edges present in more than one.
+
+    :param graphs: The graphs to merge
+    :type graphs: DiGraph
+
+    :return: The merged graph
+    :rtype: DiGraph
+    """
+    composed = DiGraph()
+    for graph in graphs:
+        composed.update(graph)
+
+    return composed
+
+
+def topological_generations(graph: DiGraph) -> list[list[Hashable]]:
+    """
+    Group the nodes of a graph into generations with Kahn's algorithm. Every node is placed one generation after the
+    last of its predecessors, so every edge points from an earlier generation to a later one. For a graph of packages
+    pointing at their dependencies, the reversed generations are a valid install order.
+
+    :param graph: The graph to sort
+    :type graph: DiGraph
+
+    :return: The generations, with the nodes of each generation in the order they were added to the graph
+    :rtype: list[list[Hashable]]
+
+    :raises CycleError: If the graph has a cycle
+    """
+    indegree = {node: len(pred) for node, pred in graph.pred.items()}
+    generation = [node for node, degree in indegree.items() if degree == 0]
+    generations = []
+    sorted_nodes = 0
+    while generation:
+        generations.append(generation)
+        sorted_nodes += len(generation)
+        following = []
+        for node in generation:
+            for other in graph.succ[node]:
+                indegree[other] -= 1
+                if indegree[other] == 0:
+                    following.append(other)
+        generation = following
+
+    if sorted_nodes != len(graph):
+        remaining = [node for node, degree in indegree.items() if degree > 0]
+        raise CycleError(find_cycle(graph, remaining))
+
+    return generations
+
+
+def find_cycle(graph: DiGraph, nodes: Optional[list[Hashable]] = None) -> list:
+    """
+    Find a cycle with an iterative depth-first search
+
+    :param graph: The graph to search
+    :type graph: DiGraph
+    :param nodes: Optional nodes to start searching from. Default is every node of the graph
+    :type nodes: Optional[list[Hashable]]
+
+    :return: The nodes of the cycle, starting and ending with the same node, or an empty list if there is none
+    :rtype: list
+    """
+    done = set()
+    for start in graph if nodes is None else nodes:
+        if start in done:
+            continue
+
+        path = [start]
+        on_path = {start: 0}
+        stack = [iter(graph.succ[start])]
+        while stack:
+            other = next(stack[-1], None)
+            if other is None:
+                node = path.pop()
+                del on_path[node]
+                done.add(node)
+                stack.pop()
+            elif other in on_path:
+                index = on_path[other]
+                return path[index:] + [other]
+            elif other not in done:
+                on_path[other] = len(path)
+                path.append(other)
+                stack.append(iter(graph.succ[other]))
+
+    return []
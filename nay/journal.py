@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from .config import CACHEDIR
+from .package import AURPackage
+
+JOURNALDIR = os.path.join(CACHEDIR, "journal")
+
+
+class Journal:
+    """
+    A persistent record of an AUR install transaction. The plan (install order, explicit targets) is recorded before
+    anything is built, and each package's completed stages (fetched, built, installed) are written as they happen so an
+    interrupted transaction can be resumed.
+
+    :param path: The path to the journal file
+    :type path: str
+    :param data: The journal data
+    :type data: dict
+    """
+
+    def __init__(self, path: str, data: dict) -> None:
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def create(
+        cls,
+        install_order: list[list[AURPackage]],
+        aur_explicit: list[AURPackage],
+        sync_explicit: list[str],
+        profile: str,
+    ) -> "Journal":
+        """
+        Create and persist a journal for a new transaction
+
+        :param install_order: The AUR packages to build and install, one list per pacman transaction
+        :type install_order: list[list[AURPackage]]
+        :param aur_explicit: The explicitly requested AUR packages
+        :type aur_explicit: list[AURPackage]
+        :param sync_explicit: The names of explicitly requested sync packages
+        :type sync_explicit: list[str]
+        :param profile: The name of the build profile in use
+        :type profile: str
+
+        :return: The new journal
+        :rtype: Journal
+        """
+        started = datetime.now()
+        path = os.path.join(
+            JOURNALDIR, f"{started.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+        )
+        data = {
+            "started": started.isoformat(timespec="seconds"),
+            "profile": profile,
+            "layers": [[pkg.name for pkg in layer] for layer in install_order],
+            "aur_explicit": [pkg.name for pkg in aur_explicit],
+            "sync_explicit": sync_explicit,
+            "sync_installed": False,
+            "packages": {
+                pkg.name: {"version": pkg.version, "stages": {}}
+                for layer in install_order
+                for pkg in layer
+            },
+        }
+        journal = cls(path, data)
+        journal.save()
+
+        return journal
+
+    @classmethod
+    def latest(cls) -> Optional["Journal"]:
+        """
+        Get the most recently started unfinished transaction
+
+        :return: The journal of the transaction, or None if there is nothing to resume
+        :rtype: Optional[Journal]
+        """
+        try:
+            names = sorted(
+                name for name in os.listdir(JOURNALDIR) if name.endswith(".json")
+            )
+        except FileNotFoundError:
+            return None
+
+        if not names:
+            return None
+
+        path = os.path.join(JOURNALDIR, names[-1])
+        with open(path, "r") as f:
+            return cls(path, json.load(f))
+
+    @property
+    def layers(self) -> list[list[str]]:
+        return self.data["layers"]
+
+    @property
+    def aur_explicit(self) -> list[str]:
+        return self.data["aur_explicit"]
+
+    @property
+    def sync_explicit(self) -> list[str]:
+        return self.data["sync_explicit"]
+
+    @property
+    def profile(self) -> str:
+        return self.data["profile"]
+
+    @property
+    def started(self) -> str:
+        return self.data["started"]
+
+    def save(self) -> None:
+        """
+        Write the journal to disk. The file is replaced atomically so an interruption never leaves a partial journal.
+        """
+        os.makedirs(JOURNALDIR, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def mark(self, pkg: AURPackage, stage: str, value=True) -> None:
+        """
+        Record a completed stage for a package
+
+        :param pkg: The package the stage was completed for
+        :type pkg: AURPackage
+        :param stage: The stage that was completed ('fetched', 'built' or 'installed')
+        :type stage: str
+        :param value: Optional data to record with the stage. Default is True
+        """
+        entry = self.data["packages"].setdefault(
+            pkg.name, {"version": pkg.version, "stages": {}}
+        )
+        entry["version"] = pkg.version
+        entry["stages"][stage] = value
+        self.save()
+
+    def completed(self, pkg: AURPackage, stage: str) -> bool:
+        entry = self.data["packages"].get(pkg.name)
+        if entry is None or entry["version"] != pkg.version:
+            return False
+
+        return bool(entry["stages"].get(stage))
+
+    def mark_built(self, pkg: AURPackage, artifacts: list[str]) -> None:
+        self.mark(pkg, "built", {"digest": input_digest(pkg), "artifacts": artifacts})
+
+    def get_artifacts(self, pkg: AURPackage) -> Optional[list[str]]:
+        """
+        Get the packages built for a package in this transaction if they can be reused
+
+        :param pkg: The package to get built artifacts for
+        :type pkg: AURPackage
+
+        :return: The paths to the built artifacts, or None if the package must be (re)built because it was not built yet,
+        its inputs changed or the artifacts are gone
+        :rtype: Optional[list[str]]
+        """
+        if not self.completed(pkg, "built"):
+            return None
+
+        built = self.data["packages"][pkg.name]["stages"]["built"]
+        if built["digest"] != input_digest(pkg):
+            return None
+        if not all(os.path.exists(artifact) for artifact in built["artifacts"]):
+            return None
+
+        return built["artifacts"]
+
+    def mark_sync_installed(self) -> None:
+        self.data["sync_installed"] = True
+        self.save()
+
+    @property
+    def sync_installed(self) -> bool:
+        return self.data["sync_installed"]
+
+    def finish(self) -> None:
+        """
+        Remove the journal of a completed transaction
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def input_digest(pkg: AURPackage) -> str:
+    """
+    Get a digest of a package's build inputs (PKGBUILD and .SRCINFO)
+
+    :param pkg: The package to get the digest for
+    :type pkg: AURPackage
+
+    :return: A hex digest of the build inputs
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    for path in (pkg.PKGBUILD, pkg.SRCINFO):
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            pass
+
+    return digest.hexdigest()
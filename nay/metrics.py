@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Upper bounds in seconds of the request latency histogram buckets. A last, unbounded bucket is implied
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS: Optional["Metrics"] = None
+
+
+@dataclass
+class EndpointMetrics:
+    """
+    The traffic to one AUR endpoint. 'buckets' holds the number of requests in each latency bucket (not cumulative),
+    with the last entry counting requests slower than the largest bound.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    seconds: float = 0
+    max_seconds: float = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+
+class Metrics:
+    """
+    Counters and latency histograms of the requests made to the AUR, by endpoint
+    """
+
+    def __init__(self) -> None:
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def get(self, endpoint: str) -> EndpointMetrics:
+        return self.endpoints.setdefault(endpoint, EndpointMetrics())
+
+    def observe_request(
+        self, endpoint: str, seconds: float, size: int, status: Optional[int]
+    ) -> None:
+        """
+        Record a request
+
+        :param endpoint: The name of the endpoint, e.g. 'info'
+        :type endpoint: str
+        :param seconds: The time the request took
+        :type seconds: float
+        :param size: The size of the response body in bytes
+        :type size: int
+        :param status: The HTTP status of the response, or None if no response was received
+        :type status: Optional[int]
+        """
+        bucket = len(BUCKETS)
+        for num, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                bucket = num
+                break
+
+        with self.lock:
+            metrics = self.get(endpoint)
+            metrics.requests += 1
+            metrics.bytes += size
+            metrics.seconds += seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+            metrics.buckets[bucket] += 1
+            if status is None or status >= 400:
+                metrics.errors += 1
+
+    def observe_retry(self, endpoint: str) -> None:
+        with self.lock:
+            self.get(endpoint).retries += 1
+
+    def observe_cache(self, endpoint: str, hit: bool) -> None:
+        with self.lock:
+            metrics = self.get(endpoint)
+            if hit is True:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                endpoint: {
+                    "requests": metrics.requests,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "bytes": metrics.bytes,
+                    "cache_hits": metrics.cache_hits,
+                    "cache_misses": metrics.cache_misses,
+                    "seconds": metrics.seconds,
+                    "max_seconds": metrics.max_seconds,
+                    "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], metrics.buckets)),
+                }
+                for endpoint, metrics in sorted(self.endpoints.items())
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format, e.g. for node_exporter's textfile collector
+
+        :return: The metrics
+        :rtype: str
+        """
+        data = self.to_dict()
+        counters = {
+            "requests": ("nay_aur_requests_total", "AURweb requests"),
+            "errors": (
+                "nay_aur_errors_total",
+                "AURweb requests which failed or returned an HTTP error",
+            ),
+            "retries": (
+                "nay_aur_retries_total",
+                "AURweb requests sent again after a failure",
+            ),
+            "bytes": ("nay_aur_response_bytes_total", "Bytes received from the AUR"),
+            "cache_hits": (
+                "nay_aur_cache_hits_total",
+                "Requests answered from the cache",
+            ),
+            "cache_misses": (
+                "nay_aur_cache_misses_total",
+                "Requests not found in the cache",
+            ),
+        }
+
+        lines = []
+        for key, (name, help) in counters.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for endpoint, metrics in data.items():
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {metrics[key]}')
+
+        name = "nay_aur_request_duration_seconds"
+        lines.append(f"# HELP {name} Latency of AURweb requests")
+        lines.append(f"# TYPE {name} histogram")
+        for endpoint, metrics in data.items():
+            count = 0
+            for bound, num in metrics["buckets"].items():
+                count += num
+                lines.append(
+                    f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}'
+                )
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {metrics["seconds"]}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Write the metrics to a file, atomically so a collector never reads a partial file. Files ending in '.prom' are
+        written in the Prometheus text format, anything else as JSON.
+
+        :param path: The file to write
+        :type path: str
+        """
+        if path.endswith(".prom"):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps(self.to_dict(), indent=2)
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+def enable() -> Metrics:
+    """
+    Start recording metrics
+
+    :return: The metrics requests are recorded in
+    :rtype: Metrics
+    """
+    global METRICS
+    METRICS = Metrics()
+    return METRICS
+
+
+def disable() -> None:
+    global METRICS
+    METRICS = None
+
+
+def observe_request(
+    endpoint: str, seconds: float, size: int, status: Optional[int]
+) -> None:
+    if METRICS is not None:
+        METRICS.observe_request(endpoint, seconds, size, status)
+
+
+def observe_retry(endpoint: str) -> None:
+    if METRICS is not None:
+        METRICS.observe_retry(endpoint)
+
+
+def observe_cache(endpoint: str, hit: bool) -> None:
+    if METRICS is not None:
+        METRICS.observe_cache(endpoint, hit)
@@ -1,67 +1,92 @@
-import configparser
 from dataclasses import dataclass
-
-import pyalpm
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional, TextIO
 
 from .console import NayConsole
-from .exceptions import ConfigReadError, HandleCreateError
+from .exceptions import HandleCreateError
+from .pacman_conf import PacmanConfig
+from .tracing import span
 from .wrapper import Wrapper
 
+if TYPE_CHECKING:
+    import pyalpm
+
+    from .aur import AUR
+
 
 @dataclass
 class Operation(Wrapper):
+    """
+    Base class for operations which need access to the pacman databases or the AUR. The pacman config, the pyalpm
+    handle and the databases are only loaded when an operation first uses them.
+    """
+
     dbpath: str
     root: str
     config: str
     console: NayConsole
+    build_profile: Optional[str] = None
+    resume: bool = False
+    devel: bool = False
+    output_format: Optional[str] = None
+    daemon: bool = False
+    dry_run: bool = False
+    # Where machine-readable records are written. Default is sys.stdout
+    output: Optional[TextIO] = None
 
     def __post_init__(self):
-        from .aur import AUR
-
         self.wrapper_prefix = type(self).__name__.lower()
 
-        parser = self.__get_config_parser(self.config)
-        handle = self.__get_handle(self.root, self.dbpath)
-
-        self.local = self.__get_localdb(handle)
-        self.sync = self.__get_syncdb(handle, parser)
-        self.aur = AUR(self.local, self.console)
-
     @property
     def db_params(self):
         db_params = [
             f"--{self.wrapper_prefix}",
-            f"--dbpath {self.dbpath}",
-            f"--root {self.root}",
+            "--dbpath",
+            self.dbpath,
+            "--root",
+            self.root,
         ]
         return db_params
 
-    def __get_handle(self, root, dbpath):
-        try:
-            return pyalpm.Handle(root, dbpath)
-        except pyalpm.error as err:
-            raise HandleCreateError(str(err))
+    @cached_property
+    def pacman_conf(self) -> PacmanConfig:
+        with span("pacman_conf"):
+            return PacmanConfig.load(self.config)
+
+    @cached_property
+    def handle(self) -> "pyalpm.Handle":
+        with span("handle"):
+            import pyalpm
+
+            try:
+                return pyalpm.Handle(self.root, self.dbpath)
+            except pyalpm.error as err:
+                raise HandleCreateError(str(err))
 
-    def __get_syncdb(
-        self, handle: pyalpm.Handle, parser: configparser.ConfigParser
-    ) -> dict[str, "pyalpm.Database"]:
+    @cached_property
+    def local(self) -> "pyalpm.Database":
+        return self.handle.get_localdb()
+
+    @cached_property
+    def sync(self) -> dict[str, "pyalpm.Database"]:
+        """
+        The sync databases, registered in the order they are declared in pacman.conf with their configured SigLevel
+        and servers
+        """
+        pacman_conf = self.pacman_conf
+        handle = self.handle
         sync = {}
-        for section in parser.sections():
-            if section != "options":
-                sync[section] = handle.register_syncdb(
-                    section, pyalpm.SIG_DATABASE_OPTIONAL
-                )
+        with span("register_syncdbs"):
+            for repo in pacman_conf.repos:
+                db = handle.register_syncdb(repo, pacman_conf.get_siglevel(repo))
+                db.servers = pacman_conf.get_servers(repo)
+                sync[repo] = db
 
         return sync
 
-    def __get_localdb(self, handle: pyalpm.Handle) -> "pyalpm.DataBase":
-        return handle.get_localdb()
-
-    def __get_config_parser(self, configdir: str) -> configparser.ConfigParser:
-        parser = configparser.ConfigParser(allow_no_value=True)
-        if not parser.read(configdir):
-            raise ConfigReadError(
-                f"error: config file {configdir} could not be read: no such file or directory"
-            )
+    @cached_property
+    def aur(self) -> "AUR":
+        from .aur import AUR, ResponseCache
 
-        return parser
+        # The cache also serves as the fallback when the AUR stops responding partway through a run
+        return AUR(self.local, self.console, cache=ResponseCache())
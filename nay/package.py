@@ -1,79 +1,204 @@
 import os
 import re
+import sys
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
-import pyalpm
+from .config import CACHEDIR, get_aur_url
 
-from .config import CACHEDIR
+if TYPE_CHECKING:
+    import pyalpm
+    from rich.table import Table
+
+# Dependency tuples shared between every package with an identical set of dependencies
+_DEPENDS_CACHE: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def intern_depends(depends: Optional[Iterable[str]]) -> tuple[str, ...]:
+    """
+    Get an immutable tuple of dependencies. Identical dependency sets share a single tuple of interned strings.
+
+    :param depends: The dependencies to intern
+    :type depends: Optional[Iterable[str]]
+
+    :return: The shared tuple of dependencies
+    :rtype: tuple[str, ...]
+    """
+    if not depends:
+        return ()
+
+    key = tuple(depends)
+    cached = _DEPENDS_CACHE.get(key)
+    if cached is None:
+        cached = _DEPENDS_CACHE.setdefault(key, tuple(sys.intern(dep) for dep in key))
+
+    return cached
+
+
+def format_date(timestamp: int) -> str:
+    """
+    Format a timestamp the way pacman's -Qi and -Si do, in the local timezone
+
+    :param timestamp: The number of seconds since the epoch
+    :type timestamp: int
+
+    :return: The formatted date
+    :rtype: str
+    """
+    return (
+        datetime.fromtimestamp(timestamp)
+        .astimezone()
+        .strftime("%d %b %Y %I:%M:%S %p %Z")
+    )
 
 
 class Package:
-    def __init__(
-        self,
-        db: str,
-        name: str,
-        version: str,
-        desc: Optional[str] = None,
-        check_depends: Optional[list[str]] = [],
-        make_depends: Optional[list[str]] = [],
-        depends: Optional[list[str]] = [],
-        opt_depends: Optional[list[str]] = [],
-    ) -> None:
-        self.db = db
-        self.name = name
-        self.version = version
-        self.desc = desc
-        self.check_depends = check_depends
-        self.make_depends = make_depends
-        self.depends = depends
-        self.opt_depends = opt_depends
+    """
+    Base class for packages. Subclasses provide the 'db', 'name', 'version', 'desc', 'check_depends', 'make_depends',
+    'depends' and 'opt_depends' attributes.
+    """
+
+    __slots__ = ()
 
     def __hash__(self) -> int:
-        return hash(self.name)
+        return hash((self.name, self.version))
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Package):
             return False
 
-        return hash((self.name, self.version)) == hash((other.name, other.version))
+        return (self.name, self.version) == (other.name, other.version)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.db}/{self.name} {self.version})"
 
 
 class SyncPackage(Package):
-    def __init__(
-        self,
-        db: str,
-        name: str,
-        version: str,
-        desc: str,
-        check_depends: list[str],
-        make_depends: list[str],
-        depends: list[str],
-        opt_depends: list[str],
-        size: int,
-        isize: int,
-    ) -> None:
-        super().__init__(
-            db, name, version, desc, check_depends, make_depends, depends, opt_depends
-        )
-        self.size = self.format_bytes(size)
-        self.isize = self.format_bytes(isize)
+    """
+    A lightweight view of a sync database package. Fields are read from the underlying pyalpm package (and sizes
+    formatted) only when they are accessed.
+
+    :param pkg: The pyalpm package to wrap
+    :type pkg: pyalpm.Package
+    """
+
+    __slots__ = ("pkg",)
+
+    def __init__(self, pkg: "pyalpm.Package") -> None:
+        self.pkg = pkg
 
     @classmethod
-    def from_pyalpm(cls, pkg: pyalpm.Package) -> "SyncPackage":
-        kwargs = {
+    def from_pyalpm(cls, pkg: "pyalpm.Package") -> "SyncPackage":
+        return cls(pkg)
+
+    @property
+    def db(self) -> str:
+        return self.pkg.db.name
+
+    @property
+    def name(self) -> str:
+        return self.pkg.name
+
+    @property
+    def version(self) -> str:
+        return self.pkg.version
+
+    @property
+    def desc(self) -> str:
+        return self.pkg.desc
+
+    @property
+    def check_depends(self) -> tuple[str, ...]:
+        return intern_depends(self.pkg.checkdepends)
+
+    @property
+    def make_depends(self) -> tuple[str, ...]:
+        return intern_depends(self.pkg.makedepends)
+
+    @property
+    def depends(self) -> tuple[str, ...]:
+        return intern_depends(self.pkg.depends)
+
+    @property
+    def opt_depends(self) -> tuple[str, ...]:
+        return intern_depends(self.pkg.optdepends)
+
+    @property
+    def size(self) -> str:
+        return self.format_bytes(self.pkg.size)
+
+    @property
+    def isize(self) -> str:
+        return self.format_bytes(self.pkg.isize)
+
+    def to_record(self) -> dict:
+        """
+        Get a machine-readable record of the package
+
+        :return: The package's fields
+        :rtype: dict
+        """
+        pkg = self.pkg
+        return {
+            "db": self.db,
             "name": pkg.name,
             "version": pkg.version,
             "desc": pkg.desc,
-            "db": pkg.db.name,
-            "check_depends": pkg.checkdepends,
-            "make_depends": pkg.makedepends,
-            "opt_depends": pkg.optdepends,
-            "depends": pkg.depends,
+            "base": pkg.base,
+            "arch": pkg.arch,
+            "url": pkg.url,
+            "licenses": list(pkg.licenses),
+            "groups": list(pkg.groups),
+            "provides": list(pkg.provides),
+            "depends": list(self.depends),
+            "make_depends": list(self.make_depends),
+            "check_depends": list(self.check_depends),
+            "opt_depends": list(self.opt_depends),
+            "conflicts": list(pkg.conflicts),
+            "replaces": list(pkg.replaces),
             "size": pkg.size,
             "isize": pkg.isize,
+            "packager": pkg.packager,
+            "builddate": pkg.builddate,
         }
-        return cls(**kwargs)
+
+    @property
+    def info(self) -> "Table":
+        from rich.markup import escape
+        from rich.table import Column, Table
+
+        pkg = self.pkg
+        grid = Table.grid(Column("field", width=30), Column("value"))
+
+        # Package metadata may contain square brackets, which rich would otherwise parse as markup
+        def add_row(field: str, value: object) -> None:
+            grid.add_row(field, f": {escape(str(value))}")
+
+        def join(values: Iterable[str]) -> Optional[str]:
+            return "  ".join(values) if values else None
+
+        add_row("Repository", self.db)
+        add_row("Name", pkg.name)
+        add_row("Version", pkg.version)
+        add_row("Description", pkg.desc if pkg.desc else None)
+        add_row("Architecture", pkg.arch)
+        add_row("URL", pkg.url)
+        add_row("Licenses", join(pkg.licenses))
+        add_row("Groups", join(pkg.groups))
+        add_row("Provides", join(pkg.provides))
+        add_row("Depends On", join(self.depends))
+        add_row("Optional Deps", join(self.opt_depends))
+        add_row("Make Deps", join(self.make_depends))
+        add_row("Check Deps", join(self.check_depends))
+        add_row("Conflicts With", join(pkg.conflicts))
+        add_row("Replaces", join(pkg.replaces))
+        add_row("Download Size", self.size)
+        add_row("Installed Size", self.isize)
+        add_row("Packager", pkg.packager)
+        add_row("Build Date", format_date(pkg.builddate))
+        grid.add_row()
+
+        return grid
 
     @staticmethod
     def format_bytes(size) -> str:
@@ -88,6 +213,22 @@ class SyncPackage(Package):
 
 
 class AURBasic(Package):
+    __slots__ = (
+        "db",
+        "name",
+        "version",
+        "desc",
+        "check_depends",
+        "make_depends",
+        "depends",
+        "opt_depends",
+        "votes",
+        "popularity",
+        "flag_date",
+        "orphaned",
+        "search_query",
+    )
+
     def __init__(
         self,
         db: str,
@@ -99,14 +240,19 @@ class AURBasic(Package):
         flag_date: Optional[int] = None,
         orphaned: Optional[int] = False,
         search_query: Optional[dict] = None,
-        check_depends: Optional[list[str]] = [],
-        make_depends: Optional[list[str]] = [],
-        depends: Optional[list[str]] = [],
-        opt_depends: Optional[list[str]] = [],
+        check_depends: Optional[Iterable[str]] = (),
+        make_depends: Optional[Iterable[str]] = (),
+        depends: Optional[Iterable[str]] = (),
+        opt_depends: Optional[Iterable[str]] = (),
     ) -> None:
-        super().__init__(
-            db, name, version, desc, check_depends, make_depends, depends, opt_depends
-        )
+        self.db = db
+        self.name = name
+        self.version = version
+        self.desc = desc
+        self.check_depends = intern_depends(check_depends)
+        self.make_depends = intern_depends(make_depends)
+        self.depends = intern_depends(depends)
+        self.opt_depends = intern_depends(opt_depends)
         self.votes = votes
         self.popularity = popularity
         self.flag_date = (
@@ -131,6 +277,29 @@ class AURBasic(Package):
         kwargs["search_query"] = result
         return cls(**kwargs)
 
+    def to_record(self) -> dict:
+        """
+        Get a machine-readable record of the package
+
+        :return: The package's fields
+        :rtype: dict
+        """
+        return {
+            "db": self.db,
+            "name": self.name,
+            "version": self.version,
+            "desc": self.desc,
+            "votes": self.votes,
+            "popularity": self.popularity,
+            "orphaned": self.orphaned,
+            # Dates are seconds since the epoch in every record, as returned by the AURweb RPC interface
+            "flag_date": int(self.flag_date.timestamp()) if self.flag_date else None,
+            "depends": list(self.depends),
+            "make_depends": list(self.make_depends),
+            "check_depends": list(self.check_depends),
+            "opt_depends": list(self.opt_depends),
+        }
+
     @property
     def PKGBUILD(self) -> str:
         return os.path.join(CACHEDIR, f"{self.name}/PKGBUILD")
@@ -164,16 +333,18 @@ class AURBasic(Package):
 
 
 class AURPackage(AURBasic):
+    __slots__ = ("info_query",)
+
     def __init__(
         self,
         db: str,
         name: str,
         version: str,
         desc: str,
-        check_depends: list[str],
-        make_depends: list[str],
-        depends: list[str],
-        opt_depends: list[str],
+        check_depends: Iterable[str],
+        make_depends: Iterable[str],
+        depends: Iterable[str],
+        opt_depends: Iterable[str],
         votes: int,
         popularity: int,
         info_query: dict,
@@ -195,12 +366,11 @@ class AURPackage(AURBasic):
             opt_depends=opt_depends,
         )
         self.info_query = info_query
-        self.votes = votes
-        self.popularity = popularity
-        self.flag_date = (
-            datetime.fromtimestamp(flag_date) if flag_date is not None else None
-        )
-        self.orphaned = orphaned
+
+    def to_record(self) -> dict:
+        record = super().to_record()
+        record["info_query"] = self.info_query
+        return record
 
     @classmethod
     def from_info_query(cls, result: dict) -> "AURPackage":
@@ -226,7 +396,7 @@ class AURPackage(AURBasic):
             if dtype in result.keys():
                 kwargs[dep_types[dtype]] = result[dtype]
             else:
-                kwargs[dep_types[dtype]] = []
+                kwargs[dep_types[dtype]] = ()
 
         return cls(**kwargs)
 
@@ -249,7 +419,7 @@ class AURPackage(AURBasic):
         else:
             grid.add_row("Description", ": None")
         grid.add_row("URL", f": {self.info_query['URL']}")
-        grid.add_row("AUR URL", f": https://aur.archlinux.org/packages/{self.name}")
+        grid.add_row("AUR URL", f": {get_aur_url()}/packages/{self.name}")
         # TODO: Fix hardcoded 'None'
         if "Groups" in self.info_query.keys():
             grid.add_row(
@@ -314,11 +484,11 @@ class AURPackage(AURBasic):
         grid.add_row("Popularity", f": {self.info_query['Popularity']}")
         grid.add_row(
             "First Submitted",
-            f": {datetime.fromtimestamp(self.info_query['FirstSubmitted']).strftime('%d %b %Y %I:%M:%S %p %Z')}",
+            f": {format_date(self.info_query['FirstSubmitted'])}",
         )
         grid.add_row(
             "Last Modified",
-            f": {datetime.fromtimestamp(self.info_query['LastModified']).strftime('%d %b %Y %I:%M:%S %p %Z')}",
+            f": {format_date(self.info_query['LastModified'])}",
         )
         grid.add_row()
 
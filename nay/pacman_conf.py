@@ -0,0 +1,250 @@
+import glob
+import json
+import os
+from typing import Optional
+
+from .config import CACHEDIR
+from .exceptions import ConfigReadError
+
+PACMAN_CONF_CACHE = os.path.join(CACHEDIR, "pacman_conf.json")
+
+# Values of alpm_siglevel_t (alpm.h), as exposed by pyalpm's SIG_* constants
+SIG_PACKAGE = 1 << 0
+SIG_PACKAGE_OPTIONAL = 1 << 1
+SIG_PACKAGE_MARGINAL_OK = 1 << 2
+SIG_PACKAGE_UNKNOWN_OK = 1 << 3
+SIG_DATABASE = 1 << 10
+SIG_DATABASE_OPTIONAL = 1 << 11
+SIG_DATABASE_MARGINAL_OK = 1 << 12
+SIG_DATABASE_UNKNOWN_OK = 1 << 13
+
+# pacman's built-in default when no SigLevel is configured
+SIG_DEFAULT = SIG_PACKAGE | SIG_PACKAGE_OPTIONAL | SIG_DATABASE | SIG_DATABASE_OPTIONAL
+
+
+class PacmanConfig:
+    """
+    The parsed contents of pacman.conf, including every file pulled in with 'Include'. Repositories are kept in the
+    order they are declared, which is the order pacman searches them in.
+
+    :param path: The path to pacman.conf
+    :type path: str
+    :param data: The parsed config
+    :type data: dict
+    """
+
+    def __init__(self, path: str, data: dict) -> None:
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def load(cls, path: str, cache: str = PACMAN_CONF_CACHE) -> "PacmanConfig":
+        """
+        Load pacman.conf. The parsed config is cached and reused until the modification time of pacman.conf or any
+        included file (or the directory of an included glob) changes.
+
+        :param path: The path to pacman.conf
+        :type path: str
+        :param cache: Optional path to the cache file. Default is PACMAN_CONF_CACHE
+        :type cache: Optional[str]
+
+        :return: The parsed config
+        :rtype: PacmanConfig
+        """
+        path = os.path.abspath(path)
+        try:
+            with open(cache, "r") as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            cached = {}
+
+        entry = cached.get(path)
+        if entry is not None and get_mtimes(entry["files"]) == entry["files"]:
+            return cls(path, entry["data"])
+
+        files = {}
+        data = parse(path, files)
+        cached[path] = {"files": get_mtimes(files), "data": data}
+
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            tmp = f"{cache}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp, cache)
+        except OSError:
+            pass
+
+        return cls(path, data)
+
+    @property
+    def options(self) -> dict[str, str]:
+        return self.data["options"]
+
+    @property
+    def repos(self) -> dict[str, dict]:
+        return self.data["repos"]
+
+    @property
+    def architecture(self) -> str:
+        arch = self.options.get("Architecture", "auto").split()[0]
+        if arch == "auto":
+            arch = os.uname().machine
+
+        return arch
+
+    def get_siglevel(self, repo: str) -> int:
+        """
+        Get the signature verification level of a repository. The repository's SigLevel is applied on top of the
+        SigLevel in '[options]', which is applied on top of pacman's default.
+
+        :param repo: The name of the repository
+        :type repo: str
+
+        :return: The alpm signature level
+        :rtype: int
+        """
+        level = get_siglevel(self.options.get("SigLevel", "").split(), SIG_DEFAULT)
+        return get_siglevel(self.repos[repo]["siglevel"], level)
+
+    def get_servers(self, repo: str) -> list[str]:
+        """
+        Get the servers of a repository with '$repo' and '$arch' expanded
+
+        :param repo: The name of the repository
+        :type repo: str
+
+        :return: The server URLs
+        :rtype: list[str]
+        """
+        arch = self.architecture
+        return [
+            server.replace("$repo", repo).replace("$arch", arch)
+            for server in self.repos[repo]["servers"]
+        ]
+
+
+def parse(
+    path: str,
+    files: dict[str, Optional[int]],
+    data: Optional[dict] = None,
+    section: Optional[str] = None,
+) -> dict:
+    """
+    Parse a pacman config file, following 'Include' directives
+
+    :param path: The path to the file to parse
+    :type path: str
+    :param files: A mapping updated with every file and directory the config was read from
+    :type files: dict[str, Optional[int]]
+    :param data: Optional config to parse into. Used for included files
+    :type data: Optional[dict]
+    :param section: Optional section the file is included from. Used for included files
+    :type section: Optional[str]
+
+    :return: The parsed config
+    :rtype: dict
+    """
+    if data is None:
+        data = {"options": {}, "repos": {}}
+
+    try:
+        with open(path, "r") as f:
+            lines = f.readlines()
+    except OSError as err:
+        raise ConfigReadError(
+            f"error: config file {path} could not be read: {err.strerror.lower()}"
+        )
+
+    files[path] = None
+    for num, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1]
+            if section != "options":
+                data["repos"].setdefault(section, {"servers": [], "siglevel": []})
+            continue
+
+        if section is None:
+            raise ConfigReadError(
+                f"error: config file {path}, line {num}: All directives must belong to a section."
+            )
+
+        key, _, value = (part.strip() for part in line.partition("="))
+        if key == "Include":
+            pattern = value
+            files[os.path.dirname(pattern)] = None
+            for include in sorted(glob.glob(pattern)):
+                parse(include, files, data, section)
+        elif section == "options":
+            data["options"][key] = value
+        elif key == "Server":
+            data["repos"][section]["servers"].append(value)
+        elif key == "SigLevel":
+            data["repos"][section]["siglevel"].extend(value.split())
+
+    return data
+
+
+def get_mtimes(paths: dict[str, Optional[int]]) -> dict[str, Optional[int]]:
+    """
+    Get the current modification times of a set of paths
+
+    :param paths: The paths to check
+    :type paths: dict[str, Optional[int]]
+
+    :return: A mapping of path to modification time in nanoseconds, or None if the path does not exist
+    :rtype: dict[str, Optional[int]]
+    """
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+
+    return mtimes
+
+
+def get_siglevel(tokens: list[str], level: int) -> int:
+    """
+    Apply SigLevel options to a signature level the way pacman does
+
+    :param tokens: The SigLevel options, e.g. ['Required', 'DatabaseOptional']
+    :type tokens: list[str]
+    :param level: The level to apply the options on top of
+    :type level: int
+
+    :return: The resulting alpm signature level
+    :rtype: int
+    """
+    for token in tokens:
+        scopes = [0, 10]
+        if token.startswith("Package"):
+            token = token.removeprefix("Package")
+            scopes = [0]
+        elif token.startswith("Database"):
+            token = token.removeprefix("Database")
+            scopes = [10]
+
+        for shift in scopes:
+            if token == "Never":
+                level &= ~(SIG_PACKAGE << shift)
+            elif token == "Optional":
+                level |= (SIG_PACKAGE | SIG_PACKAGE_OPTIONAL) << shift
+            elif token == "Required":
+                level |= SIG_PACKAGE << shift
+                level &= ~(SIG_PACKAGE_OPTIONAL << shift)
+            elif token == "TrustedOnly":
+                level &= ~((SIG_PACKAGE_MARGINAL_OK | SIG_PACKAGE_UNKNOWN_OK) << shift)
+            elif token == "TrustAll":
+                level |= (SIG_PACKAGE_MARGINAL_OK | SIG_PACKAGE_UNKNOWN_OK) << shift
+            else:
+                raise ConfigReadError(
+                    f"error: invalid value for 'SigLevel' : '{token}'"
+                )
+
+    return level
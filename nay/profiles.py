@@ -0,0 +1,275 @@
+import configparser
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .config import CACHEDIR, CONFIG, make_cachedir
+from .exceptions import ConfigReadError
+
+BUILD_TIMES = os.path.join(CACHEDIR, "build_times.jsonl")
+
+# The compressor commands of makepkg.conf, with the highest level each compressor accepts. Higher levels are capped
+COMPRESSORS = {
+    "COMPRESSZST": ("zstd -c -T0 -{level} -", 19),
+    "COMPRESSXZ": ("xz -c -z -T0 -{level} -", 9),
+    "COMPRESSGZ": ("gzip -c -f -n -{level}", 9),
+}
+
+# Loads makepkg.conf the way makepkg does when it is run without --config: the system file, its drop-ins, then the
+# user's own makepkg.conf
+SOURCE_MAKEPKG_CONF = """source /etc/makepkg.conf
+for conf in /etc/makepkg.conf.d/*.conf; do [[ -f "$conf" ]] && source "$conf"; done
+if [[ -r "${XDG_CONFIG_HOME:-$HOME/.config}/pacman/makepkg.conf" ]]; then
+    source "${XDG_CONFIG_HOME:-$HOME/.config}/pacman/makepkg.conf"
+elif [[ -r "$HOME/.makepkg.conf" ]]; then
+    source "$HOME/.makepkg.conf"
+fi
+"""
+
+
+@dataclass
+class BuildProfile:
+    """
+    A named set of overrides applied to each 'makepkg' invocation, read from a '[profile:<name>]' section of nay.conf.
+    Unset fields leave the system makepkg.conf untouched.
+    """
+
+    name: str
+    jobs: Optional[int] = None
+    builddir: Optional[str] = None
+    compiler_cache: Optional[str] = None
+    compress_level: Optional[int] = None
+    pkgext: Optional[str] = None
+    nocheck: str = "never"
+
+    @classmethod
+    def from_section(
+        cls, name: str, section: configparser.SectionProxy
+    ) -> "BuildProfile":
+        jobs = section.get("jobs")
+        if jobs == "auto":
+            jobs = os.cpu_count()
+        elif jobs is not None:
+            jobs = get_int(name, section, "Jobs", 1)
+
+        compiler_cache = section.get("compilercache")
+        if compiler_cache not in (None, "ccache", "sccache"):
+            raise ConfigReadError(
+                f"error: invalid CompilerCache '{compiler_cache}' in profile '{name}': expected ccache or sccache"
+            )
+
+        nocheck = section.get("nocheck", "never")
+        if nocheck not in ("never", "deps", "always"):
+            raise ConfigReadError(
+                f"error: invalid NoCheck '{nocheck}' in profile '{name}': expected never, deps or always"
+            )
+
+        compress_level = None
+        if section.get("compresslevel") is not None:
+            compress_level = get_int(name, section, "CompressLevel", 1, 19)
+
+        return cls(
+            name=name,
+            jobs=jobs,
+            builddir=section.get("builddir"),
+            compiler_cache=compiler_cache,
+            compress_level=compress_level,
+            pkgext=section.get("pkgext"),
+            nocheck=nocheck,
+        )
+
+    def makepkg_args(self, asdeps: bool = False) -> list[str]:
+        """
+        Get the extra arguments to pass to 'makepkg'
+
+        :param asdeps: Whether the package being built will be installed as a dependency
+        :type asdeps: bool
+
+        :return: A list of extra arguments
+        :rtype: list[str]
+        """
+        args = []
+        if self.nocheck == "always" or (self.nocheck == "deps" and asdeps is True):
+            args.append("--nocheck")
+
+        conf = self.makepkg_conf()
+        if conf is not None:
+            args.extend(["--config", conf])
+
+        return args
+
+    def makepkg_env(self, env: dict[str, str]) -> dict[str, str]:
+        """
+        Apply the profile's environment overrides. makepkg gives BUILDDIR and PKGEXT from the environment precedence over
+        makepkg.conf.
+
+        :param env: The environment to update
+        :type env: dict[str, str]
+
+        :return: The updated environment
+        :rtype: dict[str, str]
+        """
+        if self.builddir is not None:
+            os.makedirs(self.builddir, exist_ok=True)
+            env["BUILDDIR"] = self.builddir
+        if self.pkgext is not None:
+            env["PKGEXT"] = self.pkgext
+        if self.compiler_cache == "sccache":
+            # sccache can't be enabled through BUILDENV like ccache. Cover Rust, and C/C++ built with CMake
+            env["RUSTC_WRAPPER"] = "sccache"
+            env["CMAKE_C_COMPILER_LAUNCHER"] = "sccache"
+            env["CMAKE_CXX_COMPILER_LAUNCHER"] = "sccache"
+
+        return env
+
+    def makepkg_conf(self) -> Optional[str]:
+        """
+        Write a makepkg.conf which sources the system and user makepkg.conf and applies this profile's overrides on top
+        of them
+
+        :return: The path to the generated makepkg.conf, or None if the profile has nothing to override
+        :rtype: Optional[str]
+        """
+        lines = []
+        if self.jobs is not None:
+            lines.append(f'MAKEFLAGS="-j{self.jobs}"')
+        if self.compiler_cache == "ccache":
+            lines.append('BUILDENV=("${BUILDENV[@]/#!ccache/ccache}")')
+            lines.append(
+                '[[ " ${BUILDENV[*]} " == *" ccache "* ]] || BUILDENV+=(ccache)'
+            )
+        if self.compress_level is not None:
+            for var, (command, max_level) in COMPRESSORS.items():
+                level = min(self.compress_level, max_level)
+                lines.append(f"{var}=({command.format(level=level)})")
+
+        if not lines:
+            return None
+
+        path = os.path.join(CACHEDIR, "profiles", f"{self.name}.makepkg.conf")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(SOURCE_MAKEPKG_CONF)
+            f.write("\n".join(lines) + "\n")
+
+        return path
+
+
+def get_int(
+    name: str,
+    section: configparser.SectionProxy,
+    key: str,
+    minimum: int,
+    maximum: Optional[int] = None,
+) -> int:
+    """
+    Read an integer setting of a profile
+
+    :param name: The name of the profile
+    :type name: str
+    :param section: The section of the profile
+    :type section: configparser.SectionProxy
+    :param key: The key of the setting
+    :type key: str
+    :param minimum: The lowest valid value
+    :type minimum: int
+    :param maximum: Optional highest valid value. Default is None
+    :type maximum: Optional[int]
+
+    :return: The value of the setting
+    :rtype: int
+
+    :raises ConfigReadError: If the value is not an integer or out of range
+    """
+    value = section.get(key.lower())
+    valid = f"at least {minimum}" if maximum is None else f"{minimum}-{maximum}"
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+
+    if number is None or number < minimum or (maximum is not None and number > maximum):
+        raise ConfigReadError(
+            f"error: invalid {key} '{value}' in profile '{name}': expected {valid}"
+        )
+
+    return number
+
+
+def load_profile(name: Optional[str] = None, config: str = CONFIG) -> BuildProfile:
+    """
+    Load a build profile from nay.conf. If no name is passed, the 'BuildProfile' from the '[options]' section is used.
+
+    :param name: Optional name of the profile to load
+    :type name: Optional[str]
+    :param config: Optional path to nay.conf
+    :type config: Optional[str]
+
+    :return: The build profile. A profile without overrides named 'default' is returned if none is configured
+    :rtype: BuildProfile
+    """
+    parser = configparser.ConfigParser()
+    parser.read(config)
+
+    if name is None:
+        name = parser.get("options", "buildprofile", fallback=None)
+        if name is None:
+            return BuildProfile(name="default")
+
+    section = f"profile:{name}"
+    if not parser.has_section(section):
+        raise ConfigReadError(f"error: build profile '{name}' not found in {config}")
+
+    return BuildProfile.from_section(name, parser[section])
+
+
+def record_build_time(
+    pkgname: str, profile: BuildProfile, seconds: float, status: int
+) -> None:
+    """
+    Append a build's wall time to the build time log
+
+    :param pkgname: The name of the package that was built
+    :type pkgname: str
+    :param profile: The profile the package was built with
+    :type profile: BuildProfile
+    :param seconds: The wall time of the build
+    :type seconds: float
+    :param status: The exit status of 'makepkg'
+    :type status: int
+    """
+    record = {
+        "name": pkgname,
+        "profile": profile.name,
+        "seconds": round(seconds, 3),
+        "status": status,
+        "date": datetime.now().isoformat(timespec="seconds"),
+    }
+    make_cachedir()
+    with open(BUILD_TIMES, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def get_build_times(pkgname: str) -> dict[str, float]:
+    """
+    Get the most recent successful build time of a package under each profile it was built with
+
+    :param pkgname: The name of the package
+    :type pkgname: str
+
+    :return: A mapping of profile name to wall time in seconds
+    :rtype: dict[str, float]
+    """
+    times = {}
+    try:
+        with open(BUILD_TIMES, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["name"] == pkgname and record["status"] == 0:
+                    times[record["profile"]] = record["seconds"]
+    except FileNotFoundError:
+        pass
+
+    return times
@@ -0,0 +1,110 @@
+import contextlib
+import os
+import resource
+import time
+from typing import Iterator, Optional
+
+from .console import NayConsole
+
+# Number of allocation sites listed in a memory profile
+TOP_ALLOCATIONS = 25
+
+# Frames kept per traced allocation. Enough to see which nay call an allocation in Rich or requests came from
+TRACEBACK_DEPTH = 8
+
+DEFAULT_OUTPUT = {"cpu": "nay.pstats", "mem": "nay.tracemalloc.txt"}
+
+
+@contextlib.contextmanager
+def profile(
+    mode: str, console: NayConsole, path: Optional[str] = None
+) -> Iterator[None]:
+    """
+    Profile the code run inside the context. 'cpu' writes a pstats file of nay's own CPU time; time spent in child
+    processes (makepkg, pacman, git) is excluded from the profile and reported separately. 'mem' writes the top
+    allocation sites traced by tracemalloc.
+
+    :param mode: 'cpu' or 'mem'
+    :type mode: str
+    :param console: The console to report to
+    :type console: NayConsole
+    :param path: Optional path of the report. Default is DEFAULT_OUTPUT[mode] in the current directory
+    :type path: Optional[str]
+    """
+    # makepkg changes directory, so resolve the path before running anything
+    path = os.path.abspath(path or DEFAULT_OUTPUT[mode])
+    if mode == "cpu":
+        with profile_cpu(console, path):
+            yield
+    else:
+        with profile_mem(console, path):
+            yield
+
+
+@contextlib.contextmanager
+def profile_cpu(console: NayConsole, path: str) -> Iterator[None]:
+    import cProfile
+
+    # process_time only advances while nay itself runs, so waiting on child processes does not show up in the profile
+    profiler = cProfile.Profile(time.process_time)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        wall = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        profiler.dump_stats(path)
+
+        import pstats
+
+        cpu = pstats.Stats(profiler).total_tt
+        child_user = after.ru_utime - children.ru_utime
+        child_sys = after.ru_stime - children.ru_stime
+        console.notify(f"CPU profile written to {path}")
+        console.print(
+            f" wall {wall:.3f}s, nay {cpu:.3f}s CPU, child processes "
+            f"{child_user:.3f}s user + {child_sys:.3f}s sys",
+            highlight=False,
+        )
+
+
+@contextlib.contextmanager
+def profile_mem(console: NayConsole, path: str) -> Iterator[None]:
+    import tracemalloc
+
+    tracemalloc.start(TRACEBACK_DEPTH)
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ]
+        )
+        with open(path, "w") as f:
+            f.write(f"current: {current} B\npeak: {peak} B\n\n")
+            for num, stat in enumerate(
+                snapshot.statistics("traceback")[:TOP_ALLOCATIONS], start=1
+            ):
+                f.write(f"#{num}: {stat.size} B in {stat.count} blocks\n")
+                for line in stat.traceback.format(most_recent_first=True):
+                    f.write(f"{line}\n")
+                f.write("\n")
+
+        from .package import SyncPackage
+
+        format_bytes = SyncPackage.format_bytes
+        console.notify(f"Memory profile written to {path}")
+        console.print(
+            f" peak {format_bytes(peak)}, {format_bytes(current)} still allocated",
+            highlight=False,
+        )
@@ -0,0 +1,333 @@
+import configparser
+import contextlib
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from .config import CACHEDIR, CONFIG
+from .exceptions import ConfigReadError
+
+# HTTP statuses worth retrying: rate limited or a transient failure of the server
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+# The token bucket shared between nay processes when SharedRateLimit is enabled
+SHARED_STATE = os.path.join(CACHEDIR, "aur.ratelimit")
+
+
+@dataclass
+class RateLimitPolicy:
+    """
+    How nay paces and retries AUR requests, read from the '[aur]' section of nay.conf
+
+    :param rate: The number of requests per second sent at most
+    :type rate: float
+    :param burst: The number of requests sent without waiting after an idle period
+    :type burst: int
+    :param retries: The number of times a failed request is retried
+    :type retries: int
+    :param backoff: The delay in seconds before the first retry. It doubles with every further retry
+    :type backoff: float
+    :param max_backoff: The longest delay in seconds between retries. Requests answered with a longer Retry-After are
+    not retried
+    :type max_backoff: float
+    :param breaker_threshold: The number of failed requests in a row after which the AUR is considered down
+    :type breaker_threshold: int
+    :param breaker_cooldown: The number of seconds no requests are sent once the AUR is considered down
+    :type breaker_cooldown: float
+    :param shared: Whether the token bucket is shared with other nay processes through SHARED_STATE
+    :type shared: bool
+    :param connect_timeout: The number of seconds to wait for a connection to the AUR
+    :type connect_timeout: float
+    :param read_timeout: The number of seconds to wait for the AUR to send data once connected
+    :type read_timeout: float
+    """
+
+    rate: float = 5
+    burst: int = 20
+    retries: int = 4
+    backoff: float = 0.5
+    max_backoff: float = 60
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 60
+    shared: bool = False
+    connect_timeout: float = 10
+    read_timeout: float = 30
+
+
+def load_policy(config: str = CONFIG) -> RateLimitPolicy:
+    """
+    Load the rate limit policy from the '[aur]' section of nay.conf
+
+    :param config: Optional path to nay.conf
+    :type config: Optional[str]
+
+    :return: The rate limit policy. The defaults are used for anything not configured
+    :rtype: RateLimitPolicy
+    """
+    parser = configparser.ConfigParser()
+    parser.read(config)
+    if not parser.has_section("aur"):
+        return RateLimitPolicy()
+
+    section = parser["aur"]
+    try:
+        policy = RateLimitPolicy(
+            rate=section.getfloat("requestrate", fallback=RateLimitPolicy.rate),
+            burst=section.getint("requestburst", fallback=RateLimitPolicy.burst),
+            retries=section.getint("maxretries", fallback=RateLimitPolicy.retries),
+            shared=section.getboolean("sharedratelimit", fallback=False),
+            connect_timeout=section.getfloat(
+                "connecttimeout", fallback=RateLimitPolicy.connect_timeout
+            ),
+            read_timeout=section.getfloat(
+                "readtimeout", fallback=RateLimitPolicy.read_timeout
+            ),
+        )
+        if policy.rate <= 0 or policy.burst < 1 or policy.retries < 0:
+            raise ValueError(
+                "RequestRate and RequestBurst must be positive, MaxRetries must not be negative"
+            )
+        if policy.connect_timeout <= 0 or policy.read_timeout <= 0:
+            raise ValueError("ConnectTimeout and ReadTimeout must be positive")
+    except ValueError as err:
+        raise ConfigReadError(f"error: invalid [aur] setting in {config}: {err}")
+
+    return policy
+
+
+class TokenBucket:
+    """
+    A token bucket pacing requests across threads. With a state file, the bucket is kept in that file under an
+    exclusive lock and shared with every process using the same file.
+
+    :param rate: The number of tokens added per second
+    :type rate: float
+    :param burst: The number of tokens the bucket holds at most
+    :type burst: int
+    :param path: Optional path of a state file shared between processes. Default is None
+    :type path: Optional[str]
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def state(self) -> Iterator[None]:
+        """
+        Hold the bucket. With a state file, the file is locked and the state is read before and written after
+        """
+        with self.lock:
+            if self.path is None:
+                yield
+                return
+
+            import fcntl
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    tokens, updated = f.read().split()
+                    self.tokens, self.updated = float(tokens), float(updated)
+                except ValueError:
+                    self.tokens, self.updated = float(self.burst), self.clock()
+                yield
+                f.seek(0)
+                f.truncate()
+                f.write(f"{self.tokens} {self.updated}\n")
+
+    def refill(self) -> None:
+        now = self.clock()
+        # The clock may be behind a shared state written before a reboot or by a process with a skewed clock
+        elapsed = max(0, now - self.updated)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting until one is available
+
+        :return: The number of seconds waited
+        :rtype: float
+        """
+        waited = 0
+        while True:
+            with self.state():
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+
+            self.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every user of the bucket for a number of seconds, e.g. after the server answered with Retry-After
+
+        :param seconds: The number of seconds no token is handed out
+        :type seconds: float
+        """
+        with self.state():
+            self.refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    def slow_down(self) -> None:
+        """
+        Halve the rate of this process after being rate limited, down to one request every ten seconds
+        """
+        with self.lock:
+            self.rate = max(self.rate / 2, min(0.1, self.max_rate))
+
+    def speed_up(self) -> None:
+        """
+        Recover a tenth of the configured rate after a successful request
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after a number of failed requests in a row. Once the cooldown passed, a single trial request
+    is let through; it closes the breaker if it succeeds and reopens it for another cooldown if it fails.
+
+    :param threshold: The number of failed requests in a row which open the breaker
+    :type threshold: int
+    :param cooldown: The number of seconds the breaker stays open
+    :type cooldown: float
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened: Optional[float] = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened is not None
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent
+
+        :return: True if the breaker is closed or this is the trial request after the cooldown
+        :rtype: bool
+        """
+        with self.lock:
+            if self.opened is None:
+                return True
+            if self.clock() - self.opened < self.cooldown:
+                return False
+
+            # Let this request through as the trial and keep everyone else waiting for its outcome
+            self.opened = self.clock()
+            return True
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened = None
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened = self.clock()
+
+
+class Throttle:
+    """
+    The rate limiter, retry policy and circuit breaker of an AUR client
+
+    :param policy: Optional rate limit policy. Default is load_policy()
+    :type policy: Optional[RateLimitPolicy]
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RateLimitPolicy] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.policy = policy if policy is not None else load_policy()
+        self.bucket = TokenBucket(
+            self.policy.rate,
+            self.policy.burst,
+            path=SHARED_STATE if self.policy.shared is True else None,
+            sleep=sleep,
+        )
+        self.breaker = CircuitBreaker(
+            self.policy.breaker_threshold, self.policy.breaker_cooldown
+        )
+        self.random = random.Random()
+
+    def get_backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry: a random time between half and all of the exponential backoff, so clients
+        failing at the same moment don't retry at the same moment
+
+        :param attempt: The number of the failed attempt, starting at 0
+        :type attempt: int
+
+        :return: The delay in seconds
+        :rtype: float
+        """
+        ceiling = min(self.policy.max_backoff, self.policy.backoff * 2**attempt)
+        return self.random.uniform(ceiling / 2, ceiling)
+
+
+def get_retry_after(headers: dict) -> Optional[float]:
+    """
+    Parse the Retry-After header of a response, given either in seconds or as an HTTP date
+
+    :param headers: The headers of the response
+    :type headers: dict
+
+    :return: The number of seconds to wait, or None if the header is missing or invalid
+    :rtype: Optional[float]
+    """
+    import email.utils
+
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, date.timestamp() - time.time())
@@ -0,0 +1,46 @@
+import json
+import sys
+from typing import Optional, TextIO
+
+FORMATS = ("json", "ndjson")
+
+
+class RecordWriter:
+    """
+    Stream machine-readable records to a file, one record at a time. 'ndjson' writes one JSON object per line; 'json'
+    writes a single JSON array. Records are never held in memory.
+
+    :param output_format: The output format, either 'json' or 'ndjson'
+    :type output_format: str
+    :param file: Optional stream to write to. Default is sys.stdout
+    :type file: Optional[TextIO]
+    """
+
+    def __init__(self, output_format: str, file: Optional[TextIO] = None) -> None:
+        if output_format not in FORMATS:
+            raise ValueError(f"invalid output format: {output_format}")
+
+        self.output_format = output_format
+        self.file = file if file is not None else sys.stdout
+        self.count = 0
+
+    def __enter__(self) -> "RecordWriter":
+        if self.output_format == "json":
+            self.file.write("[")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, record: dict) -> None:
+        data = json.dumps(record, default=str)
+        if self.output_format == "json":
+            self.file.write(f"{',' if self.count else ''}\n  {data}")
+        else:
+            self.file.write(f"{data}\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self.output_format == "json":
+            self.file.write("\n]\n" if self.count else "]\n")
+        self.file.flush()
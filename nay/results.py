@@ -0,0 +1,321 @@
+from array import array
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
+
+from .package import AURBasic, SyncPackage
+
+if TYPE_CHECKING:
+    import pyalpm
+
+STRING_COLUMNS = ("db", "name", "version", "desc")
+NUMERIC_COLUMNS = (
+    "votes",
+    "popularity",
+    "size",
+    "isize",
+    "installed",
+    "status",
+    "orphaned",
+    "flag_date",
+)
+
+NOT_INSTALLED = 0
+UP_TO_DATE = 1
+OUTDATED = 2
+INSTALLED = 3
+
+STATUS_LABELS = {
+    NOT_INSTALLED: None,
+    UP_TO_DATE: "up-to-date",
+    OUTDATED: "outdated",
+    INSTALLED: "installed",
+}
+
+
+class SearchResults:
+    """
+    Columnar search results. Each field is stored in its own array (strings are stored as indices into a shared string
+    table), so large result sets can be sorted, filtered and sliced without creating a Python object per package.
+    Package objects are only created for the rows that are actually used with get_package.
+
+    Rows are numbered from len(results) (first row) down to 1 (last row), matching the order results are printed in.
+    """
+
+    __slots__ = ("strings", "_string_ids") + STRING_COLUMNS + NUMERIC_COLUMNS
+
+    def __init__(self, strings: Optional[list[str]] = None) -> None:
+        self.strings = strings if strings is not None else []
+        self._string_ids = {string: num for num, string in enumerate(self.strings)}
+        self.db = array("I")
+        self.name = array("I")
+        self.version = array("I")
+        self.desc = array("I")
+        self.votes = array("q")
+        self.popularity = array("d")
+        self.size = array("q")
+        self.isize = array("q")
+        self.installed = array("i")
+        self.status = array("b")
+        self.orphaned = array("b")
+        self.flag_date = array("q")
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index: slice) -> "SearchResults":
+        return self.take(range(len(self))[index])
+
+    def intern(self, string: Optional[str]) -> int:
+        """
+        Get the index of a string in the string table, adding it if it is not there yet
+
+        :param string: The string to look up
+        :type string: Optional[str]
+
+        :return: The index of the string
+        :rtype: int
+        """
+        if string is None:
+            string = ""
+        num = self._string_ids.get(string)
+        if num is None:
+            num = len(self.strings)
+            self.strings.append(string)
+            self._string_ids[string] = num
+
+        return num
+
+    def append_sync(self, pkg: "pyalpm.Package") -> None:
+        """
+        Append a sync database package
+
+        :param pkg: The pyalpm package to append
+        :type pkg: pyalpm.Package
+        """
+        self.db.append(self.intern(pkg.db.name))
+        self.name.append(self.intern(pkg.name))
+        self.version.append(self.intern(pkg.version))
+        self.desc.append(self.intern(pkg.desc))
+        self.votes.append(-1)
+        self.popularity.append(-1.0)
+        self.size.append(pkg.size)
+        self.isize.append(pkg.isize)
+        self.installed.append(-1)
+        self.status.append(NOT_INSTALLED)
+        self.orphaned.append(False)
+        self.flag_date.append(0)
+
+    def append_aur(self, result: dict) -> None:
+        """
+        Append a package from an AURweb RPC search query
+
+        :param result: The search result of the package
+        :type result: dict
+        """
+        self.db.append(self.intern("aur"))
+        self.name.append(self.intern(result["Name"]))
+        self.version.append(self.intern(result["Version"]))
+        self.desc.append(self.intern(result["Description"]))
+        self.votes.append(result["NumVotes"])
+        self.popularity.append(result["Popularity"])
+        self.size.append(-1)
+        self.isize.append(-1)
+        self.installed.append(-1)
+        self.status.append(NOT_INSTALLED)
+        self.orphaned.append(result["Maintainer"] is None)
+        self.flag_date.append(result["OutOfDate"] or 0)
+
+    def mark_installed(
+        self, installed: dict[str, str], vercmp: Callable[[str, str], int]
+    ) -> None:
+        """
+        Set the installed version and status of every row from a snapshot of the local database
+
+        :param installed: A mapping of installed package names to versions
+        :type installed: dict[str, str]
+        :param vercmp: A function comparing two versions, e.g. pyalpm.vercmp
+        :type vercmp: Callable[[str, str], int]
+        """
+        strings = self.strings
+        for row in range(len(self)):
+            local = installed.get(strings[self.name[row]])
+            if local is None:
+                self.installed[row] = -1
+                self.status[row] = NOT_INSTALLED
+                continue
+
+            self.installed[row] = self.intern(local)
+            cmp = vercmp(local, strings[self.version[row]])
+            if cmp == 0:
+                self.status[row] = UP_TO_DATE
+            elif cmp < 0:
+                self.status[row] = OUTDATED
+            else:
+                self.status[row] = INSTALLED
+
+    def get_installed_version(self, row: int) -> Optional[str]:
+        num = self.installed[row]
+        return self.strings[num] if num >= 0 else None
+
+    def get_record(self, row: int) -> dict:
+        """
+        Get a machine-readable record of a row
+
+        :param row: The row index
+        :type row: int
+
+        :return: The row's fields
+        :rtype: dict
+        """
+        record = {
+            "db": self.get_string("db", row),
+            "name": self.get_string("name", row),
+            "version": self.get_string("version", row),
+            "desc": self.get_string("desc", row),
+        }
+        if self.is_aur(row):
+            record["votes"] = self.votes[row]
+            record["popularity"] = self.popularity[row]
+            record["orphaned"] = bool(self.orphaned[row])
+            record["flag_date"] = self.flag_date[row] or None
+        else:
+            record["size"] = self.size[row]
+            record["isize"] = self.isize[row]
+        record["installed"] = self.get_installed_version(row)
+        record["status"] = STATUS_LABELS[self.status[row]]
+
+        return record
+
+    def take(self, rows: Union[range, list[int]]) -> "SearchResults":
+        """
+        Get a new result set made of the given rows, in the given order. The string table is shared.
+
+        :param rows: The row indices to take
+        :type rows: Union[range, list[int]]
+
+        :return: The new result set
+        :rtype: SearchResults
+        """
+        results = SearchResults.__new__(SearchResults)
+        results.strings = self.strings
+        results._string_ids = self._string_ids
+        for column in STRING_COLUMNS + NUMERIC_COLUMNS:
+            source = getattr(self, column)
+            setattr(
+                results, column, array(source.typecode, [source[row] for row in rows])
+            )
+
+        return results
+
+    def sort(
+        self, key: Callable[[int], object], reverse: bool = False
+    ) -> "SearchResults":
+        """
+        Sort the result set
+
+        :param key: A function taking a row index and returning its sort key
+        :type key: Callable[[int], object]
+        :param reverse: Optional parameter indicating whether the order should be reversed. Default is False
+        :type reverse: Optional[bool]
+
+        :return: The sorted result set
+        :rtype: SearchResults
+        """
+        rows = sorted(range(len(self)), key=key)
+        if reverse is True:
+            rows.reverse()
+
+        return self.take(rows)
+
+    def filter(self, predicate: Callable[[int], bool]) -> "SearchResults":
+        """
+        Filter the result set
+
+        :param predicate: A function taking a row index and returning whether the row should be kept
+        :type predicate: Callable[[int], bool]
+
+        :return: The filtered result set
+        :rtype: SearchResults
+        """
+        return self.take([row for row in range(len(self)) if predicate(row)])
+
+    def extend(self, other: "SearchResults") -> None:
+        """
+        Append the rows of another result set
+
+        :param other: The result set to append
+        :type other: SearchResults
+        """
+        ids = array("I", [self.intern(string) for string in other.strings])
+        for column in STRING_COLUMNS:
+            getattr(self, column).extend(ids[num] for num in getattr(other, column))
+        for column in NUMERIC_COLUMNS:
+            if column == "installed":
+                self.installed.extend(
+                    ids[num] if num >= 0 else -1 for num in other.installed
+                )
+            else:
+                getattr(self, column).extend(getattr(other, column))
+
+    def get_string(self, column: str, row: int) -> str:
+        return self.strings[getattr(self, column)[row]]
+
+    def is_aur(self, row: int) -> bool:
+        return self.votes[row] >= 0
+
+    def rows(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the result set in print order
+
+        :return: An iterator of (number, row index) pairs
+        :rtype: Iterator[tuple[int, int]]
+        """
+        total = len(self)
+        return ((total - row, row) for row in range(total))
+
+    def get_row(self, num: int) -> Optional[int]:
+        """
+        Get the row index of a printed package number
+
+        :param num: The package number
+        :type num: int
+
+        :return: The row index, or None if the number is out of range
+        :rtype: Optional[int]
+        """
+        if not 1 <= num <= len(self):
+            return None
+
+        return len(self) - num
+
+    def get_package(
+        self, row: int, sync: dict[str, "pyalpm.Database"]
+    ) -> Union[SyncPackage, AURBasic]:
+        """
+        Create the package object for a row
+
+        :param row: The row index
+        :type row: int
+        :param sync: The sync databases, used to look up sync packages
+        :type sync: dict[str, pyalpm.Database]
+
+        :return: The package
+        :rtype: Union[SyncPackage, AURBasic]
+        """
+        db = self.get_string("db", row)
+        name = self.get_string("name", row)
+        if not self.is_aur(row):
+            return SyncPackage.from_pyalpm(sync[db].get_pkg(name))
+
+        return AURBasic(
+            db=db,
+            name=name,
+            version=self.get_string("version", row),
+            desc=self.get_string("desc", row),
+            votes=self.votes[row],
+            popularity=self.popularity[row],
+            flag_date=self.flag_date[row] or None,
+            orphaned=bool(self.orphaned[row]),
+        )
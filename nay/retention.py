@@ -0,0 +1,363 @@
+import concurrent.futures
+import configparser
+import os
+import shutil
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .config import CACHEDIR, CONFIG
+from .exceptions import ConfigReadError
+
+# Entries of CACHEDIR which hold nay's own state rather than AUR clones
+STATE_ENTRIES = (
+    "journal",
+    "profiles",
+    "devel.json",
+    "build_times.jsonl",
+    "aur.cache",
+    "aur.ratelimit",
+    "pacman_conf.json",
+    "nay.sock",
+)
+
+# The shared makepkg SRCDEST (see nay.config.SRCDEST)
+SOURCES = "sources"
+
+SIZE_UNITS = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What '-Sc' keeps in the AUR cache, read from the '[cache]' section of nay.conf
+
+    :param keep_versions: The number of built versions to keep for each package base
+    :type keep_versions: int
+    :param remove_uninstalled: Whether clones of packages which are no longer installed are removed
+    :type remove_uninstalled: bool
+    :param max_size: Optional cap on the total size of the cache in bytes. The oldest built packages and downloaded
+    sources are removed until the cache fits. The newest version of each package is always kept
+    :type max_size: Optional[int]
+    """
+
+    keep_versions: int = 3
+    remove_uninstalled: bool = True
+    max_size: Optional[int] = None
+
+
+@dataclass
+class Artifact:
+    """
+    A built package (and its signature, if any) in a clone directory
+    """
+
+    path: str
+    version: str
+    mtime: float
+    size: int
+    signature: Optional[str] = None
+
+
+@dataclass
+class Source:
+    """
+    A downloaded source file, or VCS repository, in the shared SRCDEST
+    """
+
+    path: str
+    mtime: float
+    size: int
+
+
+@dataclass
+class Clone:
+    """
+    A package base cloned into the cache, with the total size of everything below it
+    """
+
+    name: str
+    path: str
+    size: int = 0
+    artifacts: list[Artifact] = field(default_factory=list)
+
+
+@dataclass
+class CacheScan:
+    """
+    The result of a walk over the cache directory
+    """
+
+    clones: dict[str, Clone] = field(default_factory=dict)
+    source_files: list[Source] = field(default_factory=list)
+    state: int = 0
+
+    @property
+    def sources(self) -> int:
+        return sum(source.size for source in self.source_files)
+
+    @property
+    def total(self) -> int:
+        return (
+            sum(clone.size for clone in self.clones.values())
+            + self.sources
+            + self.state
+        )
+
+
+@dataclass
+class Removal:
+    path: str
+    size: int
+    reason: str
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size such as '500M' or '20G'
+
+    :param size: The size, in bytes or with a K, M, G or T suffix
+    :type size: str
+
+    :return: The size in bytes
+    :rtype: int
+    """
+    size = size.strip().upper().removesuffix("B").removesuffix("I")
+    if size and size[-1] in SIZE_UNITS:
+        return int(float(size[:-1]) * SIZE_UNITS[size[-1]])
+
+    return int(size)
+
+
+def load_policy(config: str = CONFIG) -> RetentionPolicy:
+    """
+    Load the retention policy from the '[cache]' section of nay.conf
+
+    :param config: Optional path to nay.conf
+    :type config: Optional[str]
+
+    :return: The retention policy. The defaults are used for anything not configured
+    :rtype: RetentionPolicy
+    """
+    parser = configparser.ConfigParser()
+    parser.read(config)
+    if not parser.has_section("cache"):
+        return RetentionPolicy()
+
+    section = parser["cache"]
+    try:
+        max_size = section.get("maxsize")
+        return RetentionPolicy(
+            keep_versions=section.getint("keepversions", fallback=3),
+            remove_uninstalled=section.getboolean("removeuninstalled", fallback=True),
+            max_size=parse_size(max_size) if max_size is not None else None,
+        )
+    except ValueError as err:
+        raise ConfigReadError(f"error: invalid [cache] setting in {config}: {err}")
+
+
+def get_tree_size(path: str) -> int:
+    """
+    Get the size of a directory tree, without following symlinks
+
+    :param path: The directory to measure
+    :type path: str
+
+    :return: The total size in bytes of every file below the directory
+    :rtype: int
+    """
+    size = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+
+    return size
+
+
+def scan(cachedir: str = CACHEDIR) -> CacheScan:
+    """
+    Walk the cache directory once, recording the size of every clone, the built packages in it, the shared sources
+    and nay's own state
+
+    :param cachedir: Optional path to the cache directory. Default is CACHEDIR
+    :type cachedir: Optional[str]
+
+    :return: The scan result
+    :rtype: CacheScan
+    """
+    result = CacheScan()
+    try:
+        entries = list(os.scandir(cachedir))
+    except FileNotFoundError:
+        return result
+
+    for entry in entries:
+        if entry.name == SOURCES:
+            result.source_files = scan_sources(entry.path)
+        elif entry.name in STATE_ENTRIES or not entry.is_dir(follow_symlinks=False):
+            if entry.is_dir(follow_symlinks=False):
+                result.state += get_tree_size(entry.path)
+            else:
+                result.state += entry.stat(follow_symlinks=False).st_size
+        else:
+            result.clones[entry.name] = scan_clone(entry.name, entry.path)
+
+    return result
+
+
+def scan_sources(path: str) -> list[Source]:
+    sources = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            stat = entry.stat(follow_symlinks=False)
+            if entry.is_dir(follow_symlinks=False):
+                size = get_tree_size(entry.path)
+            else:
+                size = stat.st_size
+            sources.append(Source(path=entry.path, mtime=stat.st_mtime, size=size))
+
+    return sources
+
+
+def scan_clone(name: str, path: str) -> Clone:
+    clone = Clone(name=name, path=path)
+    signatures = {}
+    artifacts = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                clone.size += get_tree_size(entry.path)
+                continue
+
+            stat = entry.stat(follow_symlinks=False)
+            clone.size += stat.st_size
+            if ".pkg.tar" not in entry.name:
+                continue
+            if entry.name.endswith(".sig"):
+                signatures[entry.name.removesuffix(".sig")] = (entry.path, stat.st_size)
+                continue
+
+            # <pkgname>-<pkgver>-<pkgrel>-<arch>.pkg.tar.<ext>
+            parts = entry.name.split(".pkg.tar")[0].rsplit("-", 3)
+            version = "-".join(parts[1:3]) if len(parts) == 4 else entry.name
+            artifacts[entry.name] = Artifact(
+                path=entry.path, version=version, mtime=stat.st_mtime, size=stat.st_size
+            )
+
+    for name, artifact in artifacts.items():
+        if name in signatures:
+            artifact.signature, size = signatures[name]
+            artifact.size += size
+        clone.artifacts.append(artifact)
+
+    return clone
+
+
+def plan(
+    cache: CacheScan, policy: RetentionPolicy, installed: Iterable[str]
+) -> list[Removal]:
+    """
+    Decide what to remove from the cache
+
+    :param cache: The scanned cache
+    :type cache: CacheScan
+    :param policy: The retention policy to apply
+    :type policy: RetentionPolicy
+    :param installed: The names and package bases of the installed packages
+    :type installed: Iterable[str]
+
+    :return: The files and directories to remove
+    :rtype: list[Removal]
+    """
+    installed = set(installed)
+    removals = []
+    # Kept packages which may still go to fit the size cap: every version but the newest one of each package
+    evictable = []
+    for clone in cache.clones.values():
+        if policy.remove_uninstalled is True and clone.name not in installed:
+            removals.append(Removal(clone.path, clone.size, "not installed"))
+            continue
+
+        versions = []
+        for artifact in sorted(clone.artifacts, key=lambda a: a.mtime, reverse=True):
+            if artifact.version not in versions:
+                versions.append(artifact.version)
+            index = versions.index(artifact.version)
+            if index < policy.keep_versions:
+                if index > 0:
+                    evictable.append(artifact)
+            else:
+                removals.append(Removal(artifact.path, artifact.size, "old version"))
+
+    if policy.max_size is not None:
+        total = cache.total - sum(removal.size for removal in removals)
+        entries = [*evictable, *cache.source_files]
+        for entry in sorted(entries, key=lambda e: e.mtime):
+            if total <= policy.max_size:
+                break
+            removals.append(Removal(entry.path, entry.size, "over size limit"))
+            total -= entry.size
+
+    return removals
+
+
+def plan_wipe(cache: CacheScan, cachedir: str = CACHEDIR) -> list[Removal]:
+    """
+    Plan the removal of every clone and all downloaded sources. nay's own state (journals, the devel database, build
+    times) is kept.
+
+    :param cache: The scanned cache
+    :type cache: CacheScan
+    :param cachedir: Optional path to the cache directory. Default is CACHEDIR
+    :type cachedir: Optional[str]
+
+    :return: The directories to remove
+    :rtype: list[Removal]
+    """
+    removals = [
+        Removal(clone.path, clone.size, "wipe") for clone in cache.clones.values()
+    ]
+    if cache.sources:
+        removals.append(Removal(os.path.join(cachedir, SOURCES), cache.sources, "wipe"))
+
+    return removals
+
+
+def remove(removals: list[Removal], max_workers: int = 8) -> int:
+    """
+    Delete planned removals in parallel
+
+    :param removals: The removals to carry out
+    :type removals: list[Removal]
+    :param max_workers: Optional maximum number of concurrent deletions. Default is 8
+    :type max_workers: Optional[int]
+
+    :return: The number of bytes freed
+    :rtype: int
+    """
+
+    def delete(removal: Removal) -> int:
+        try:
+            if os.path.isdir(removal.path) and not os.path.islink(removal.path):
+                shutil.rmtree(removal.path)
+            else:
+                os.remove(removal.path)
+                signature = f"{removal.path}.sig"
+                if os.path.exists(signature):
+                    os.remove(signature)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return 0
+
+        return removal.size
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(delete, removals))
@@ -1,15 +1,21 @@
 import sys
 import concurrent.futures
-import shlex
-import subprocess
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
-from nay.exceptions import MissingTargets
+from nay.exceptions import BuildError, InstallError, MissingTargets
 from nay.operations import Operation
-import networkx as nx
+import pyalpm
 
+from .command import pacman, run
 from .package import AURBasic, AURPackage, SyncPackage
+from .devel import DevelDB
+from .graph import compose, topological_generations
+from .journal import Journal
+from .profiles import BuildProfile, load_profile
+from .records import RecordWriter
+from .results import SearchResults
+from .tracing import span
 
 
 @dataclass
@@ -29,7 +35,7 @@ class Sync(Operation):
                 force = True
             self.aur.refresh(force=force)
 
-            if not self.targets:
+            if not self.targets and "--sysupgrade" not in self.pacman_params:
                 return
 
         if "--sysupgrade" in self.pacman_params:
@@ -38,13 +44,15 @@ class Sync(Operation):
             self.pacman_params = list(
                 filter(lambda x: x != "--sysupgrade", self.pacman_params)
             )
+            self.upgrade_aur()
 
             if not self.targets:
                 return
 
         if "--clean" in self.pacman_params:
-            params = self.pacman_params + self.targets
-            self.wrap_sync(params, sudo=True)
+            if self.dry_run is False:
+                params = self.pacman_params + self.targets
+                self.wrap_sync(params, sudo=True)
             self.clean_pkgcache()
             return
 
@@ -54,8 +62,15 @@ class Sync(Operation):
                 self.wrap_sync(params, sudo=False)
                 return
 
-            packages = self.search_packages(" ".join(self.targets))
-            self.console.print_packages(packages, self.local, include_num=False)
+            if self.output_format is not None:
+                with RecordWriter(self.output_format, file=self.output) as writer:
+                    for packages in self.search_sources(" ".join(self.targets)):
+                        for _, row in packages.rows():
+                            writer.write(packages.get_record(row))
+                return
+
+            for packages in self.search_sources(" ".join(self.targets)):
+                self.console.print_packages(packages, include_num=False)
             return
 
         if "--list" in self.pacman_params:
@@ -74,114 +89,300 @@ class Sync(Operation):
 
             return
 
+        if self.resume is True:
+            self.resume_install()
+            return
+
         if not self.targets:
             raise MissingTargets("error: no targets specified (use -h for help)")
 
         self.install()
 
-    def wrap_sync(self, params: list[str], sudo: bool = False):
-        prefix = "sudo " if sudo is True else ""
-        subprocess.run(shlex.split(f"{prefix}pacman {' '.join([p for p in params])}"))
+    def get_aur_upgrades(self) -> list[AURPackage]:
+        """
+        Get the installed foreign packages which have a newer version in the AUR. All foreign packages are compared in
+        as few AURweb RPC info requests as possible. With --devel, VCS packages whose upstream heads moved since they
+        were built are included as well. Installed '-git' packages nay has no record of are assumed to be up to date
+        and their current upstream heads are recorded.
 
-    def clean_pkgcache(self) -> None:
-        if self.console.prompt(
-            message="Do you want to remove all other AUR packages from cache? [Y/n]",
-            affirm="y",
-        ):
-            self.console.notify("removing untracked AUR files from cache...")
-            self.aur.clean_cachedir()
-
-        if self.console.prompt(
-            message="Do you want to remove ALL untracked AUR files? [Y/n]", affirm="y"
-        ):
-            self.aur.clean_untracked()
-
-    def search_packages(
-        self, query: str, sortby: Optional[str] = "db"
-    ) -> dict[int, Union[SyncPackage, AURBasic]]:
-        def search():
-            packages = []
-            for db in self.sync:
-                packages.extend(
-                    [
-                        SyncPackage.from_pyalpm(pkg)
-                        for pkg in self.sync[db].search(query)
-                    ]
+        :return: A list of AURPackage objects newer than their installed versions
+        :rtype: list[AURPackage]
+        """
+        installed = {}
+        for pkg in self.local.pkgcache:
+            if not any(db.get_pkg(pkg.name) for db in self.sync.values()):
+                installed[pkg.name] = pkg.version
+
+        upgrades = []
+        foreign = self.aur.get_packages(*installed)
+        for pkg in foreign:
+            if pyalpm.vercmp(pkg.version, installed[pkg.name]) > 0:
+                upgrades.append(pkg)
+
+        if self.devel is True:
+            self.console.notify("Checking development packages...")
+            names = set(pkg.name for pkg in upgrades)
+            devel = DevelDB()
+            # Forget packages which were removed (or moved to a sync repository) so they are no longer checked
+            uninstalled = [name for name in devel.packages if name not in installed]
+            if uninstalled:
+                devel.remove(*uninstalled)
+            untracked = [
+                pkg
+                for pkg in foreign
+                if pkg.name.endswith("-git")
+                and pkg.name not in devel
+                and pkg.name not in names
+            ]
+            if untracked:
+                self.console.notify(
+                    f"Recording upstream heads of {len(untracked)} development packages not built by nay..."
                 )
-            packages.extend(self.aur.search(query))
-            return packages
-
-        def sort_packages(packages):
-            sort_priorities = {
-                "db": {"core": 0, "extra": 1, "community": 2, "multilib": 4}
-            }
-            for num, db in enumerate(self.sync):
-                num += max([num for num in sort_priorities["db"].values()])
-                if db not in sort_priorities["db"].keys():
-                    sort_priorities["db"][db] = num
-            sort_priorities["db"]["aur"] = max(
-                [num for num in sort_priorities["db"].values()]
+                self.get_missing_pkgbuild(*untracked, verbose=False)
+                for pkg in untracked:
+                    devel.seed(pkg.name, pkg.SRCINFO)
+            outdated = devel.get_outdated(
+                [name for name in installed if name not in names]
             )
+            upgrades.extend(self.aur.get_packages(*outdated))
 
-            packages = list(
-                reversed(
-                    sorted(
-                        packages,
-                        key=lambda val: sort_priorities[sortby][getattr(val, sortby)],
-                    )
-                )
+        return upgrades
+
+    def upgrade_aur(self) -> None:
+        """
+        Check installed foreign packages for AUR updates and pass any outdated packages to the install pipeline
+        """
+        self.console.notify("Searching AUR for updates...")
+        upgrades = self.get_aur_upgrades()
+        if not upgrades:
+            self.console.print(" there is nothing to do")
+            return
+
+        installed = {pkg.name: pkg.version for pkg in self.local.pkgcache}
+        for pkg in upgrades:
+            self.console.print(
+                f"[cyan]{pkg.name}[/cyan] {installed[pkg.name]} -> [green]{pkg.version}"
             )
+        self.install(upgrades)
 
-            for num, pkg in enumerate(packages):
-                if pkg.name == query:
-                    packages.append(packages.pop(num))
+    def wrap_sync(self, params: list[str], sudo: bool = False) -> int:
+        return run(pacman(*params, sudo=sudo))
+
+    def clean_pkgcache(self) -> None:
+        """
+        Clean the AUR cache. -Sc applies the retention policy from nay.conf; -Scc removes every clone and all
+        downloaded sources. With --dry-run, only report what would be removed.
+        """
+        from .retention import load_policy, plan, plan_wipe, remove, scan
+
+        cache = scan()
+        if self.pacman_params.count("--clean") > 1:
+            removals = plan_wipe(cache)
+            message = (
+                "Do you want to remove ALL AUR clones and sources from cache? [Y/n]"
+            )
+        else:
+            installed = set()
+            for pkg in self.local.pkgcache:
+                installed.update((pkg.name, pkg.base))
+            removals = plan(cache, load_policy(), installed)
+            message = "Do you want to remove these files from the AUR cache? [Y/n]"
+
+        freed = sum(removal.size for removal in removals)
+        format_bytes = SyncPackage.format_bytes
+        self.console.notify(
+            f"AUR cache: {format_bytes(cache.total)} in {len(cache.clones)} clones "
+            f"({format_bytes(cache.sources)} of downloaded sources)"
+        )
+        if not removals:
+            self.console.print(" there is nothing to do")
+            return
+
+        if self.dry_run is True:
+            for removal in removals:
+                self.console.print(
+                    f"{removal.path} ({format_bytes(removal.size)}, {removal.reason})",
+                    highlight=False,
+                )
+        self.console.notify(
+            f"{len(removals)} entries to remove, {format_bytes(freed)} to free"
+        )
+        if self.dry_run is True:
+            return
 
-            packages = {len(packages) - num: pkg for num, pkg in enumerate(packages)}
+        if self.console.prompt(message=message, affirm="y"):
+            freed = remove(removals)
+            self.console.notify(f"freed {format_bytes(freed)}")
 
-            return packages
+    def search_sources(self, query: str) -> Iterator[SearchResults]:
+        """
+        Search the sync databases and the AUR, yielding the results of each source as soon as it finishes. The AUR is
+        queried in the background while the sync databases are searched.
 
-        packages = search()
-        packages = sort_packages(packages)
-        return packages
+        :param query: The search query
+        :type query: str
 
-    def print_pkginfo(self) -> None:
+        :return: An iterator of sorted search results: one for the sync databases, then one for the AUR
+        :rtype: Iterator[SearchResults]
         """
-        Print a package's meta data according to pacman (sync packages) or AURweb RPC interface info request (AUR packages)
+        installed = {pkg.name: pkg.version for pkg in self.local.pkgcache}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            aur = executor.submit(self.aur.search, query)
+
+            with span("sync.search"):
+                results = SearchResults()
+                for db in self.sync:
+                    for pkg in self.sync[db].search(query):
+                        results.append_sync(pkg)
+                results.mark_installed(installed, pyalpm.vercmp)
+                results = self.sort_results(results, query)
+            yield results
+
+            with span("aur.wait"):
+                aur_results = aur.result()
+            results = SearchResults()
+            for result in aur_results:
+                results.append_aur(result)
+            results.mark_installed(installed, pyalpm.vercmp)
+            yield self.sort_results(results, query)
+
+    def search_packages(self, query: str) -> SearchResults:
+        """
+        Search the sync databases and the AUR
+
+        :param query: The search query
+        :type query: str
 
-        :param packages: A package.Package or series of package.Package objects for which to retrieve info
-        :type packages: package.Package
+        :return: The search results, sorted by database with exact name matches last
+        :rtype: SearchResults
+        """
+        with span("search_packages"):
+            results = SearchResults()
+            for batch in self.search_sources(query):
+                results.extend(batch)
+
+            return self.sort_results(results, query)
+
+    def sort_results(self, results: SearchResults, query: str) -> SearchResults:
+        """
+        Sort search results by database with exact name matches last
+
+        :param results: The search results to sort
+        :type results: SearchResults
+        :param query: The search query
+        :type query: str
+
+        :return: The sorted search results
+        :rtype: SearchResults
+        """
+        sort_priorities = {"core": 0, "extra": 1, "community": 2, "multilib": 4}
+        for num, db in enumerate(self.sync):
+            num += max(sort_priorities.values())
+            if db not in sort_priorities:
+                sort_priorities[db] = num
+        sort_priorities["aur"] = max(sort_priorities.values())
+
+        priorities = {
+            results.intern(db): priority for db, priority in sort_priorities.items()
+        }
+        results = results.sort(key=lambda row: priorities[results.db[row]])
+        results = results[::-1]
+
+        exact = results.intern(query)
+        return results.sort(key=lambda row: results.name[row] == exact)
+
+    def print_pkginfo(self) -> None:
+        """
+        Print the meta data of the targets. Sync packages are read from the sync databases in-process while the AURweb
+        RPC interface is queried in the background. Packages are printed in target order.
         """
         self.console.notify("Querying AUR...")
 
-        missing = list(self.targets)
-        sync = []
-        aur = []
-        for db in self.sync:
-            for target in self.targets:
-                if self.sync[db].get_pkg(target):
-                    sync.append(target)
-                    missing.pop(missing.index(target))
-        aur = self.aur.get_packages(*self.targets)
-        for pkg in aur:
-            if pkg.name in missing:
-                missing.pop(missing.index(pkg.name))
-
-        if sync:
-            params = self.db_params + ["--info", f"{' '.join(sync)}"]
-            self.wrap_sync(params, sudo=False)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.aur.get_packages, *self.targets)
 
-        self.console.print_pkginfo(*aur)
+            sync = {}
+            for target in self.targets:
+                for db in self.sync:
+                    pkg = self.sync[db].get_pkg(target)
+                    if pkg:
+                        sync[target] = SyncPackage.from_pyalpm(pkg)
+                        break
+
+            aur = {pkg.name: pkg for pkg in future.result()}
+
+        packages = []
+        missing = []
+        for target in self.targets:
+            found = [pkg for pkg in (sync.get(target), aur.get(target)) if pkg]
+            if not found:
+                missing.append(target)
+            packages.extend(found)
+
+        if self.output_format is not None:
+            with RecordWriter(self.output_format, file=self.output) as writer:
+                for pkg in packages:
+                    writer.write(pkg.to_record())
+        else:
+            self.console.print_pkginfo(*packages)
 
         if missing:
-            self.console.alert(
-                f"Packages not in AUR: {', '.join([pkg for pkg in missing])}"
+            self.console.alert(f"Packages not found: {', '.join(missing)}")
+
+    def get_missing_pkgbuild(
+        self, *packages: AURPackage, multithread=True, verbose=False
+    ) -> None:
+        """
+        Get missing PKGBUILD files
+
+        :param packages: An AURPackage or series of AURPackage objects to get PKGBUILD data for
+        :type packages: AURPackage
+        :param multithread: Optional parameter indicating whether this function should be multithreaded. Default is True
+        :type multithread: Optional[bool]
+        :param verbose: Optional parameter indicating whether success/failure messages should be verbose. Default is False
+        :type verbose: Optional[bool]
+        """
+        with span("get_missing_pkgbuild", packages=len(packages)):
+            self._get_missing_pkgbuild(
+                *packages, multithread=multithread, verbose=verbose
             )
 
+    def _get_missing_pkgbuild(
+        self, *packages: AURPackage, multithread=True, verbose=False
+    ) -> None:
+        missing = []
+        for pkg in packages:
+            if not pkg.pkgbuild_exists:
+                missing.append(pkg)
+            else:
+                if verbose:
+                    self.console.notify(
+                        f"PKGBUILD up to date, skipping download: [bright_cyan]{pkg.name}"
+                    )
+
+        if multithread:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                for num, pkg in enumerate(missing):
+                    executor.submit(self.aur.get_pkgbuild, pkg, force=True)
+                    if verbose:
+                        self.console.notify(
+                            f"({num+1}/{len(missing)}) Downloaded PKGBUILD: [bright_cyan]{pkg.name}"
+                        )
+        else:
+            for num, pkg in enumerate(missing):
+                self.aur.get_pkgbuild(pkg, force=True)
+                if verbose:
+                    self.console.notify(
+                        f"({num+1}/{len(missing)} Downloaded PKGBUILD: [bright_cyan]{pkg.name}"
+                    )
+
     def install(
         self, targets: Optional[list[Union[SyncPackage, AURPackage]]] = None
     ) -> None:
         skip_verchecks = True if self.pacman_params.count("--nodeps") > 0 else False
         skip_depchecks = True if self.pacman_params.count("--nodeps") > 1 else False
+        profile = load_profile(self.build_profile)
 
         if targets is None:
             targets = list(set(self.targets))
@@ -217,6 +418,27 @@ class Sync(Operation):
             :type aur_depends: list[AURPackage]
             """
 
+            if self.output_format is not None:
+                plan = {
+                    "sync_explicit": sync_explicit,
+                    "aur_explicit": aur_explicit,
+                    "aur_depends": aur_depends,
+                    "sync_depends": sync_depends,
+                }
+                with RecordWriter(self.output_format, file=self.output) as writer:
+                    for group, packages in plan.items():
+                        source, reason = group.split("_")
+                        for pkg in packages or []:
+                            writer.write(
+                                {
+                                    "name": pkg.name,
+                                    "version": pkg.version,
+                                    "source": source,
+                                    "reason": reason,
+                                }
+                            )
+                return
+
             if sync_explicit:
                 output = [f"[cyan]{pkg.name}-{pkg.version}" for pkg in sync_explicit]
                 self.console.print(
@@ -240,45 +462,6 @@ class Sync(Operation):
                     f"Sync Dependency ({len(sync_depends)}): {', '.join([out for out in output])}"
                 )
 
-        def get_missing_pkgbuild(
-            *packages: AURPackage, multithread=True, verbose=False
-        ) -> None:
-            """
-            Get missing PKGBUILD files
-
-            :param packages: An AURPackage or series of AURPackage objects to get PKGBUILD data for
-            :type packages: AURPackage
-            :param multithread: Optional parameter indicating whether this function should be multithreaded. Default is True
-            :type multithread: Optional[bool]
-            :param verbose: Optional parameter indicating whether success/failure messages should be verbose. Default is False
-            :type verbose: Optional[bool]
-            """
-            missing = []
-            for pkg in packages:
-                if not pkg.pkgbuild_exists:
-                    missing.append(pkg)
-                else:
-                    if verbose:
-                        self.console.notify(
-                            f"PKGBUILD up to date, skipping download: [bright_cyan]{pkg.name}"
-                        )
-
-            if multithread:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                    for num, pkg in enumerate(missing):
-                        executor.submit(self.aur.get_pkgbuild, pkg, force=True)
-                        if verbose:
-                            self.console.notify(
-                                f"({num+1}/{len(missing)}) Downloaded PKGBUILD: [bright_cyan]{pkg.name}"
-                            )
-            else:
-                for num, pkg in enumerate(missing):
-                    self.aur.get_pkgbuild(pkg, force=True)
-                    if verbose:
-                        self.console.notify(
-                            f"({num+1}/{len(missing)} Downloaded PKGBUILD: [bright_cyan]{pkg.name}"
-                        )
-
         def print_pkgbuild_status(*packages: AURPackage) -> None:
             from rich.table import Column, Table
 
@@ -301,7 +484,7 @@ class Sync(Operation):
 
         if skip_depchecks is True:
             preview_packages(sync_explicit=sync_explicit, aur_explicit=aur_explicit)
-            get_missing_pkgbuild(*aur_explicit, verbose=True)
+            self.get_missing_pkgbuild(*aur_explicit, verbose=True)
             print_pkgbuild_status(*aur_explicit)
             if (
                 self.console.prompt("Proceed with install? [Y/n]", affirm="y")
@@ -310,7 +493,10 @@ class Sync(Operation):
                 return
 
             if aur_explicit:
-                self.aur.install(*aur_explicit, pacman_params=self.pacman_params)
+                self.aur.fetch_sources(*aur_explicit)
+                self.aur.install(
+                    *aur_explicit, pacman_params=self.pacman_params, profile=profile
+                )
             if sync_explicit:
                 self.wrap_sync(self.pacman_params, sudo=True)
 
@@ -338,7 +524,7 @@ class Sync(Operation):
                         if sync is not None and local is None:
                             sync_depends.append(SyncPackage.from_pyalpm(sync))
 
-        get_missing_pkgbuild(*aur_depends, verbose=True)
+        self.get_missing_pkgbuild(*aur_depends, verbose=True)
         preview_packages(
             sync_explicit=sync_explicit,
             sync_depends=sync_depends,
@@ -351,54 +537,139 @@ class Sync(Operation):
             return
 
         if aur_depends:
-            aur_tree = nx.compose(aur_tree, self.aur.get_dependency_tree(*aur_depends))
+            aur_tree = compose(aur_tree, self.aur.get_dependency_tree(*aur_depends))
 
-        get_missing_pkgbuild(*[node for node in aur_tree], verbose=False)
-        if aur_tree:
-            install_order = [layer for layer in nx.bfs_layers(aur_tree, aur_explicit)][
-                ::-1
-            ]
-            for num, layer in enumerate(install_order):
-                pacman_params = list(
-                    filter(lambda x: x != "--sync", self.pacman_params)
-                )
-                pacman_params.append("--upgrade")
-                if num + 1 == len(install_order):
-                    self.aur.install(*layer, pacman_params=pacman_params)
-                else:
-                    pacman_params.append("--asdeps")
-                    self.aur.install(*layer, pacman_params=pacman_params)
-        if sync_explicit:
-            pacman_params = self.pacman_params
-            pacman_params.extend([pkg.name for pkg in sync_explicit])
-            self.wrap_sync(pacman_params, sudo=True)
+        self.get_missing_pkgbuild(*[node for node in aur_tree], verbose=False)
+        # Dependencies come after the packages needing them, so the reversed generations install them first
+        install_order = topological_generations(aur_tree)[::-1]
+
+        journal = Journal.create(
+            install_order,
+            aur_explicit,
+            [pkg.name for pkg in sync_explicit],
+            profile.name,
+        )
+        self.install_transaction(install_order, journal, profile)
+
+    def resume_install(self) -> None:
+        """
+        Resume the most recent interrupted install transaction from its journal. Packages that were already installed
+        are skipped, and packages that were already built are not rebuilt unless their inputs changed.
+        """
+        journal = Journal.latest()
+        if journal is None:
+            raise MissingTargets("error: no interrupted transaction to resume")
+
+        self.console.notify(f"Resuming transaction started {journal.started}...")
+        profile = load_profile(self.build_profile or journal.profile)
+
+        names = [name for layer in journal.layers for name in layer]
+        packages = {pkg.name: pkg for pkg in self.aur.get_packages(*names)}
+        missing = [name for name in names if name not in packages]
+        if missing:
+            raise MissingTargets(
+                f"error: packages no longer in AUR: {', '.join(missing)}"
+            )
+
+        install_order = [[packages[name] for name in layer] for layer in journal.layers]
+        self.get_missing_pkgbuild(*packages.values(), verbose=False)
+        self.install_transaction(install_order, journal, profile)
+
+    def install_transaction(
+        self,
+        install_order: list[list[AURPackage]],
+        journal: Journal,
+        profile: BuildProfile,
+    ) -> None:
+        """
+        Build and install a planned transaction, recording each stage in its journal
+
+        :param install_order: The AUR packages to build and install, one list per generation of the dependency tree.
+        The dependencies of each generation are installed with --asdeps, then its explicit targets
+        :type install_order: list[list[AURPackage]]
+        :param journal: The journal of the transaction
+        :type journal: Journal
+        :param profile: The build profile to apply to each 'makepkg' invocation
+        :type profile: BuildProfile
+
+        :raises BuildError: If a package fails to build. The journal is kept so the transaction can be resumed
+        :raises InstallError: If pacman fails to install a layer or the repository targets. The journal is kept so the
+        transaction can be resumed
+        """
+        try:
+            packages = [pkg for layer in install_order for pkg in layer]
+            self.aur.fetch_sources(
+                *[pkg for pkg in packages if not journal.completed(pkg, "installed")]
+            )
+
+            explicit = set(journal.aur_explicit)
+            for layer in install_order:
+                depends = [pkg for pkg in layer if pkg.name not in explicit]
+                targets = [pkg for pkg in layer if pkg.name in explicit]
+                for packages, asdeps in ((depends, True), (targets, False)):
+                    if not packages:
+                        continue
+                    pacman_params = list(
+                        filter(lambda x: x != "--sync", self.pacman_params)
+                    )
+                    pacman_params.append("--upgrade")
+                    if asdeps is True:
+                        pacman_params.append("--asdeps")
+                    self.aur.install(
+                        *packages,
+                        pacman_params=pacman_params,
+                        profile=profile,
+                        journal=journal,
+                    )
+
+            if journal.sync_explicit and not journal.sync_installed:
+                pacman_params = list(self.pacman_params)
+                pacman_params.extend(journal.sync_explicit)
+                return_code = self.wrap_sync(pacman_params, sudo=True)
+                if return_code != 0:
+                    raise InstallError(
+                        f"error installing: {', '.join(journal.sync_explicit)}-exit status {return_code}"
+                    )
+                journal.mark_sync_installed()
+
+        except (BuildError, InstallError) as err:
+            err.journal = journal
+            raise
+
+        journal.finish()
 
 
 @dataclass
 class Nay(Sync):
     def run(self):
         self.wrapper_prefix = "sync"
+        if self.daemon is True:
+            from .daemon import Daemon
+
+            Daemon(self).serve()
+            return
+
         if not self.targets:
             params = self.db_params + ["--refresh", "--sysupgrade"]
             self.wrap_sync(params, sudo=True)
+            self.upgrade_aur()
             return
 
         packages = self.search_packages(" ".join([target for target in self.targets]))
         if not packages:
             sys.exit()
-        self.console.print_packages(packages, self.local, include_num=True)
+        self.console.print_packages(packages, include_num=True)
         packages = self.select_packages(packages)
         self.install(packages)
 
-    def select_packages(self, packages):
+    def select_packages(self, packages: SearchResults):
         selections = self.console.get_nums("Packages to install (eg: 1 2 3, 1-3 or ^4)")
         selected = []
         for num in selections:
-            try:
-                selected.append(packages[num])
+            row = packages.get_row(num)
             # Ignore invalid selections by the user
-            except KeyError:
-                pass
+            if row is not None:
+                selected.append(packages.get_package(row, self.sync))
 
         aur_query = [pkg.name for pkg in selected if isinstance(pkg, AURBasic)]
         if aur_query:
@@ -0,0 +1,179 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import ContextManager, Iterator, Optional
+
+# Returned by span() while tracing is disabled so instrumented code pays for a single global lookup
+NULL_SPAN = contextlib.nullcontext()
+
+TRACER: Optional["Tracer"] = None
+
+
+@dataclass
+class Span:
+    """
+    A timed section of a nay run. Times are perf_counter_ns() values.
+    """
+
+    name: str
+    start: int
+    tid: int
+    parent: Optional["Span"] = None
+    args: dict = field(default_factory=dict)
+    end: Optional[int] = None
+
+    @property
+    def duration(self) -> int:
+        end = self.end if self.end is not None else time.perf_counter_ns()
+        return end - self.start
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        path = [self.name]
+        parent = self.parent
+        while parent is not None:
+            path.append(parent.name)
+            parent = parent.parent
+
+        return tuple(reversed(path))
+
+
+class Tracer:
+    """
+    Record nested spans across threads. Spans opened on a worker thread with no span of its own are nested under the
+    innermost span open on the main thread, so background AUR queries show up under the phase that started them.
+    """
+
+    def __init__(self) -> None:
+        self.spans = []
+        self.stacks = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter_ns()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args) -> Iterator[Span]:
+        tid = threading.get_ident()
+        with self.lock:
+            stack = self.stacks.setdefault(tid, [])
+            if stack:
+                parent = stack[-1]
+            else:
+                main = self.stacks.get(threading.main_thread().ident)
+                parent = main[-1] if main else None
+            span = Span(name, time.perf_counter_ns(), tid, parent, args)
+            self.spans.append(span)
+            stack.append(span)
+
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter_ns()
+            with self.lock:
+                stack.remove(span)
+
+    def summary(self) -> list[tuple[int, str, int, float]]:
+        """
+        Aggregate the recorded spans by their path from the root span
+
+        :return: One row per distinct path in the order first seen: depth, name, number of spans and total seconds
+        :rtype: list[tuple[int, str, int, float]]
+        """
+        totals = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            path = span.path
+            count, duration = totals.get(path, (0, 0))
+            totals[path] = (count + 1, duration + span.duration)
+
+        # Order children directly below their parents
+        rows = []
+
+        def add(parent: tuple[str, ...]) -> None:
+            for path, (count, duration) in totals.items():
+                if path[:-1] == parent:
+                    rows.append((len(path) - 1, path[-1], count, duration / 1e9))
+                    add(path)
+
+        add(())
+        return rows
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Convert the recorded spans to the Chrome trace event format, as loaded by chrome://tracing and Perfetto
+
+        :return: The trace
+        :rtype: dict
+        """
+        pid = os.getpid()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        with self.lock:
+            spans = list(self.spans)
+
+        events = []
+        for tid in dict.fromkeys(span.tid for span in spans):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": names.get(tid, str(tid))},
+                }
+            )
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "nay",
+                    "ph": "X",
+                    "ts": (span.start - self.origin) / 1000,
+                    "dur": span.duration / 1000,
+                    "pid": pid,
+                    "tid": span.tid,
+                    "args": span.args,
+                }
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+
+def enable() -> Tracer:
+    """
+    Start recording spans
+
+    :return: The tracer spans are recorded in
+    :rtype: Tracer
+    """
+    global TRACER
+    TRACER = Tracer()
+    return TRACER
+
+
+def disable() -> None:
+    global TRACER
+    TRACER = None
+
+
+def span(name: str, **args) -> ContextManager:
+    """
+    Time a section of code. Does nothing unless tracing was enabled.
+
+    :param name: The name of the span, e.g. 'aur.info'
+    :type name: str
+    :param args: Optional details recorded with the span in trace files
+
+    :return: A context manager timing the code it wraps
+    :rtype: ContextManager
+    """
+    if TRACER is None:
+        return NULL_SPAN
+
+    return TRACER.span(name, **args)
@@ -1,11 +1,23 @@
+import functools
 import os
-import shlex
-import subprocess
+import re
+import time
+from typing import Optional
 
+from .command import makepkg as makepkg_command, run
+from .config import SRCDEST
+from .exceptions import BuildError
 from .package import Package
+from .profiles import SOURCE_MAKEPKG_CONF, BuildProfile, record_build_time
 
 
-def makepkg(pkg: Package, pkgdir: str, flags: str) -> None:
+def makepkg(
+    pkg: Package,
+    pkgdir: str,
+    flags: str,
+    profile: Optional[BuildProfile] = None,
+    asdeps: bool = False,
+) -> float:
     """
     Make a package using 'makepkg'. This is a pure pacman wrapper.
 
@@ -15,13 +27,218 @@ def makepkg(pkg: Package, pkgdir: str, flags: str) -> None:
     :type pkgdir: str
     :param flags: The flags to pass to 'makepkg' (exlusive of the leading '-')
     :type flags: str
+    :param profile: Optional build profile to apply to this invocation. Default is None
+    :type profile: Optional[BuildProfile]
+    :param asdeps: Optional parameter indicating whether the package will be installed as a dependency. Default is False
+    :type asdeps: Optional[bool]
 
+    :return: The wall time of the build in seconds
+    :rtype: float
     """
+    if profile is None:
+        profile = BuildProfile(name="default")
+
     os.chdir(f"{pkgdir}/{pkg.name}")
-    return_code = subprocess.run(shlex.split(f"makepkg -{flags}")).returncode
+    start = time.monotonic()
+    return_code = run(
+        makepkg_command(f"-{flags}", *profile.makepkg_args(asdeps=asdeps)),
+        env=profile.makepkg_env(makepkg_env()),
+    )
+    elapsed = time.monotonic() - start
+
+    record_build_time(pkg.name, profile, elapsed, return_code)
+
     if return_code != 0:
-        console.print(f"[red] -> error making: {pkg.name}-exit status {return_code}")
-        console.print(
-            f"[red] Failed to install {pkg.name}. Manual intervention is required"
+        raise BuildError(
+            f"error making: {pkg.name}-exit status {return_code}. Manual intervention is required"
         )
-        quit()
+
+    return elapsed
+
+
+def get_packagelist(
+    pkg: Package, pkgdir: str, profile: Optional[BuildProfile] = None
+) -> list[str]:
+    """
+    Get the package files built for a package, as listed by 'makepkg --packagelist'. Only the files of the current
+    version are listed, so older builds left in the package directory are never picked up.
+
+    :param pkg: The package.Package object to list the package files of
+    :type pkg: package.Package
+    :param pkgdir: The full path (exclusive of the package path itself)
+    :type pkgdir: str
+    :param profile: Optional build profile the package was built with. Default is None
+    :type profile: Optional[BuildProfile]
+
+    :return: The paths to the built package files
+    :rtype: list[str]
+    """
+    import subprocess
+
+    if profile is None:
+        profile = BuildProfile(name="default")
+
+    result = subprocess.run(
+        makepkg_command("--packagelist", *profile.makepkg_args()),
+        cwd=os.path.join(pkgdir, pkg.name),
+        env=profile.makepkg_env(makepkg_env()),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise BuildError(
+            f"error listing packages of {pkg.name}-exit status {result.returncode}"
+        )
+
+    # Debug packages are listed even when the debug option produced none
+    return [path for path in result.stdout.splitlines() if os.path.exists(path)]
+
+
+def verifysource(pkg: Package, pkgdir: str) -> int:
+    """
+    Download and verify the sources of a package without building it. Sources are stored in the shared SRCDEST so that
+    a later 'makepkg' can start from them.
+
+    :param pkg: The package.Package object to fetch sources for
+    :type pkg: package.Package
+    :param pkgdir: The full path (exclusive of the package path itself)
+    :type pkgdir: str
+
+    :return: The exit status of 'makepkg --verifysource'
+    :rtype: int
+    """
+    return run(
+        makepkg_command("--verifysource", "--noconfirm"),
+        cwd=os.path.join(pkgdir, pkg.name),
+        env=makepkg_env(),
+        capture_output=True,
+    )
+
+
+def makepkg_env() -> dict[str, str]:
+    """
+    Get the environment 'makepkg' is run with. SRCDEST is shared between all packages so identical sources are only
+    downloaded once. A SRCDEST set in the environment or in makepkg.conf is left as it is.
+
+    :return: A copy of the current environment, with SRCDEST set unless it is configured already
+    :rtype: dict[str, str]
+    """
+    env = dict(os.environ)
+    if "SRCDEST" not in env and get_configured_srcdest() is None:
+        env["SRCDEST"] = SRCDEST
+    return env
+
+
+def get_srcdest() -> str:
+    """
+    Get the directory 'makepkg' downloads sources to
+
+    :return: SRCDEST from the environment or makepkg.conf, or nay's shared SRCDEST
+    :rtype: str
+    """
+    return os.environ.get("SRCDEST") or get_configured_srcdest() or SRCDEST
+
+
+@functools.lru_cache(maxsize=None)
+def get_configured_srcdest() -> Optional[str]:
+    """
+    Get the SRCDEST set in the system or user makepkg.conf. makepkg.conf is a bash script, so it is sourced the same
+    way makepkg sources it rather than parsed.
+
+    :return: The configured SRCDEST, or None if makepkg.conf doesn't set one
+    :rtype: Optional[str]
+    """
+    import subprocess
+
+    env = {key: value for key, value in os.environ.items() if key != "SRCDEST"}
+    result = subprocess.run(
+        ["bash", "-c", f'{SOURCE_MAKEPKG_CONF}printf "%s" "$SRCDEST"'],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    return result.stdout or None
+
+
+def read_sources(srcinfo: str) -> list[str]:
+    """
+    Get the source entries listed in a .SRCINFO file, including any 'name::' prefix
+
+    :param srcinfo: The path to the .SRCINFO file
+    :type srcinfo: str
+
+    :return: The source entries of the package. Empty if the .SRCINFO file could not be read
+    :rtype: list[str]
+    """
+    try:
+        with open(srcinfo, "r") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+
+    return re.findall(r"^\s*source(?:_\w+)? = (.*)$", data, re.MULTILINE)
+
+
+def get_sources(srcinfo: str) -> set[str]:
+    """
+    Get the source URLs listed in a .SRCINFO file, exclusive of any 'name::' prefix
+
+    :param srcinfo: The path to the .SRCINFO file
+    :type srcinfo: str
+
+    :return: The source URLs of the package. Empty if the .SRCINFO file could not be read
+    :rtype: set[str]
+    """
+    return set(source.split("::", 1)[-1] for source in read_sources(srcinfo))
+
+
+def get_source_filename(source: str) -> Optional[str]:
+    """
+    Get the name of the file or directory a source entry is downloaded to in SRCDEST, following makepkg's
+    get_filename: the 'name::' prefix if there is one, otherwise the last component of the URL. VCS sources are named
+    after their repository, without fragment, query or '.git' suffix.
+
+    :param source: The source entry, e.g. 'foo-1.0.tar.gz::https://example.org/v1.0.tar.gz'
+    :type source: str
+
+    :return: The name in SRCDEST, or None for files shipped with the PKGBUILD, which are not downloaded
+    :rtype: Optional[str]
+    """
+    if "::" in source:
+        return source.split("::", 1)[0]
+
+    if "://" not in source:
+        return None
+
+    protocol = source.split("://", 1)[0].split("+", 1)[0]
+    if protocol not in ("bzr", "fossil", "git", "hg", "svn"):
+        return source.rsplit("/", 1)[-1]
+
+    filename = source.split("#", 1)[0].split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+    if protocol == "fossil":
+        filename = f"{filename}.fossil"
+    elif protocol == "git":
+        filename = filename.split(".git", 1)[0]
+
+    return filename
+
+
+def get_source_filenames(srcinfo: str) -> set[str]:
+    """
+    Get the names the sources of a .SRCINFO file are downloaded to in SRCDEST. Packages whose sources share a name
+    share the downloaded file, whether or not the URLs are the same.
+
+    :param srcinfo: The path to the .SRCINFO file
+    :type srcinfo: str
+
+    :return: The names in SRCDEST. Empty if the .SRCINFO file could not be read
+    :rtype: set[str]
+    """
+    filenames = set()
+    for source in read_sources(srcinfo):
+        filename = get_source_filename(source)
+        if filename is not None:
+            filenames.add(filename)
+
+    return filenames
@@ -1,21 +1,22 @@
-import shlex
-import subprocess
 from dataclasses import dataclass
 
+from .command import pacman, run_batched, run_transaction
+
 
 @dataclass
 class Wrapper:
     targets: list[str]
     pacman_params: list[str]
 
-    def wrap_pacman(self, sudo: bool):
-        prefix = "sudo " if sudo is True else ""
-        params = self.pacman_params + [" ".join(self.targets)]
-        subprocess.run(shlex.split(f"{prefix}pacman {' '.join([p for p in params])}"))
+    def wrap_pacman(self, sudo: bool) -> int:
+        return run_batched(pacman(*self.pacman_params, sudo=sudo), self.targets)
 
 
 @dataclass
 class Transaction(Wrapper):
+    def wrap_pacman(self, sudo: bool) -> int:
+        return run_transaction(pacman(*self.pacman_params, sudo=sudo), self.targets)
+
     def run(self) -> None:
         sudo = True
         if "--print" in self.pacman_params:
@@ -45,7 +46,7 @@ class Database(Wrapper):
     def run(self) -> None:
         sudo = False
         if self.targets:
-            self.sudo = True
+            sudo = True
         if "--check" in self.pacman_params:
             sudo = False
 
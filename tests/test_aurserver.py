@@ -0,0 +1,98 @@
+import io
+import os
+import subprocess
+import tempfile
+
+import requests
+from ward import fixture, test
+
+from nay.aur import AUR
+from nay.aurserver import AURServer, parse_srcinfo
+from nay.console import NayConsole
+
+SRCINFO = """pkgbase = foo
+\tpkgdesc = A foo for testing
+\tpkgver = 1.2
+\tpkgrel = 3
+\tepoch = 1
+\turl = https://example.org/foo
+\tarch = any
+\tlicense = MIT
+\tmakedepends = bar
+\tdepends = baz
+\tdepends_x86_64 = lib32-baz
+
+pkgname = foo
+
+pkgname = foo-docs
+\tpkgdesc = Documentation for foo
+\tdepends =
+"""
+
+
+@fixture
+def server():
+    with tempfile.TemporaryDirectory() as fixtures:
+        os.makedirs(os.path.join(fixtures, "foo"))
+        with open(os.path.join(fixtures, "foo", ".SRCINFO"), "w") as f:
+            f.write(SRCINFO)
+        with open(os.path.join(fixtures, "foo", "PKGBUILD"), "w") as f:
+            f.write("pkgname=(foo foo-docs)\npkgver=1.2\npkgrel=3\n")
+
+        with AURServer(fixtures, seed=0).start() as server:
+            yield server
+
+
+@test("parse_srcinfo builds an info result for each package of a package base")
+def _():
+    foo, docs = parse_srcinfo(SRCINFO)
+
+    assert (foo["Name"], foo["PackageBase"], foo["Version"]) == (
+        "foo",
+        "foo",
+        "1:1.2-3",
+    )
+    assert foo["Depends"] == ["baz", "lib32-baz"]
+    assert foo["MakeDepends"] == ["bar"]
+    assert docs["Description"] == "Documentation for foo"
+    assert docs["Depends"] == []
+
+
+@test("AUR talks to the stand-in server when given its base URL")
+def _(server=server):
+    aur = AUR(None, NayConsole(file=io.StringIO()), base_url=server.url)
+
+    assert [result["Name"] for result in aur.search("foo")] == ["foo", "foo-docs"]
+    assert "Depends" not in aur.search("foo")[0]
+    (pkg,) = aur.get_packages("foo", "missing")
+    assert (pkg.name, pkg.version) == ("foo", "1:1.2-3")
+    assert aur.request("packages", aur.packages_endpoint).text.split() == [
+        "foo",
+        "foo-docs",
+    ]
+    assert server.requests == {"search": 2, "info": 1, "packages": 1}
+
+
+@test("The stand-in server serves package bases over git's dumb HTTP protocol")
+def _(server=server):
+    with tempfile.TemporaryDirectory() as clonedir:
+        subprocess.run(
+            ["git", "clone", "--quiet", f"{server.url}/foo.git", clonedir], check=True
+        )
+        assert os.path.exists(os.path.join(clonedir, "PKGBUILD"))
+        assert os.path.exists(os.path.join(clonedir, ".SRCINFO"))
+
+
+@test("The stand-in server injects errors and throttles requests")
+def _(server=server):
+    server.error_rate = 1
+    response = requests.get(f"{server.url}/rpc/?v=5&type=info&arg[]=foo")
+    assert response.status_code == 503
+
+    server.error_rate = 0
+    server.rate_limit = 1
+    statuses = [
+        requests.get(f"{server.url}/rpc/?v=5&type=info&arg[]=foo").status_code
+        for _ in range(3)
+    ]
+    assert 429 in statuses
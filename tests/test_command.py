@@ -0,0 +1,44 @@
+from ward import raises, test
+
+from nay.command import batch, get_arg_max, get_arg_size, pacman, run_transaction
+from nay.exceptions import ArgumentListError
+
+
+@test("pacman builds an argument list, prefixed with sudo when needed")
+def _():
+    assert pacman("-U", "/tmp/with space.pkg.tar.zst") == [
+        "pacman",
+        "-U",
+        "/tmp/with space.pkg.tar.zst",
+    ]
+    assert pacman("-Syu", sudo=True) == ["sudo", "pacman", "-Syu"]
+
+
+@test("batch keeps every target in one command when it fits")
+def _():
+    targets = [f"pkg{num}" for num in range(100)]
+    assert list(batch(["pacman", "-U"], targets)) == [["pacman", "-U", *targets]]
+    assert list(batch(["pacman", "-Syu"], [])) == [["pacman", "-Syu"]]
+
+
+@test("batch splits targets over the fewest commands that fit")
+def _():
+    argv = ["pacman", "-U"]
+    targets = [f"pkg{num:03}" for num in range(300)]
+    arg_max = sum(get_arg_size(arg) for arg in argv) + 100 * get_arg_size(targets[0])
+
+    commands = list(batch(argv, targets, arg_max=arg_max))
+
+    assert len(commands) == 3
+    assert all(command[:2] == argv for command in commands)
+    assert [target for command in commands for target in command[2:]] == targets
+
+
+@test("run_transaction refuses to split targets which exceed ARG_MAX")
+def _():
+    target = "x" * 1024
+    targets = [target] * (get_arg_max() // get_arg_size(target) + 1)
+
+    with raises(ArgumentListError):
+        run_transaction(["true"], targets)
+    assert run_transaction(["true"], targets[:10]) == 0
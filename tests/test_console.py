@@ -0,0 +1,58 @@
+import io
+
+from ward import test
+
+from nay.console import NayConsole
+from nay.results import SearchResults
+
+
+@test("write_packages writes the lines of pacman -Ss")
+def _():
+    results = SearchResults()
+    results.append_aur(
+        {
+            "Name": "yay",
+            "Version": "12.0-1",
+            "Description": "Yet another yogurt",
+            "NumVotes": 2000,
+            "Popularity": 12.345,
+            "Maintainer": None,
+            "OutOfDate": None,
+        }
+    )
+    results.append_aur(
+        {
+            "Name": "paru",
+            "Version": "2.0-1",
+            "Description": None,
+            "NumVotes": 1000,
+            "Popularity": 10,
+            "Maintainer": "someone",
+            "OutOfDate": 1700000000,
+        }
+    )
+    results.append_aur(
+        {
+            "Name": "pikaur",
+            "Version": "1.0-1",
+            "Description": "AUR helper",
+            "NumVotes": 500,
+            "Popularity": 1,
+            "Maintainer": "someone",
+            "OutOfDate": None,
+        }
+    )
+    results.mark_installed(
+        {"yay": "11.0-1", "paru": "2.0-1"}, lambda a, b: (a > b) - (a < b)
+    )
+
+    out = io.StringIO()
+    NayConsole(color_system=None).write_packages(results, include_num=True, file=out)
+
+    assert out.getvalue() == (
+        "3 aur/yay 12.0-1 [installed: 11.0-1]\n"
+        "    Yet another yogurt\n"
+        "2 aur/paru 2.0-1 [installed]\n"
+        "1 aur/pikaur 1.0-1\n"
+        "    AUR helper\n"
+    )
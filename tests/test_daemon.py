@@ -0,0 +1,89 @@
+import json
+import tempfile
+from types import SimpleNamespace
+
+from ward import fixture, test
+
+from nay.aur import ResponseCache
+from nay.daemon import Daemon, forward
+
+AUR_RESULT = {
+    "Name": "foo-git",
+    "Version": "1.0-1",
+    "Description": "Foo",
+    "NumVotes": 3,
+    "Popularity": 0.5,
+    "Maintainer": "someone",
+    "OutOfDate": None,
+}
+
+
+@fixture
+def daemon():
+    with tempfile.TemporaryDirectory() as dbpath:
+        context = SimpleNamespace(
+            dbpath=dbpath,
+            root="/",
+            config="/etc/pacman.conf",
+            pacman_conf=None,
+            handle=None,
+            local=SimpleNamespace(pkgcache=[]),
+            sync={"core": SimpleNamespace(search=lambda query: [])},
+        )
+        daemon = Daemon(context)
+        daemon.cache.set(("search", "foo"), [AUR_RESULT])
+        yield daemon
+
+
+@test("Daemon serves searches from its warm context and AUR cache")
+def _(daemon=daemon):
+    argv = ["-Ss", "foo", "--dbpath", daemon.context.dbpath, "--format", "ndjson"]
+    response = daemon.handle({"argv": argv, "color_system": None, "width": 80})
+
+    assert response["status"] == 0
+    record = json.loads(response["stdout"])
+    assert (record["db"], record["name"], record["votes"]) == ("aur", "foo-git", 3)
+
+
+@test("Daemon declines operations it does not serve")
+def _(daemon=daemon):
+    dbpath = ["--dbpath", daemon.context.dbpath]
+    for argv in (
+        ["-S", "foo", *dbpath],
+        ["-Ssy", "foo", *dbpath],
+        ["-Ss", *dbpath],
+        ["-Ss", "foo", "--dbpath", "/somewhere/else"],
+    ):
+        response = daemon.handle({"argv": argv, "color_system": None, "width": 80})
+        assert response == {"declined": True}
+
+
+@test("forward falls back when no daemon is running")
+def _():
+    assert forward(["-Ss", "foo"], path="/nonexistent/nay.sock") is None
+    assert forward(["-S", "foo"], path="/nonexistent/nay.sock") is None
+
+
+@test("ResponseCache drops the least recently used entries once full")
+def _():
+    cache = ResponseCache(max_entries=2)
+    cache.set(("info", "foo"), 1)
+    cache.set(("info", "bar"), 2)
+    cache.get(("info", "foo"))
+    cache.set(("info", "baz"), 3)
+
+    assert list(cache.entries) == [("info", "foo"), ("info", "baz")]
+    assert cache.get(("info", "bar")) == (False, None)
+
+
+@test("ResponseCache keeps expired entries as a fallback until they are too old")
+def _():
+    cache = ResponseCache(ttl=0, max_stale=60)
+    cache.set(("search", "foo"), [AUR_RESULT])
+
+    assert cache.get(("search", "foo")) == (False, None)
+    assert cache.get(("search", "foo"), stale=True) == (True, [AUR_RESULT])
+
+    cache.max_stale = 0
+    assert cache.get(("search", "foo"), stale=True) == (False, None)
+    assert cache.entries == {}
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import tempfile
+
+from ward import fixture, test
+
+from nay.devel import DevelDB, get_vcs_clones, get_vcs_sources
+
+
+def git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=True)
+
+
+def commit(repo, message):
+    git(
+        "-c",
+        "user.name=nay",
+        "-c",
+        "user.email=nay@localhost",
+        "commit",
+        "--allow-empty",
+        "-m",
+        message,
+        cwd=repo,
+    )
+
+
+@fixture
+def upstream():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = os.path.join(tmpdir, "upstream")
+        os.mkdir(repo)
+        git("init", "-b", "main", cwd=repo)
+        commit(repo, "initial")
+
+        srcinfo = os.path.join(tmpdir, ".SRCINFO")
+        with open(srcinfo, "w") as f:
+            f.write(
+                "pkgbase = foo-git\n"
+                f"\tsource = foo::git+file://{repo}#branch=main\n"
+                f"\tsource = git+file://{repo}#commit=0123456789\n"
+                "\tsource = https://example.com/foo.patch\n"
+            )
+
+        # makepkg keeps a mirror of each git source in SRCDEST, named after the source
+        srcdest = os.path.join(tmpdir, "sources")
+        os.mkdir(srcdest)
+        git("clone", "--mirror", repo, os.path.join(srcdest, "foo"), cwd=tmpdir)
+
+        yield tmpdir, repo, srcinfo
+
+
+@test("get_vcs_sources returns git sources with the ref they track")
+def _(upstream=upstream):
+    _, repo, srcinfo = upstream
+    assert get_vcs_sources(srcinfo) == {f"file://{repo}": "refs/heads/main"}
+
+
+@test("get_vcs_clones returns the name of each git source in SRCDEST")
+def _(upstream=upstream):
+    _, repo, srcinfo = upstream
+    assert get_vcs_clones(srcinfo) == {f"file://{repo}": "foo"}
+
+
+@test("DevelDB only reports packages whose upstream head moved")
+def _(upstream=upstream):
+    tmpdir, repo, srcinfo = upstream
+    srcdest = os.path.join(tmpdir, "sources")
+    devel = DevelDB(os.path.join(tmpdir, "devel.json"))
+    devel.update("foo-git", srcinfo, srcdest)
+
+    assert "foo-git" in DevelDB(devel.path)
+    assert devel.get_outdated(["foo-git", "bar-git"]) == []
+
+    commit(repo, "upstream change")
+    assert devel.get_outdated(["foo-git", "bar-git"]) == ["foo-git"]
+
+    git("fetch", "--all", "--prune", cwd=os.path.join(srcdest, "foo"))
+    devel.update("foo-git", srcinfo, srcdest)
+    assert devel.get_outdated(["foo-git"], max_workers=1, per_host=1) == []
+
+
+@test("DevelDB.update records the commit built from rather than the upstream head")
+def _(upstream=upstream):
+    tmpdir, repo, srcinfo = upstream
+    srcdest = os.path.join(tmpdir, "sources")
+    devel = DevelDB(os.path.join(tmpdir, "devel.json"))
+
+    # Upstream moved between the download and the end of the build
+    commit(repo, "upstream change")
+    devel.update("foo-git", srcinfo, srcdest)
+    assert devel.get_outdated(["foo-git"]) == ["foo-git"]
+
+    devel.update("foo-git", srcinfo, os.path.join(tmpdir, "missing"))
+    assert devel.packages["foo-git"][f"file://{repo}"]["commit"] is None
+    assert devel.get_outdated(["foo-git"]) == ["foo-git"]
+
+
+@test("DevelDB.seed records the current upstream heads")
+def _(upstream=upstream):
+    tmpdir, repo, srcinfo = upstream
+    devel = DevelDB(os.path.join(tmpdir, "devel.json"))
+    commit(repo, "upstream change")
+    devel.seed("foo-git", srcinfo)
+
+    assert devel.get_outdated(["foo-git"]) == []
+
+
+@test("DevelDB.remove forgets packages")
+def _(upstream=upstream):
+    tmpdir, _, srcinfo = upstream
+    devel = DevelDB(os.path.join(tmpdir, "devel.json"))
+    devel.seed("foo-git", srcinfo)
+    devel.remove("foo-git", "bar-git")
+
+    assert "foo-git" not in DevelDB(devel.path)
+    assert devel.get_outdated(["foo-git"]) == []
@@ -0,0 +1,37 @@
+from ward import test
+
+from nay.fastpath import get_operation, get_pacman_argv
+
+
+@test("get_operation finds the operation in grouped short options")
+def _():
+    assert get_operation(["-Qdtq"]) == "query"
+    assert get_operation(["--remove", "foo"]) == "remove"
+    assert get_operation(["-Syu"]) == "sync"
+    assert get_operation(["-b/Data/pacman", "-Q"]) == "query"
+    assert get_operation(["foo"]) is None
+    assert get_operation(["-QS"]) is None
+
+
+@test("get_pacman_argv passes pure wrapper operations straight to pacman")
+def _():
+    assert get_pacman_argv(["-Qi", "bash"]) == ["pacman", "-Qi", "bash"]
+    assert get_pacman_argv(["-T", "bash>=5"]) == ["pacman", "-T", "bash>=5"]
+
+
+@test("get_pacman_argv uses sudo where the wrapper operations do")
+def _():
+    assert get_pacman_argv(["-Rns", "foo"]) == ["sudo", "pacman", "-Rns", "foo"]
+    assert get_pacman_argv(["-Rp", "foo"]) == ["pacman", "-Rp", "foo"]
+    assert get_pacman_argv(["-Fy"])[0] == "sudo"
+    assert get_pacman_argv(["-D", "--asdeps", "foo"])[0] == "sudo"
+    assert get_pacman_argv(["-Dk"])[0] == "pacman"
+    assert get_pacman_argv(["-D", "--dbpath", "/tmp/db", "-k"])[0] == "pacman"
+
+
+@test("get_pacman_argv declines operations nay handles itself")
+def _():
+    assert get_pacman_argv(["-S", "foo"]) is None
+    assert get_pacman_argv(["-G", "foo"]) is None
+    assert get_pacman_argv([]) is None
+    assert get_pacman_argv(["-Q", "--format", "json"]) is None
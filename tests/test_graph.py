@@ -0,0 +1,61 @@
+from ward import raises, test
+
+from nay.exceptions import CycleError
+from nay.graph import DiGraph, compose, find_cycle, topological_generations
+
+
+def make_graph(*edges: tuple[str, str]) -> DiGraph:
+    graph = DiGraph()
+    for node, other in edges:
+        graph.add_edge(node, other)
+    return graph
+
+
+@test("topological_generations places every node after the packages needing it")
+def _():
+    graph = make_graph(("app", "libfoo"), ("libfoo", "libbar"), ("app", "libbaz"))
+
+    assert topological_generations(graph) == [["app"], ["libfoo", "libbaz"], ["libbar"]]
+
+
+@test("topological_generations installs a diamond dependency before both dependents")
+def _():
+    # 'libc' is one edge away from 'app', but also needed by 'liba'
+    graph = make_graph(
+        ("app", "liba"), ("app", "libc"), ("liba", "libb"), ("libb", "libc")
+    )
+    install_order = topological_generations(graph)[::-1]
+
+    assert install_order == [["libc"], ["libb"], ["liba"], ["app"]]
+
+
+@test("topological_generations raises CycleError with the cycle")
+def _():
+    graph = make_graph(("app", "liba"), ("liba", "libb"), ("libb", "liba"))
+
+    with raises(CycleError) as exc:
+        topological_generations(graph)
+
+    assert exc.raised.cycle == ["liba", "libb", "liba"]
+    assert "liba -> libb -> liba" in str(exc.raised)
+
+
+@test("find_cycle returns an empty list for an acyclic graph")
+def _():
+    assert find_cycle(make_graph(("a", "b"), ("a", "c"), ("b", "c"))) == []
+
+
+@test("compose merges nodes, edges and edge data")
+def _():
+    first = make_graph(("app", "liba"))
+    first.add_node("standalone")
+    second = DiGraph()
+    second.add_edge("app", "liba", dtype="depends")
+    second.add_edge("liba", "libb", dtype="make_depends")
+
+    composed = compose(first, second)
+
+    assert composed.nodes == ["app", "liba", "standalone", "libb"]
+    assert composed.get_edge_data("app", "liba") == {"dtype": "depends"}
+    assert composed.predecessors("libb") == ["liba"]
+    assert len(first) == 3
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+from types import SimpleNamespace
+
+from ward import fixture, test
+
+from nay import journal as journal_module
+from nay.journal import Journal, input_digest
+
+
+@fixture
+def tmpdir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journaldir = journal_module.JOURNALDIR
+        journal_module.JOURNALDIR = os.path.join(tmpdir, "journal")
+        try:
+            yield tmpdir
+        finally:
+            journal_module.JOURNALDIR = journaldir
+
+
+def make_pkg(tmpdir: str, name: str, version: str = "1.0-1") -> SimpleNamespace:
+    clone = os.path.join(tmpdir, name)
+    os.makedirs(clone, exist_ok=True)
+    pkg = SimpleNamespace(
+        name=name,
+        version=version,
+        PKGBUILD=os.path.join(clone, "PKGBUILD"),
+        SRCINFO=os.path.join(clone, ".SRCINFO"),
+    )
+    for path in (pkg.PKGBUILD, pkg.SRCINFO):
+        with open(path, "w") as f:
+            f.write(f"pkgname={name}\n")
+
+    return pkg
+
+
+@test("Journal.create persists the plan, and latest reads back the newest journal")
+def _(tmpdir=tmpdir):
+    foo, bar = make_pkg(tmpdir, "foo"), make_pkg(tmpdir, "bar")
+    older = Journal(
+        os.path.join(journal_module.JOURNALDIR, "20000101-000000-1.json"), {}
+    )
+    older.save()
+
+    journal = Journal.create([[bar], [foo]], [foo], ["vim"], "fast")
+    latest = Journal.latest()
+
+    assert latest.path == journal.path
+    assert latest.layers == [["bar"], ["foo"]]
+    assert latest.aur_explicit == ["foo"]
+    assert latest.sync_explicit == ["vim"]
+    assert latest.profile == "fast"
+    assert latest.sync_installed is False
+
+
+@test("Journal.latest returns None when there is nothing to resume")
+def _(tmpdir=tmpdir):
+    assert Journal.latest() is None
+
+    Journal.create([], [], [], "default").finish()
+
+    assert Journal.latest() is None
+
+
+@test("Journal.completed only counts stages of the journaled version")
+def _(tmpdir=tmpdir):
+    foo = make_pkg(tmpdir, "foo")
+    journal = Journal.create([[foo]], [foo], [], "default")
+
+    assert journal.completed(foo, "fetched") is False
+    journal.mark(foo, "fetched")
+
+    assert Journal.latest().completed(foo, "fetched") is True
+    assert journal.completed(make_pkg(tmpdir, "foo", "1.1-1"), "fetched") is False
+
+
+@test("Journal.get_artifacts reuses builds whose inputs and files are unchanged")
+def _(tmpdir=tmpdir):
+    foo = make_pkg(tmpdir, "foo")
+    artifact = os.path.join(tmpdir, "foo", "foo-1.0-1-x86_64.pkg.tar.zst")
+    open(artifact, "w").close()
+    journal = Journal.create([[foo]], [foo], [], "default")
+
+    assert journal.get_artifacts(foo) is None
+    journal.mark_built(foo, [artifact])
+    assert journal.get_artifacts(foo) == [artifact]
+
+    with open(foo.PKGBUILD, "a") as f:
+        f.write("pkgrel=2\n")
+    assert journal.get_artifacts(foo) is None
+
+    journal.mark_built(foo, [artifact])
+    os.remove(artifact)
+    assert journal.get_artifacts(foo) is None
+
+
+@test("Journal.finish removes the journal")
+def _(tmpdir=tmpdir):
+    journal = Journal.create([], [], ["vim"], "default")
+    journal.mark_sync_installed()
+    assert Journal.latest().sync_installed is True
+
+    journal.finish()
+    journal.finish()
+
+    assert not os.path.exists(journal.path)
+
+
+@test("input_digest changes with the PKGBUILD and .SRCINFO only")
+def _(tmpdir=tmpdir):
+    foo = make_pkg(tmpdir, "foo")
+    digest = input_digest(foo)
+
+    open(os.path.join(tmpdir, "foo", "foo.install"), "w").close()
+    assert input_digest(foo) == digest
+
+    with open(foo.SRCINFO, "a") as f:
+        f.write("\tpkgrel = 2\n")
+    assert input_digest(foo) != digest
+
+    os.remove(foo.PKGBUILD)
+    os.remove(foo.SRCINFO)
+    assert input_digest(foo) == hashlib.sha256().hexdigest()
@@ -0,0 +1,57 @@
+import io
+import os
+import tempfile
+
+from ward import fixture, test
+
+from nay import metrics
+from nay.aur import AUR, ResponseCache
+from nay.aurserver import AURServer
+from nay.console import NayConsole
+
+
+@fixture
+def recorded():
+    with tempfile.TemporaryDirectory() as fixtures:
+        os.makedirs(os.path.join(fixtures, "foo"))
+        with open(os.path.join(fixtures, "foo", ".SRCINFO"), "w") as f:
+            f.write("pkgbase = foo\n\tpkgver = 1\n\tpkgrel = 1\n\npkgname = foo\n")
+
+        with AURServer(fixtures).start() as server:
+            aur = AUR(
+                None,
+                NayConsole(file=io.StringIO()),
+                cache=ResponseCache(),
+                base_url=server.url,
+            )
+            yield aur, metrics.enable()
+            metrics.disable()
+
+
+@test("AUR requests are counted by endpoint with their size and latency")
+def _(recorded=recorded):
+    aur, recorded = recorded
+    aur.get_packages("foo", "bar")
+    aur.get_packages("foo")
+    aur.search("foo")
+
+    data = recorded.to_dict()
+    assert data["info"]["requests"] == 1
+    assert data["info"]["bytes"] > 0
+    assert (data["info"]["cache_hits"], data["info"]["cache_misses"]) == (1, 2)
+    assert sum(data["info"]["buckets"].values()) == 1
+    assert (data["search"]["requests"], data["search"]["errors"]) == (1, 0)
+
+
+@test("Metrics are written in the Prometheus text format")
+def _(recorded=recorded):
+    aur, recorded = recorded
+    aur.search("foo")
+
+    lines = recorded.to_prometheus().splitlines()
+    assert 'nay_aur_requests_total{endpoint="search"} 1' in lines
+    assert (
+        'nay_aur_request_duration_seconds_bucket{endpoint="search",le="+Inf"} 1'
+        in lines
+    )
+    assert 'nay_aur_request_duration_seconds_count{endpoint="search"} 1' in lines
@@ -1,46 +1,37 @@
-from ward import raises, test
-import nay.operations
-from nay.exceptions import (
-    ConflictingOptions,
-    MissingTargets,
-    PacmanError,
-    InvalidOption,
-)
-
-
-@test(
-    "Wrapper class raises PacmanError when invalid options are passed to a class/subclass instance"
-)
-def _():
-    opts = ["--elkfjweklq", "-x", "-p", "--fklklejwkl", "--TlkjdnjnA"]
-    with raises(PacmanError):
-        operation = nay.operations.Query(options=opts, targets=[])
-        operation.run()
-
-
-@test("Sync class raises InvalidOption when invalid options are passed to the class")
-def _():
-    opts = ["--elkfjweklq", "-x", "-p", "--fklklejwkl", "--TlkjdnjnA"]
-    with raises(InvalidOption):
-        nay.operations.Sync(options=opts, targets=[])
-
-    with raises(InvalidOption):
-        nay.operations.Nay(options=opts, targets=[])
-
-
-@test(
-    "Sync class raises ConflictingOptions when conflicting options are passed to the class"
-)
-def _():
-    opts = ["--info", "--sysupgrade"]
-    with raises(ConflictingOptions):
-        nay.operations.Sync(options=opts, targets=[])
-
-
-@test(
-    "Sync class raises MissingTargets when options requiring a target are passed with no targets present"
-)
-def _():
+import io
+
+from ward import fixture, raises, test
+
+from nay.console import NayConsole
+from nay.exceptions import ConfigReadError, MissingTargets
+from nay.sync import Sync
+
+
+@fixture
+def sync():
+    return Sync(
+        targets=[],
+        pacman_params=["--sync"],
+        dbpath="/var/lib/pacman",
+        root="/",
+        config="/nonexistent/pacman.conf",
+        console=NayConsole(file=io.StringIO()),
+    )
+
+
+@test("Operations load the pacman config only when it is first used")
+def _(sync=sync):
+    assert "pacman_conf" not in sync.__dict__
+    with raises(ConfigReadError):
+        sync.pacman_conf
+
+
+@test("Operation.db_params passes the database options as separate tokens")
+def _(sync=sync):
+    assert sync.db_params == ["--sync", "--dbpath", "/var/lib/pacman", "--root", "/"]
+
+
+@test("Sync raises MissingTargets when installing without targets")
+def _(sync=sync):
     with raises(MissingTargets):
-        operation = nay.operations.Sync(options=[], targets=[])
-        operation.run()
+        sync.run()
@@ -0,0 +1,172 @@
+import os
+from types import SimpleNamespace
+
+from ward import test
+
+from nay.package import AURBasic, AURPackage, SyncPackage, format_date
+
+
+def aur_basic(name="foo", version="1.0-1"):
+    return AURBasic(
+        db="aur", name=name, version=version, desc="", votes=1, popularity=0.1
+    )
+
+
+@test("Packages hash consistently with equality")
+def _():
+    assert aur_basic() == aur_basic()
+    assert hash(aur_basic()) == hash(aur_basic())
+    assert aur_basic(version="1.0-1") != aur_basic(version="1.0-2")
+    assert len({aur_basic(version="1.0-1"), aur_basic(version="1.0-2")}) == 2
+
+
+@test("Package instances do not carry a __dict__")
+def _():
+    pkg = SyncPackage(SimpleNamespace())
+    assert not hasattr(pkg, "__dict__")
+    assert not hasattr(aur_basic(), "__dict__")
+    assert "info_query" in AURPackage.__slots__
+
+
+@test("SyncPackage reads fields from the wrapped pyalpm package on access")
+def _():
+    alpm_pkg = SimpleNamespace(
+        name="bash",
+        version="5.2-1",
+        desc="The GNU Bourne Again shell",
+        db=SimpleNamespace(name="core"),
+        depends=["readline"],
+        size=2048,
+        isize=8 * 2**20,
+    )
+    pkg = SyncPackage.from_pyalpm(alpm_pkg)
+
+    assert (pkg.db, pkg.name, pkg.version) == ("core", "bash", "5.2-1")
+    assert pkg.size == "2.0 KiB"
+    assert pkg.isize == "8.0 MiB"
+
+    alpm_pkg.version = "5.2-2"
+    assert pkg.version == "5.2-2"
+
+
+@test("Identical dependency sets share one immutable tuple")
+def _():
+    first = AURBasic(
+        db="aur",
+        name="foo",
+        version="1.0-1",
+        desc="",
+        votes=1,
+        popularity=0.1,
+        depends=["glibc", "zlib"],
+    )
+    second = SyncPackage(SimpleNamespace(depends=["glibc", "zlib"]))
+
+    assert first.depends == ("glibc", "zlib")
+    assert first.depends is second.depends
+    assert first.make_depends == () and aur_basic().make_depends == ()
+
+
+@test("SyncPackage.info renders the package from pyalpm fields")
+def _():
+    from rich.console import Console
+
+    alpm_pkg = SimpleNamespace(
+        name="bash",
+        version="5.2-1",
+        desc="The GNU Bourne Again shell",
+        db=SimpleNamespace(name="core"),
+        arch="x86_64",
+        url="https://www.gnu.org/software/bash/",
+        licenses=["GPL"],
+        groups=[],
+        provides=["sh"],
+        depends=["readline", "glibc"],
+        optdepends=[],
+        makedepends=[],
+        checkdepends=[],
+        conflicts=[],
+        replaces=[],
+        size=2048,
+        isize=8 * 2**20,
+        packager="Someone <someone@archlinux.org>",
+        builddate=0,
+    )
+    console = Console(width=120, record=True, color_system=None)
+    console.print(SyncPackage.from_pyalpm(alpm_pkg).info)
+    text = console.export_text()
+
+    assert "Repository" in text and ": core" in text
+    assert ": readline  glibc" in text
+    assert "Groups" in text and ": None" in text
+    assert ": 8.0 MiB" in text
+
+
+@test("SyncPackage.info prints square brackets in package fields verbatim")
+def _():
+    from rich.console import Console
+
+    alpm_pkg = SimpleNamespace(
+        name="foo",
+        version="1.0-1",
+        desc="Prints [/] and [bold]markup[/bold]",
+        db=SimpleNamespace(name="extra"),
+        arch="any",
+        url="https://example.org/",
+        licenses=[],
+        groups=[],
+        provides=[],
+        depends=[],
+        optdepends=["bar: for [bar] support"],
+        makedepends=[],
+        checkdepends=[],
+        conflicts=[],
+        replaces=[],
+        size=0,
+        isize=0,
+        packager="Unknown Packager",
+        builddate=0,
+    )
+    console = Console(width=120, record=True, color_system=None)
+    console.print(SyncPackage.from_pyalpm(alpm_pkg).info)
+    text = console.export_text()
+
+    assert ": Prints [/] and [bold]markup[/bold]" in text
+    assert ": bar: for [bar] support" in text
+
+
+@test("format_date includes the name of the local timezone")
+def _():
+    date = format_date(0)
+
+    assert len(date.split()) == 6
+    assert date == date.strip()
+
+
+@test("AUR package records give dates as seconds since the epoch")
+def _():
+    pkg = AURBasic(
+        "aur", "foo", "1.0-1", "Foo", votes=1, popularity=0.1, flag_date=1700000000
+    )
+
+    assert pkg.to_record()["flag_date"] == 1700000000
+    assert aur_basic().to_record()["flag_date"] is None
+
+
+@test("AURPackage.info links to the configured AUR")
+def _():
+    from rich.console import Console
+
+    from nay.aurserver import parse_srcinfo
+
+    (result,) = parse_srcinfo(
+        "pkgbase = foo\n\tpkgver = 1\n\tpkgrel = 1\n\npkgname = foo\n"
+    )
+    console = Console(width=120, record=True, color_system=None)
+    os.environ["NAY_AUR_URL"] = "http://127.0.0.1:8080/"
+    try:
+        console.print(AURPackage.from_info_query(result).info)
+    finally:
+        del os.environ["NAY_AUR_URL"]
+
+    assert ": http://127.0.0.1:8080/packages/foo" in console.export_text()
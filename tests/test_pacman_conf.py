@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+from ward import fixture, raises, test
+
+from nay.exceptions import ConfigReadError
+from nay.pacman_conf import (
+    SIG_DATABASE,
+    SIG_DATABASE_OPTIONAL,
+    SIG_PACKAGE,
+    PacmanConfig,
+)
+
+
+@fixture
+def confdir():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, "mirrors.d"))
+        with open(os.path.join(tmp, "mirrors.d", "10-main"), "w") as f:
+            f.write("Server = https://mirror.example/$repo/os/$arch\n")
+        with open(os.path.join(tmp, "pacman.conf"), "w") as f:
+            f.write(
+                "[options]\n"
+                "Architecture = x86_64\n"
+                "SigLevel = Required DatabaseOptional\n"
+                "CheckSpace\n"
+                "\n"
+                "[core]\n"
+                f"Include = {tmp}/mirrors.d/*\n"
+                "\n"
+                "[custom]  # local repo\n"
+                "SigLevel = Never\n"
+                "Server = file:///srv/custom\n"
+                "\n"
+                "[extra]\n"
+                f"Include = {tmp}/mirrors.d/*\n"
+            )
+        yield tmp
+
+
+@test("PacmanConfig follows Include globs and keeps repository order")
+def _(tmp=confdir):
+    conf = PacmanConfig.load(
+        os.path.join(tmp, "pacman.conf"), cache=os.path.join(tmp, "cache.json")
+    )
+
+    assert list(conf.repos) == ["core", "custom", "extra"]
+    assert conf.get_servers("extra") == ["https://mirror.example/extra/os/x86_64"]
+    assert conf.options["CheckSpace"] == ""
+
+
+@test("PacmanConfig applies SigLevel the way pacman does")
+def _(tmp=confdir):
+    conf = PacmanConfig.load(
+        os.path.join(tmp, "pacman.conf"), cache=os.path.join(tmp, "cache.json")
+    )
+
+    assert (
+        conf.get_siglevel("core") == SIG_PACKAGE | SIG_DATABASE | SIG_DATABASE_OPTIONAL
+    )
+    assert conf.get_siglevel("custom") & (SIG_PACKAGE | SIG_DATABASE) == 0
+
+
+@test("PacmanConfig is reparsed when an included file changes")
+def _(tmp=confdir):
+    path = os.path.join(tmp, "pacman.conf")
+    cache = os.path.join(tmp, "cache.json")
+    assert len(PacmanConfig.load(path, cache=cache).get_servers("core")) == 1
+
+    with open(os.path.join(tmp, "mirrors.d", "20-backup"), "w") as f:
+        f.write("Server = https://backup.example/$repo/os/$arch\n")
+    os.utime(os.path.join(tmp, "mirrors.d"), ns=(0, 10**18))
+
+    assert len(PacmanConfig.load(path, cache=cache).get_servers("core")) == 2
+
+
+@test("PacmanConfig raises ConfigReadError for a missing file")
+def _():
+    with raises(ConfigReadError):
+        PacmanConfig.load("/nonexistent/pacman.conf", cache="/nonexistent/cache.json")
@@ -0,0 +1,112 @@
+import configparser
+import os
+import subprocess
+import tempfile
+
+from ward import fixture, raises, test
+
+from nay import profiles
+from nay.exceptions import ConfigReadError
+from nay.profiles import BuildProfile, get_int, load_profile
+
+
+@fixture
+def cachedir():
+    with tempfile.TemporaryDirectory() as cachedir:
+        previous = profiles.CACHEDIR
+        profiles.CACHEDIR = cachedir
+        try:
+            yield cachedir
+        finally:
+            profiles.CACHEDIR = previous
+
+
+def make_section(**settings) -> configparser.SectionProxy:
+    parser = configparser.ConfigParser()
+    parser.read_dict({"profile:test": settings})
+    return parser["profile:test"]
+
+
+def get_buildenv(conf: str, home: str) -> list[str]:
+    """Source a generated makepkg.conf in bash and get the resulting BUILDENV"""
+    env = {"PATH": os.environ["PATH"], "HOME": home}
+    result = subprocess.run(
+        ["bash", "-c", f'source {conf} 2>/dev/null; printf "%s\\n" "${{BUILDENV[@]}}"'],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.split()
+
+
+@test("get_int reads integers within range and rejects anything else")
+def _():
+    section = make_section(jobs="4", compresslevel="25", builddir="/tmp")
+
+    assert get_int("test", section, "Jobs", 1) == 4
+    with raises(ConfigReadError) as exc:
+        get_int("test", section, "CompressLevel", 1, 19)
+    assert "expected 1-19" in str(exc.raised)
+    with raises(ConfigReadError):
+        get_int("test", section, "BuildDir", 1)
+
+
+@test("BuildProfile.from_section validates the settings of a profile")
+def _():
+    profile = BuildProfile.from_section(
+        "test", make_section(jobs="auto", compilercache="ccache", nocheck="deps")
+    )
+
+    assert profile.jobs == os.cpu_count()
+    assert profile.compiler_cache == "ccache"
+    assert profile.nocheck == "deps"
+    for settings in (
+        {"jobs": "0"},
+        {"compilercache": "distcc"},
+        {"nocheck": "sometimes"},
+        {"compresslevel": "fast"},
+    ):
+        with raises(ConfigReadError):
+            BuildProfile.from_section("test", make_section(**settings))
+
+
+@test("load_profile loads the selected or the configured profile")
+def _():
+    with tempfile.NamedTemporaryFile("w", suffix=".conf") as config:
+        config.write("[options]\nBuildProfile = fast\n\n[profile:fast]\nJobs = 2\n")
+        config.flush()
+
+        assert load_profile(config=config.name) == BuildProfile(name="fast", jobs=2)
+        with raises(ConfigReadError):
+            load_profile("slow", config=config.name)
+
+    assert load_profile(config="/nonexistent") == BuildProfile(name="default")
+
+
+@test("BuildProfile.makepkg_args only passes a makepkg.conf with overrides")
+def _(cachedir=cachedir):
+    assert BuildProfile(name="default").makepkg_args() == []
+    assert BuildProfile(name="test", nocheck="deps").makepkg_args(asdeps=True) == [
+        "--nocheck"
+    ]
+
+    args = BuildProfile(name="test", compress_level=12).makepkg_args()
+    assert args == ["--config", os.path.join(cachedir, "profiles", "test.makepkg.conf")]
+    with open(args[1]) as f:
+        conf = f.read()
+    assert "COMPRESSZST=(zstd -c -T0 -12 -)" in conf
+    assert "COMPRESSXZ=(xz -c -z -T0 -9 -)" in conf
+
+
+@test("The generated makepkg.conf applies the profile over the user's makepkg.conf")
+def _(cachedir=cachedir):
+    conf = BuildProfile(name="test", compiler_cache="ccache").makepkg_conf()
+    with tempfile.TemporaryDirectory() as home:
+        with open(os.path.join(home, ".makepkg.conf"), "w") as f:
+            f.write("BUILDENV=(!distcc color !ccache check)\n")
+        assert get_buildenv(conf, home) == ["!distcc", "color", "ccache", "check"]
+
+        os.makedirs(os.path.join(home, ".config", "pacman"))
+        with open(os.path.join(home, ".config", "pacman", "makepkg.conf"), "w") as f:
+            f.write("BUILDENV=(color check)\n")
+        assert get_buildenv(conf, home) == ["color", "check", "ccache"]
@@ -0,0 +1,48 @@
+import io
+import os
+import pstats
+import subprocess
+import tempfile
+
+from ward import test
+
+from nay.console import NayConsole
+from nay.profiling import profile
+
+
+def work() -> list[str]:
+    return [str(num) * 10 for num in range(20000)]
+
+
+@test("CPU profiles are written as pstats and exclude child processes")
+def _():
+    console = NayConsole(file=io.StringIO(), color_system=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "nay.pstats")
+        with profile("cpu", console, path):
+            work()
+            subprocess.run(["sleep", "0.2"])
+
+        stats = pstats.Stats(path)
+
+    assert any(func[2] == "work" for func in stats.stats)
+    # The profiler's timer is CPU time, so waiting on the child does not count
+    assert stats.total_tt < 0.2
+    assert "child processes" in console.file.getvalue()
+
+
+@test("Memory profiles list the top allocation sites")
+def _():
+    console = NayConsole(file=io.StringIO(), color_system=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "nay.txt")
+        with profile("mem", console, path):
+            data = work()
+
+        with open(path) as f:
+            report = f.read()
+
+    assert len(data) == 20000
+    assert report.startswith("current: ")
+    assert "test_profiling.py" in report
+    assert "peak" in console.file.getvalue()
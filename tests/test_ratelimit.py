@@ -0,0 +1,187 @@
+import email.utils
+import io
+import os
+import tempfile
+import time
+
+from ward import fixture, raises, test
+
+from nay import metrics
+from nay.aur import AUR, ResponseCache
+from nay.aurserver import AURServer
+from nay.console import NayConsole
+from nay.exceptions import AURError, ConfigReadError
+from nay.ratelimit import (
+    CircuitBreaker,
+    RateLimitPolicy,
+    Throttle,
+    TokenBucket,
+    get_retry_after,
+    load_policy,
+)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@fixture
+def fixtures():
+    with tempfile.TemporaryDirectory() as fixtures:
+        os.makedirs(os.path.join(fixtures, "foo"))
+        with open(os.path.join(fixtures, "foo", ".SRCINFO"), "w") as f:
+            f.write("pkgbase = foo\n\tpkgver = 1\n\tpkgrel = 1\n\npkgname = foo\n")
+        yield fixtures
+
+
+def make_aur(server: AURServer, cache=None, **policy) -> AUR:
+    policy = RateLimitPolicy(**{"rate": 100, "burst": 100, "backoff": 0.01, **policy})
+    return AUR(
+        None,
+        NayConsole(file=io.StringIO()),
+        cache=cache,
+        base_url=server.url,
+        throttle=Throttle(policy),
+    )
+
+
+@test("TokenBucket hands out a burst of tokens, then paces them at its rate")
+def _():
+    clock = Clock()
+    bucket = TokenBucket(2, 2, clock=clock, sleep=clock.sleep)
+
+    waited = [bucket.acquire() for _ in range(4)]
+
+    assert waited == [0, 0, 0.5, 0.5]
+    bucket.pause(3)
+    assert bucket.acquire() == 3
+
+
+@test("TokenBucket instances using the same state file share their tokens")
+def _():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        clock = Clock()
+        path = os.path.join(tmpdir, "aur.ratelimit")
+        first = TokenBucket(1, 2, path=path, clock=clock, sleep=clock.sleep)
+        second = TokenBucket(1, 2, path=path, clock=clock, sleep=clock.sleep)
+
+        first.acquire()
+        first.acquire()
+
+        assert second.acquire() == 1
+
+
+@test("CircuitBreaker opens after repeated failures and lets one trial through")
+def _():
+    clock = Clock()
+    breaker = CircuitBreaker(2, 60, clock=clock)
+
+    breaker.failure()
+    assert breaker.allow() is True
+    breaker.failure()
+    assert breaker.allow() is False
+
+    clock.now += 60
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.success()
+    assert breaker.is_open is False
+
+
+@test("get_retry_after accepts seconds and HTTP dates")
+def _():
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert get_retry_after({"Retry-After": "2"}) == 2
+    assert 25 < get_retry_after({"Retry-After": date}) <= 30
+    assert get_retry_after({"Retry-After": "soon"}) is None
+    assert get_retry_after({}) is None
+
+
+@test("load_policy reads the [aur] section of nay.conf")
+def _():
+    with tempfile.NamedTemporaryFile("w", suffix=".conf") as config:
+        config.write(
+            "[aur]\nRequestRate = 0.5\nMaxRetries = 2\nSharedRateLimit = yes\n"
+            "ReadTimeout = 5\n"
+        )
+        config.flush()
+        policy = load_policy(config.name)
+
+        assert (policy.rate, policy.burst, policy.retries, policy.shared) == (
+            0.5,
+            20,
+            2,
+            True,
+        )
+        assert (policy.connect_timeout, policy.read_timeout) == (10, 5)
+
+        config.write("RequestBurst = 0\n")
+        config.flush()
+        with raises(ConfigReadError):
+            load_policy(config.name)
+
+
+@test("AUR retries requests failing with 503 until they succeed")
+def _(fixtures=fixtures):
+    with AURServer(fixtures, error_rate=0.5, seed=1).start() as server:
+        aur = make_aur(server, retries=8, breaker_threshold=100)
+        recorded = metrics.enable()
+        try:
+            for _ in range(10):
+                assert [pkg.name for pkg in aur.get_packages("foo")] == ["foo"]
+        finally:
+            metrics.disable()
+
+    data = recorded.to_dict()["info"]
+    assert data["requests"] == server.requests["info"] == 10 + data["retries"]
+    assert data["errors"] == data["retries"] > 0
+
+
+@test("AUR slows down and honors Retry-After when rate limited")
+def _(fixtures=fixtures):
+    with AURServer(fixtures, rate_limit=2).start() as server:
+        aur = make_aur(server)
+        for num in range(4):
+            aur.search(f"foo{num}")
+
+    assert server.requests["search"] > 4
+    assert aur.throttle.bucket.rate < 100
+
+
+@test("AUR retries requests which time out")
+def _(fixtures=fixtures):
+    with AURServer(fixtures, latency=0.5).start() as server:
+        aur = make_aur(server, retries=1, read_timeout=0.05)
+        with raises(AURError) as exc:
+            aur.get_packages("foo")
+
+    assert "timed out" in str(exc.raised)
+    assert server.requests["info"] == 2
+
+
+@test("AUR falls back to expired cached results once the circuit breaker opens")
+def _(fixtures=fixtures):
+    cache = ResponseCache(ttl=0)
+    with AURServer(fixtures).start() as server:
+        aur = make_aur(server, cache=cache, retries=1, breaker_threshold=2)
+        aur.search("foo")
+        aur.get_packages("foo")
+        server.error_rate = 1
+
+        assert [result["Name"] for result in aur.search("foo")] == ["foo"]
+        assert aur.throttle.breaker.is_open is True
+        requests = dict(server.requests)
+        assert [pkg.name for pkg in aur.get_packages("foo")] == ["foo"]
+        assert server.requests == requests
+        with raises(AURError):
+            aur.search("bar")
+
+    assert "using cached" in aur.console.file.getvalue()
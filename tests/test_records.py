@@ -0,0 +1,34 @@
+import io
+import json
+
+from ward import raises, test
+
+from nay.records import RecordWriter
+
+
+@test("RecordWriter writes one object per line in ndjson mode")
+def _():
+    out = io.StringIO()
+    with RecordWriter("ndjson", file=out) as writer:
+        writer.write({"name": "yay"})
+        writer.write({"name": "paru"})
+
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [{"name": "yay"}, {"name": "paru"}]
+
+
+@test("RecordWriter writes a valid array in json mode")
+def _():
+    for records in ([], [{"name": "yay"}], [{"name": "yay"}, {"name": "paru"}]):
+        out = io.StringIO()
+        with RecordWriter("json", file=out) as writer:
+            for record in records:
+                writer.write(record)
+
+        assert json.loads(out.getvalue()) == records
+
+
+@test("RecordWriter rejects unknown formats")
+def _():
+    with raises(ValueError):
+        RecordWriter("xml")
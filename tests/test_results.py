@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+from ward import fixture, test
+
+from nay.package import AURBasic, SyncPackage
+from nay.results import (
+    INSTALLED,
+    NOT_INSTALLED,
+    OUTDATED,
+    UP_TO_DATE,
+    SearchResults,
+)
+
+
+def vercmp(first, second):
+    return (first > second) - (first < second)
+
+
+def sync_pkg(db, name, version="1.0-1"):
+    return SimpleNamespace(
+        db=SimpleNamespace(name=db),
+        name=name,
+        version=version,
+        desc=f"{name} description",
+        size=1024,
+        isize=4096,
+    )
+
+
+def aur_result(name, votes=10, maintainer="someone"):
+    return {
+        "Name": name,
+        "Version": "2.0-1",
+        "Description": None,
+        "NumVotes": votes,
+        "Popularity": 0.5,
+        "Maintainer": maintainer,
+        "OutOfDate": None,
+    }
+
+
+@fixture
+def results():
+    results = SearchResults()
+    results.append_sync(sync_pkg("core", "bash"))
+    results.append_sync(sync_pkg("extra", "zsh"))
+    results.append_aur(aur_result("yay", votes=2000))
+    results.append_aur(aur_result("paru", votes=1000, maintainer=None))
+    results.mark_installed({"bash": "1.0-1", "paru": "1.9-1"}, vercmp)
+    return results
+
+
+@test("SearchResults stores strings once in a shared string table")
+def _(results=results):
+    assert len(results) == 4
+    assert results.strings.count("core") == 1
+    assert results.get_string("name", 2) == "yay"
+    assert results.get_string("desc", 2) == ""
+    assert [results.is_aur(row) for row in range(4)] == [False, False, True, True]
+
+
+@test("SearchResults can be sorted, filtered and sliced")
+def _(results=results):
+    by_votes = results.sort(key=lambda row: results.votes[row], reverse=True)
+    assert by_votes.get_string("name", 0) == "yay"
+
+    aur = results.filter(results.is_aur)
+    assert [aur.get_string("name", row) for row in range(len(aur))] == ["yay", "paru"]
+
+    tail = results[2:]
+    assert len(tail) == 2 and tail.strings is results.strings
+
+    other = SearchResults()
+    other.append_sync(sync_pkg("core", "bash"))
+    other.mark_installed({"bash": "0.9-1"}, vercmp)
+    tail.extend(other)
+    assert tail.get_string("name", 2) == "bash"
+    assert tail.get_installed_version(2) == "0.9-1"
+
+
+@test("Printed numbers map back to rows and only selected rows become packages")
+def _(results=results):
+    assert [num for num, _ in results.rows()] == [4, 3, 2, 1]
+    assert results.get_row(4) == 0
+    assert results.get_row(0) is None and results.get_row(5) is None
+
+    pkg = results.get_package(results.get_row(1), sync={})
+    assert isinstance(pkg, AURBasic)
+    assert (pkg.name, pkg.version, pkg.orphaned) == ("paru", "2.0-1", True)
+
+    bash = sync_pkg("core", "bash")
+    sync = {"core": SimpleNamespace(get_pkg=lambda name: bash)}
+    pkg = results.get_package(results.get_row(4), sync=sync)
+    assert isinstance(pkg, SyncPackage) and pkg.name == "bash"
+
+
+@test("Installed versions are compared against the result versions")
+def _(results=results):
+    assert list(results.status) == [UP_TO_DATE, NOT_INSTALLED, NOT_INSTALLED, OUTDATED]
+    assert results.get_installed_version(3) == "1.9-1"
+    assert results.get_installed_version(1) is None
+
+    results.mark_installed({"zsh": "9.0-1"}, vercmp)
+    assert results.status[1] == INSTALLED
+    assert results.status.count(NOT_INSTALLED) == 3
+
+
+@test("-Ss and -Si records give the out-of-date date the same way")
+def _():
+    result = dict(aur_result("yay"), OutOfDate=1700000000)
+    results = SearchResults()
+    results.append_aur(result)
+
+    search_record = results.get_record(0)
+    info_record = AURBasic(
+        "aur", "yay", "2.0-1", None, votes=10, popularity=0.5, flag_date=1700000000
+    ).to_record()
+
+    assert search_record["flag_date"] == info_record["flag_date"] == 1700000000
@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+from ward import fixture, test
+
+from nay.retention import (
+    RetentionPolicy,
+    parse_size,
+    plan,
+    plan_wipe,
+    remove,
+    scan,
+)
+
+
+def write(path, size, mtime=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@fixture
+def cachedir():
+    with tempfile.TemporaryDirectory() as tmp:
+        for num in range(1, 5):
+            artifact = os.path.join(tmp, "foo", f"foo-{num}.0-1-x86_64.pkg.tar.zst")
+            write(artifact, 1000, mtime=num * 1000)
+            write(f"{artifact}.sig", 10, mtime=num * 1000)
+        write(os.path.join(tmp, "foo", "PKGBUILD"), 100)
+        write(os.path.join(tmp, "foo", "src", "main.c"), 500)
+        write(os.path.join(tmp, "bar", "PKGBUILD"), 100)
+        write(os.path.join(tmp, "sources", "bar-1.0.tar.gz"), 2000)
+        write(os.path.join(tmp, "journal", "20240101-000000-1.json"), 50)
+        write(os.path.join(tmp, "devel.json"), 20)
+        yield tmp
+
+
+@test("scan accounts every byte of the cache in one walk")
+def _(tmp=cachedir):
+    cache = scan(tmp)
+
+    assert set(cache.clones) == {"foo", "bar"}
+    assert cache.clones["foo"].size == 4 * 1010 + 100 + 500
+    assert {a.version for a in cache.clones["foo"].artifacts} == {
+        "1.0-1",
+        "2.0-1",
+        "3.0-1",
+        "4.0-1",
+    }
+    assert cache.sources == 2000
+    assert cache.state == 70
+    assert cache.total == 4 * 1010 + 600 + 100 + 2000 + 70
+
+
+@test("plan keeps the newest versions and drops clones of uninstalled packages")
+def _(tmp=cachedir):
+    removals = plan(scan(tmp), RetentionPolicy(keep_versions=2), installed={"foo"})
+
+    removed = {os.path.basename(removal.path): removal.reason for removal in removals}
+    assert removed == {
+        "bar": "not installed",
+        "foo-1.0-1-x86_64.pkg.tar.zst": "old version",
+        "foo-2.0-1-x86_64.pkg.tar.zst": "old version",
+    }
+
+
+@test("plan removes the oldest kept packages until the cache fits the size cap")
+def _(tmp=cachedir):
+    cache = scan(tmp)
+    policy = RetentionPolicy(
+        keep_versions=4, remove_uninstalled=False, max_size=cache.total - 1500
+    )
+    removals = plan(cache, policy, installed={"foo"})
+
+    assert [os.path.basename(removal.path) for removal in removals] == [
+        "foo-1.0-1-x86_64.pkg.tar.zst",
+        "foo-2.0-1-x86_64.pkg.tar.zst",
+    ]
+
+
+@test("plan removes old sources but never the newest package to fit the size cap")
+def _(tmp=cachedir):
+    write(os.path.join(tmp, "sources", "bar-1.0.tar.gz"), 2000, mtime=1500)
+    cache = scan(tmp)
+    policy = RetentionPolicy(keep_versions=4, remove_uninstalled=False, max_size=0)
+    removals = plan(cache, policy, installed={"foo"})
+
+    assert [os.path.basename(removal.path) for removal in removals] == [
+        "foo-1.0-1-x86_64.pkg.tar.zst",
+        "bar-1.0.tar.gz",
+        "foo-2.0-1-x86_64.pkg.tar.zst",
+        "foo-3.0-1-x86_64.pkg.tar.zst",
+    ]
+
+
+@test("remove deletes planned entries with their signatures and keeps nay's state")
+def _(tmp=cachedir):
+    cache = scan(tmp)
+    freed = remove(plan_wipe(cache, tmp))
+
+    assert freed == cache.total - cache.state
+    assert sorted(os.listdir(tmp)) == ["devel.json", "journal"]
+
+
+@test("parse_size understands unit suffixes")
+def _():
+    assert parse_size("1024") == 1024
+    assert parse_size("500M") == 500 * 2**20
+    assert parse_size("2GiB") == 2 * 2**30
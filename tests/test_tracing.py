@@ -0,0 +1,65 @@
+import concurrent.futures
+import json
+import tempfile
+
+from ward import fixture, test
+
+from nay import tracing
+
+
+@fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+@test("span does nothing while tracing is disabled")
+def _():
+    tracing.disable()
+    assert tracing.span("aur.info") is tracing.NULL_SPAN
+
+
+@test("Tracer.summary aggregates spans into a tree")
+def _(tracer=tracer):
+    with tracing.span("nay"):
+        for _ in range(3):
+            with tracing.span("aur.info"):
+                pass
+        with tracing.span("makepkg"):
+            with tracing.span("git"):
+                pass
+
+    rows = [(depth, name, count) for depth, name, count, _ in tracer.summary()]
+    assert rows == [(0, "nay", 1), (1, "aur.info", 3), (1, "makepkg", 1), (2, "git", 1)]
+
+
+@test("Spans opened on worker threads are nested under the main thread's span")
+def _(tracer=tracer):
+    def query():
+        with tracing.span("aur.search"):
+            pass
+
+    with tracing.span("search_packages"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(query).result()
+
+    assert [row[:2] for row in tracer.summary()] == [
+        (0, "search_packages"),
+        (1, "aur.search"),
+    ]
+
+
+@test("Tracer writes complete events in the Chrome trace format")
+def _(tracer=tracer):
+    with tracing.span("pacman", argv=["pacman", "-Syu"]):
+        pass
+
+    with tempfile.NamedTemporaryFile("r", suffix=".json") as f:
+        tracer.write_chrome_trace(f.name)
+        events = json.load(f)["traceEvents"]
+
+    (event,) = [event for event in events if event["ph"] == "X"]
+    assert event["name"] == "pacman"
+    assert event["args"] == {"argv": ["pacman", "-Syu"]}
+    assert event["dur"] >= 0
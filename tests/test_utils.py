@@ -0,0 +1,169 @@
+import io
+import os
+import stat
+import tempfile
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from ward import fixture, test
+
+from nay import aur as aur_module
+from nay.aur import AUR
+from nay.console import NayConsole
+from nay.ratelimit import RateLimitPolicy, Throttle
+from nay.utils import (
+    get_configured_srcdest,
+    get_packagelist,
+    get_source_filename,
+    get_source_filenames,
+    get_sources,
+    makepkg_env,
+)
+
+
+@dataclass(frozen=True)
+class Pkg:
+    name: str
+    SRCINFO: str
+
+
+@fixture
+def pkgdir():
+    with tempfile.TemporaryDirectory() as pkgdir:
+        os.makedirs(os.path.join(pkgdir, "foo"))
+        yield pkgdir
+
+
+def fake_makepkg(bindir: str, output: list[str]) -> None:
+    """Put a 'makepkg' on PATH which prints a package list"""
+    script = os.path.join(bindir, "makepkg")
+    with open(script, "w") as f:
+        f.write("#!/bin/sh\n")
+        for line in output:
+            f.write(f"echo '{line}'\n")
+    os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+
+
+@test("get_packagelist returns the built files of the current version only")
+def _(pkgdir=pkgdir):
+    builddir = os.path.join(pkgdir, "foo")
+    current = os.path.join(builddir, "foo-2-1-x86_64.pkg.tar.zst")
+    for name in [
+        "foo-1-1-x86_64.pkg.tar.zst",
+        "foo-2-1-x86_64.pkg.tar.zst",
+        "foo-2-1-x86_64.pkg.tar.zst.sig",
+        "foo-bar-1-1-x86_64.pkg.tar.zst",
+    ]:
+        open(os.path.join(builddir, name), "w").close()
+    fake_makepkg(
+        pkgdir,
+        [current, os.path.join(builddir, "foo-debug-2-1-x86_64.pkg.tar.zst")],
+    )
+
+    path = os.environ["PATH"]
+    os.environ["PATH"] = f"{pkgdir}:{path}"
+    try:
+        artifacts = get_packagelist(SimpleNamespace(name="foo"), pkgdir)
+    finally:
+        os.environ["PATH"] = path
+
+    assert artifacts == [current]
+
+
+@test("get_source_filename names sources the way makepkg stores them in SRCDEST")
+def _():
+    for source, filename in [
+        ("foo-1.0.tar.gz::https://example.org/v1.0.tar.gz", "foo-1.0.tar.gz"),
+        ("https://example.org/foo-1.0.tar.gz", "foo-1.0.tar.gz"),
+        ("git+https://github.com/foo/foo.git#branch=main", "foo"),
+        ("git+https://github.com/foo/foo?signed", "foo"),
+        ("hg+https://example.org/foo/", "foo"),
+        ("fossil+https://example.org/foo", "foo.fossil"),
+        ("bar::git+https://github.com/foo/foo.git", "bar"),
+        ("foo.patch", None),
+    ]:
+        assert get_source_filename(source) == filename
+
+
+@test("get_sources and get_source_filenames read every source array of a .SRCINFO")
+def _(pkgdir=pkgdir):
+    srcinfo = os.path.join(pkgdir, "foo", ".SRCINFO")
+    with open(srcinfo, "w") as f:
+        f.write(
+            "pkgbase = foo\n"
+            "\tsource = foo-1.0.tar.gz::https://example.org/v1.0.tar.gz\n"
+            "\tsource = foo.patch\n"
+            "\tsource_x86_64 = https://example.org/foo-x86_64.bin\n"
+        )
+
+    assert get_sources(srcinfo) == {
+        "https://example.org/v1.0.tar.gz",
+        "foo.patch",
+        "https://example.org/foo-x86_64.bin",
+    }
+    assert get_source_filenames(srcinfo) == {"foo-1.0.tar.gz", "foo-x86_64.bin"}
+    assert get_sources(os.path.join(pkgdir, "missing")) == set()
+
+
+@test("fetch_sources fetches packages sharing a file in SRCDEST in the same worker")
+def _(pkgdir=pkgdir):
+    sources = {
+        "foo": "v1.0.tar.gz::https://example.org/foo/v1.0.tar.gz",
+        "bar": "v1.0.tar.gz::https://example.org/bar/v1.0.tar.gz",
+        "baz": "https://example.org/baz-1.0.tar.gz",
+        "qux": "https://mirror.example.org/baz-1.0.tar.gz",
+        "quux": "https://example.org/quux-1.0.tar.gz",
+    }
+    packages = []
+    for name, source in sources.items():
+        os.makedirs(os.path.join(pkgdir, name), exist_ok=True)
+        srcinfo = os.path.join(pkgdir, name, ".SRCINFO")
+        with open(srcinfo, "w") as f:
+            f.write(f"pkgbase = {name}\n\tsource = {source}\n")
+        packages.append(Pkg(name, srcinfo))
+    fake_makepkg(pkgdir, [])
+
+    aur = AUR(
+        None, NayConsole(file=io.StringIO()), throttle=Throttle(RateLimitPolicy())
+    )
+    path, cachedir, srcdest = (
+        os.environ["PATH"],
+        aur_module.CACHEDIR,
+        aur_module.SRCDEST,
+    )
+    os.environ["PATH"] = f"{pkgdir}:{path}"
+    aur_module.CACHEDIR = pkgdir
+    aur_module.SRCDEST = os.path.join(pkgdir, "sources")
+    try:
+        aur.fetch_sources(*packages)
+        for pkg in packages:
+            aur.prefetched[pkg].result()
+    finally:
+        os.environ["PATH"] = path
+        aur_module.CACHEDIR, aur_module.SRCDEST = cachedir, srcdest
+
+    foo, bar, baz, qux, quux = packages
+    assert aur.prefetched[foo] is aur.prefetched[bar]
+    assert aur.prefetched[baz] is aur.prefetched[qux]
+    assert len({id(future) for future in aur.prefetched.values()}) == 3
+
+
+@test("makepkg_env keeps a SRCDEST set in the environment or in makepkg.conf")
+def _(pkgdir=pkgdir):
+    environ = dict(os.environ)
+    os.environ["HOME"] = pkgdir
+    os.environ.pop("XDG_CONFIG_HOME", None)
+    try:
+        os.environ["SRCDEST"] = "/srv/sources"
+        assert makepkg_env()["SRCDEST"] == "/srv/sources"
+
+        del os.environ["SRCDEST"]
+        with open(os.path.join(pkgdir, ".makepkg.conf"), "w") as f:
+            f.write("SRCDEST=/home/sources\n")
+        get_configured_srcdest.cache_clear()
+        assert get_configured_srcdest() == "/home/sources"
+        assert "SRCDEST" not in makepkg_env()
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+        get_configured_srcdest.cache_clear()